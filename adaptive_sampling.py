@@ -0,0 +1,254 @@
+import cv2
+import logging
+import subprocess
+import numpy as np
+from typing import Iterator
+from imageio_ffmpeg import get_ffmpeg_exe
+from media_ingest import probe
+from object_detection import SEEK_THRESHOLD, sample_interval
+
+logger = logging.getLogger(__name__)
+
+# Candidate frames are scored on tiny grayscale thumbnails, and the audio on a low-rate mono envelope
+CANDIDATE_RATE = 2.0
+THUMBNAIL_SIZE = 32
+ENVELOPE_SAMPLE_RATE = 8000
+
+
+def scan_video(video_path: str, candidate_rate: float=CANDIDATE_RATE) -> dict:
+    """
+    Score the visual change and audio energy of candidate frames of a video, without encoding any image.
+    ffmpeg decodes the candidates straight into thumbnails, and the audio into an 8 kHz mono envelope.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+        candidate_rate (float): Number of candidate frames per second (must be > 0).
+
+    Returns:
+        dict: `indices` (frame index of each candidate), `times` (seconds), `visual` (mean absolute difference
+            with the previous candidate's thumbnail, 0 to 1, the first candidate counting as the largest cut) and
+            `audio` (RMS energy around each candidate, 0 to 1, zeros without an audio track), as numpy arrays.
+
+    Raises:
+        ValueError: If `candidate_rate` is less than or equal to 0.
+        RuntimeError: If the video cannot be opened or decoded.
+    """
+
+    if candidate_rate <= 0:
+        raise ValueError("candidate_rate must be greater than 0")
+
+    metadata = probe(video_path)
+    interval = sample_interval(int(metadata["fps"]), metadata["frame_count"], candidate_rate)
+
+    # Same frame selection as `MediaIngest`, scaled down and converted by ffmpeg
+    thumbnails = _ffmpeg_output([
+        "-map", "0:v:0", "-an", "-vf",
+        f"select=not(mod(n\\,{interval})),scale={THUMBNAIL_SIZE}:{THUMBNAIL_SIZE},format=gray",
+        "-fps_mode", "passthrough", "-f", "rawvideo", "pipe:1"
+    ], video_path)
+    thumbnails = np.frombuffer(thumbnails, dtype=np.uint8).reshape(-1, THUMBNAIL_SIZE, THUMBNAIL_SIZE).astype(np.int16)
+
+    indices = np.arange(len(thumbnails)) * interval
+    times = indices / metadata["fps"]
+
+    visual = np.ones(len(thumbnails))
+    if len(thumbnails) > 1:
+        visual[1:] = np.abs(np.diff(thumbnails, axis=0)).mean(axis=(1, 2)) / 255
+        # The opening frame counts as the largest cut of the video, without dwarfing the others
+        visual[0] = visual[1:].max()
+
+    audio = np.zeros(len(thumbnails))
+    if metadata["has_audio"] and len(thumbnails):
+        samples = _ffmpeg_output(
+            ["-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(ENVELOPE_SAMPLE_RATE), "-f", "s16le", "pipe:1"], video_path
+        )
+        audio = audio_energy(np.frombuffer(samples, dtype=np.int16), times, window=interval / metadata["fps"])
+
+    return {"indices": indices, "times": times, "visual": visual, "audio": audio}
+
+
+def _ffmpeg_output(args: list[str], video_path: str) -> bytes:
+    result = subprocess.run(
+        [get_ffmpeg_exe(), "-nostdin", "-loglevel", "error", "-i", video_path, *args], capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to scan the video: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def audio_energy(samples: np.ndarray, times: np.ndarray, window: float, sample_rate: int=ENVELOPE_SAMPLE_RATE) -> np.ndarray:
+    """
+    Compute the RMS energy of the audio in a window around each time, in one pass over the samples.
+
+    Args:
+        samples (np.ndarray): The mono 16-bit samples.
+        times (np.ndarray): The window centres, in seconds.
+        window (float): The window length, in seconds.
+        sample_rate (int): The sample rate of `samples`.
+
+    Returns:
+        np.ndarray: The RMS energy of each window, relative to full scale (0 to 1).
+    """
+
+    # Prefix sums of the squared samples give the energy of any window in constant time
+    energy = np.concatenate(([0.0], np.cumsum((samples.astype(np.float64) / 32768) ** 2)))
+    starts = np.clip(((times - window / 2) * sample_rate).astype(int), 0, len(samples))
+    ends = np.clip(((times + window / 2) * sample_rate).astype(int), 0, len(samples))
+
+    lengths = np.maximum(ends - starts, 1)
+    return np.sqrt((energy[ends] - energy[starts]) / lengths)
+
+
+def allocate_frames(scores: np.ndarray, budget: int, floor: float=0.2) -> np.ndarray:
+    """
+    Spend a frame budget where the activity score is highest, without leaving quiet stretches empty.
+    The budget is spread evenly along the cumulative score, so each frame covers the same amount of activity;
+    a `floor` share of it is spread evenly along the video regardless of activity.
+
+    Args:
+        scores (np.ndarray): The activity score of each candidate, greater than or equal to 0.
+        budget (int): The number of frames to select (must be > 0).
+        floor (float): Share of the budget spread evenly, 0 (activity only) to 1 (uniform sampling).
+
+    Returns:
+        np.ndarray: The positions of the selected candidates, in order.
+
+    Raises:
+        ValueError: If `budget` is less than or equal to 0 or `floor` is out of range.
+    """
+
+    if budget <= 0:
+        raise ValueError("budget must be greater than 0")
+    if not 0 <= floor <= 1:
+        raise ValueError("floor must be between 0 and 1")
+
+    if len(scores) <= budget:
+        return np.arange(len(scores))
+
+    # Both parts of the weight average one unit per candidate, so the floor does not depend on the number of candidates
+    activity = scores * len(scores) / scores.sum() if scores.sum() > 0 else np.ones(len(scores))
+    cumulative = np.cumsum(floor + (1 - floor) * activity)
+    targets = (np.arange(budget) + 0.5) / budget * cumulative[-1]
+    selected = np.unique(np.searchsorted(cumulative, targets))
+
+    # Two targets can land on one very active candidate; give the spare frames to the next most active ones
+    if len(selected) < budget:
+        remaining = np.setdiff1d(np.arange(len(scores)), selected)
+        spare = remaining[np.argsort(-scores[remaining], kind="stable")[:budget - len(selected)]]
+        selected = np.sort(np.concatenate((selected, spare)))
+
+    return selected
+
+
+def adaptive_frame_indices(
+    video_path: str,
+    max_frames: int,
+    candidate_rate: float=CANDIDATE_RATE,
+    audio_weight: float=0.4,
+    floor: float=0.2,
+    stats: dict[str, int] | None=None
+) -> list[int]:
+    """
+    Choose the frames of a video to send, spending `max_frames` where the picture changes or the audio is loud.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+        max_frames (int): The frame budget (must be > 0).
+        candidate_rate (float): Number of candidate frames scanned per second, see `scan_video`.
+        audio_weight (float): Weight of the audio energy in the activity score, 0 to 1; the visual change gets the rest,
+            or all of it when the video is silent.
+        floor (float): Share of the budget spread evenly along the video, see `allocate_frames`.
+        stats (dict[str, int], optional): If given, "candidates" and "selected" counters are added to it.
+
+    Returns:
+        list[int]: The frame indices to decode, in order.
+
+    Raises:
+        ValueError: If an argument is out of range.
+        RuntimeError: If the video cannot be opened or decoded.
+    """
+
+    if not 0 <= audio_weight <= 1:
+        raise ValueError("audio_weight must be between 0 and 1")
+
+    scan = scan_video(video_path, candidate_rate)
+    if not len(scan["indices"]):
+        raise RuntimeError(f"No frames were decoded from the video: {video_path}")
+
+    # Normalise each signal by its peak, so a quiet video still ranks its own loudest moments first
+    visual, audio = (signal / signal.max() if signal.max() > 0 else signal for signal in (scan["visual"], scan["audio"]))
+    if not audio.any():
+        audio_weight = 0
+    scores = (1 - audio_weight) * visual + audio_weight * audio
+    selected = scan["indices"][allocate_frames(scores, max_frames, floor)]
+
+    logger.info(f"Adaptive sampling: selected {len(selected)} of {len(scores)} candidate frames")
+    if stats is not None:
+        stats["candidates"] = stats.get("candidates", 0) + len(scores)
+        stats["selected"] = stats.get("selected", 0) + len(selected)
+
+    return [int(index) for index in selected]
+
+
+def read_frames(video_path: str, indices: list[int]) -> Iterator[np.ndarray]:
+    """
+    Lazily decode the frames at the given indices. Gaps of at least `SEEK_THRESHOLD` frames are skipped
+    with a seek, like `object_detection.sample_frames` does, and shorter ones are grabbed without being converted.
+
+    Args:
+        video_path (str): The path of the video file.
+        indices (list[int]): The frame indices, in increasing order.
+
+    Returns:
+        Iterator[np.ndarray]: A generator of BGR frames.
+
+    Raises:
+        RuntimeError: If the video file cannot be opened.
+    """
+
+    def read() -> Iterator[np.ndarray]:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open the video file: {video_path}")
+
+        try:
+            frame_index = 0
+            for index in indices:
+                if index - frame_index >= SEEK_THRESHOLD:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                    frame_index = index
+                while frame_index < index:
+                    if not cap.grab():
+                        return
+                    frame_index += 1
+                ret, img = cap.read()
+                if not ret:
+                    return
+                frame_index += 1
+                yield img
+
+        finally:
+            cap.release()
+
+    return read()
+
+
+def adaptive_frames(video_path: str, max_frames: int, stats: dict[str, int] | None=None, **options) -> Iterator[np.ndarray]:
+    """
+    Select frames with `adaptive_frame_indices` and decode them, for the `frames` option of `object_detection`.
+    The video is scanned when the first frame is requested.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+        max_frames (int): The frame budget (must be > 0).
+        stats (dict[str, int], optional): If given, filled with the "candidates" and "selected" counters.
+        **options: The scoring options of `adaptive_frame_indices`.
+
+    Returns:
+        Iterator[np.ndarray]: A generator of the selected BGR frames, in order.
+    """
+
+    def frames() -> Iterator[np.ndarray]:
+        yield from read_frames(video_path, adaptive_frame_indices(video_path, max_frames, stats=stats, **options))
+
+    return frames()
@@ -0,0 +1,159 @@
+import time
+import asyncio
+import logging
+from contextlib import nullcontext
+from openai import AsyncOpenAI
+from main import (
+    format_output, TRANSCRIPTION_MODEL, TRANSCRIPTION_CHUNK_SECONDS, RESPONSES_MODEL, ANALYSIS_CHUNK_TOKENS, SAMPLE_RATE,
+    IMAGE_DETAIL, WINDOW_SIZE, FRAME_OPTIONS
+)
+from video_transcript import video_transcript_async
+from object_detection import object_detection_async
+from sentiment_analysis import sentiment_analysis_async
+from question_answer import question_answer_async
+from transcript_analysis import transcript_analysis_async
+from metrics import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+# Default number of in-flight requests allowed per OpenAI endpoint
+DEFAULT_CONCURRENCY = {
+    "transcriptions": 4,
+    "responses": 8
+}
+
+
+def create_limiters(concurrency: dict[str, int] | None=None) -> dict[str, asyncio.Semaphore]:
+    """
+    Create one semaphore per OpenAI endpoint to cap the number of in-flight requests.
+
+    Args:
+        concurrency (dict[str, int], optional): Maximum in-flight requests per endpoint.
+            Missing endpoints fall back to `DEFAULT_CONCURRENCY`.
+
+    Returns:
+        dict[str, asyncio.Semaphore]: A semaphore for each of "transcriptions" and "responses".
+
+    Raises:
+        ValueError: If a limit is less than or equal to 0.
+    """
+
+    limits = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+
+    for endpoint, limit in limits.items():
+        if limit <= 0:
+            raise ValueError(f"Concurrency limit for '{endpoint}' must be greater than 0")
+
+    return {endpoint: asyncio.Semaphore(limit) for endpoint, limit in limits.items()}
+
+
+async def _timed(name: str, coro, timings: dict[str, float] | None, metrics: RunMetrics | None=None):
+    start = time.perf_counter()
+    try:
+        # Each gathered coroutine runs in its own task, so the stage context does not leak into the others
+        with metrics.stage(name) if metrics is not None else nullcontext():
+            return await coro
+    finally:
+        if timings is not None:
+            timings[name] = time.perf_counter() - start
+
+
+async def openai_pipeline(
+    api_key: str,
+    video_path: str,
+    client: AsyncOpenAI | None=None,
+    limiters: dict[str, asyncio.Semaphore] | None=None,
+    timings: dict[str, float] | None=None,
+    combined_analysis: bool=False,
+    metrics: RunMetrics | None=None,
+    frame_options: dict | None=None
+) -> dict:
+    """
+    Asynchronous version of `main.openai_pipeline` built on `AsyncOpenAI`.
+    Transcription and object detection run concurrently, then sentiment analysis
+    and Q&A generation run concurrently once the transcription is available.
+    Long videos are transcribed and analysed in chunks, like `main.openai_pipeline`, but the
+    cache, checkpoint, single pass, timestamps, adaptive sampling and stage selection are not supported.
+
+    Args:
+        api_key (str): The OpenAI API key for authentication. Ignored if `client` is given.
+        video_path (str): The path of the video file to be processed.
+        client (AsyncOpenAI, optional): A shared client, so that several pipelines reuse one connection pool.
+        limiters (dict[str, asyncio.Semaphore], optional): Per-endpoint semaphores, see `create_limiters`.
+        timings (dict[str, float], optional): If given, filled with the wall time in seconds of each stage.
+        combined_analysis (bool): Analyse mode and sentiment and generate Q&A pairs in a single request.
+        metrics (RunMetrics, optional): If given, filled with the metrics of each stage, see `RunMetrics.report`.
+        frame_options (dict, optional): Frame options of object detection overriding `FRAME_OPTIONS`, see `main.openai_pipeline`.
+
+    Returns:
+        dict: The merged output, see `main.openai_pipeline` for its structure.
+
+    Raises:
+        Exception: Propagates any unexpected error that occurs during execution.
+    """
+
+    # Initialise the client and limiters
+    client = client or AsyncOpenAI(api_key=api_key, max_retries=0)
+    limiters = limiters or create_limiters()
+
+    try:
+        transcription, objects = await asyncio.gather(
+            _timed("transcription", video_transcript_async(
+                client=client, video_path=video_path, model=TRANSCRIPTION_MODEL, semaphore=limiters["transcriptions"],
+                chunk_seconds=TRANSCRIPTION_CHUNK_SECONDS
+            ), timings, metrics),
+            _timed("objects", object_detection_async(
+                client=client, video_path=video_path, model=RESPONSES_MODEL, sample_rate=SAMPLE_RATE,
+                detail=IMAGE_DETAIL, window_size=WINDOW_SIZE, semaphore=limiters["responses"],
+                **{**FRAME_OPTIONS, **(frame_options or {})}
+            ), timings, metrics)
+        )
+        logger.info("Transcription and object detection are complete")
+
+        if combined_analysis:
+            results = {"analysis": await _timed("analysis", transcript_analysis_async(
+                client=client, transcription=transcription, model=RESPONSES_MODEL, semaphore=limiters["responses"],
+                max_tokens=ANALYSIS_CHUNK_TOKENS
+            ), timings, metrics)}
+        else:
+            mode_sentiment, qa_pairs = await asyncio.gather(
+                _timed("sentiment", sentiment_analysis_async(
+                    client=client, transcription=transcription, model=RESPONSES_MODEL, semaphore=limiters["responses"],
+                    max_tokens=ANALYSIS_CHUNK_TOKENS
+                ), timings, metrics),
+                _timed("qa", question_answer_async(
+                    client=client, transcription=transcription, model=RESPONSES_MODEL, semaphore=limiters["responses"],
+                    max_tokens=ANALYSIS_CHUNK_TOKENS
+                ), timings, metrics)
+            )
+            results = {"sentiment": mode_sentiment, "qa": qa_pairs}
+        logger.info("Mode and sentiment analysis and Q&A pairs generation are complete")
+
+    except Exception:
+        logger.exception("Unexpected error occurred while parsing video")
+        raise
+
+    return format_output({"transcription": transcription, "objects": objects, **results})
+
+
+async def process_videos(api_key: str, video_paths: list[str], concurrency: dict[str, int] | None=None) -> list[dict | Exception]:
+    """
+    Run the asynchronous pipeline over many videos with one shared client and per-endpoint limits.
+
+    Args:
+        api_key (str): The OpenAI API key for authentication.
+        video_paths (list[str]): The paths of the video files to be processed.
+        concurrency (dict[str, int], optional): Maximum in-flight requests per endpoint, see `create_limiters`.
+
+    Returns:
+        list[dict | Exception]: The merged output of each video in input order,
+            or the exception raised while processing that video.
+    """
+
+    limiters = create_limiters(concurrency)
+
+    async with AsyncOpenAI(api_key=api_key, max_retries=0) as client:
+        return await asyncio.gather(
+            *(openai_pipeline(api_key, video_path, client=client, limiters=limiters) for video_path in video_paths),
+            return_exceptions=True
+        )
@@ -0,0 +1,240 @@
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from openai import OpenAI
+from main import STAGES, load_api_key, load_scheduler, make_client, validate_video_path, openai_pipeline
+from request_scheduler import get_scheduler, set_scheduler
+from metrics import RunMetrics, export_reports
+from result_cache import ResultCache
+from checkpoint import open_checkpoint
+
+logger = logging.getLogger(__name__)
+
+
+def collect_videos(source: str) -> list[str]:
+    """
+    Resolve a batch source into a list of video paths.
+
+    Args:
+        source (str): One of:
+            - A directory: every video file directly inside it is collected.
+            - A `.jsonl` manifest: one entry per line, either a JSON string or an object with a `video_path` key.
+              Relative paths are resolved against the manifest's directory.
+            - A glob pattern, like `videos/**/*.mp4`.
+
+    Returns:
+        list[str]: The video paths, in a stable order.
+
+    Raises:
+        ValueError: If a manifest line is malformed.
+        FileNotFoundError: If the source matches no video.
+    """
+
+    if os.path.isdir(source):
+        video_paths = []
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            mime_type, _ = mimetypes.guess_type(path)
+            if os.path.isfile(path) and mime_type and mime_type.startswith("video/"):
+                video_paths.append(path)
+
+    elif source.endswith(".jsonl") and os.path.isfile(source):
+        base_dir = os.path.dirname(os.path.abspath(source))
+        video_paths = []
+        with open(source, "r", encoding="utf-8") as manifest:
+            for line_no, line in enumerate(manifest, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    path = entry if isinstance(entry, str) else entry["video_path"]
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    raise ValueError(f"Malformed manifest entry at line {line_no}: {line.strip()}") from e
+                video_paths.append(path if os.path.isabs(path) else os.path.join(base_dir, path))
+
+    else:
+        video_paths = sorted(glob.glob(source, recursive=True))
+
+    if not video_paths:
+        raise FileNotFoundError(f"No videos found for: {source}")
+
+    return video_paths
+
+
+def process_video(
+    api_key: str,
+    video_path: str,
+    client: OpenAI,
+    cache: ResultCache | None=None,
+    single_pass: bool=False,
+    checkpoint_dir: str | None=None,
+    force_stages: list[str] | None=None,
+    only_stages: list[str] | None=None
+) -> dict:
+    """
+    Run the pipeline on a single video, capturing any error instead of raising it.
+
+    Args:
+        api_key (str): The OpenAI API key for authentication.
+        video_path (str): The path of the video file to be processed.
+        client (OpenAI): The client shared by every video of the batch.
+        cache (ResultCache, optional): Cache of stage outputs shared by every video of the batch.
+        single_pass (bool): Read the video once for all stages, see `main.openai_pipeline`.
+        checkpoint_dir (str, optional): Directory of per-video checkpoints, so a rerun of the batch
+            only executes the stages that are missing or failed, see `checkpoint.open_checkpoint`.
+        force_stages (list[str], optional): Stages executed again despite their checkpoint.
+        only_stages (list[str], optional): Execute only these stages and their dependencies, see `main.openai_pipeline`.
+
+    Returns:
+        dict: A result record with `video_path`, `status` ("ok" or "error"), `elapsed`,
+            `metrics` (the per-stage report, see `metrics.RunMetrics.report`)
+            and either `output` (the merged pipeline output) or `error`.
+    """
+
+    start = time.perf_counter()
+    metrics = RunMetrics(labels={"video": video_path})
+    try:
+        validate_video_path(video_path)
+        checkpoint = open_checkpoint(checkpoint_dir, video_path) if checkpoint_dir else None
+        output = openai_pipeline(
+            api_key, video_path, client=client, cache=cache, metrics=metrics, single_pass=single_pass,
+            checkpoint=checkpoint, force_stages=force_stages or (), only_stages=only_stages
+        )
+        record = {"video_path": video_path, "status": "ok", "output": output}
+
+    except Exception as e:
+        logger.error(f"Failed to process {video_path}: {e}")
+        record = {"video_path": video_path, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    record["metrics"] = metrics.report()
+    return record
+
+
+def run_batch(
+    api_key: str,
+    video_paths: list[str],
+    output_path: str,
+    max_workers: int=4,
+    cache: ResultCache | None=None,
+    metrics_path: str | None=None,
+    single_pass: bool=False,
+    checkpoint_dir: str | None=None,
+    force_stages: list[str] | None=None,
+    only_stages: list[str] | None=None
+) -> dict[str, int]:
+    """
+    Process many videos on a bounded thread pool and stream one JSON result per line.
+    A failure on one video is recorded in its result line and does not stop the batch.
+
+    Args:
+        api_key (str): The OpenAI API key for authentication.
+        video_paths (list[str]): The paths of the video files to be processed.
+        output_path (str): The JSONL file the results are written to, in completion order.
+        max_workers (int): Maximum number of videos processed at the same time (must be > 0).
+        cache (ResultCache, optional): Cache of stage outputs, so reruns only pay for stages that changed.
+        metrics_path (str, optional): File the metrics reports of all videos are exported to once the batch is done,
+            see `metrics.export_reports`.
+        single_pass (bool): Read each video once for all stages, see `main.openai_pipeline`.
+        checkpoint_dir (str, optional): Directory of per-video checkpoints, see `process_video`.
+        force_stages (list[str], optional): Stages executed again despite their checkpoint.
+        only_stages (list[str], optional): Execute only these stages and their dependencies, see `process_video`.
+
+    Returns:
+        dict[str, int]: The number of videos that succeeded ("ok") and failed ("error").
+
+    Raises:
+        ValueError: If `max_workers` is less than or equal to 0.
+    """
+
+    if max_workers <= 0:
+        raise ValueError("max_workers must be greater than 0")
+
+    # One client for the whole batch, so the connection pool stays warm
+    client = make_client(api_key)
+    summary = {"ok": 0, "error": 0}
+    reports = []
+
+    with open(output_path, "w", encoding="utf-8") as output_file, \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="video") as executor:
+        futures = [
+            executor.submit(
+                process_video, api_key, video_path, client, cache, single_pass, checkpoint_dir, force_stages, only_stages
+            )
+            for video_path in video_paths
+        ]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            summary[record["status"]] += 1
+            reports.append(record["metrics"])
+            output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output_file.flush()
+            logger.info(f"[{done}/{len(video_paths)}] {record['status']}: {record['video_path']}")
+
+    if metrics_path:
+        export_reports(reports, metrics_path)
+
+    return summary
+
+
+def main(argv: list[str] | None=None) -> int:
+    """
+    Command line entry point for batch processing.
+
+    Args:
+        argv (list[str], optional): Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code, 0 if every video succeeded and 1 otherwise.
+
+    Example:
+        $ python batch.py videos/ --output results.jsonl --workers 4 --cache .cache/results.db --metrics metrics.prom
+        $ python batch.py videos/ --single-pass --checkpoint-dir .checkpoints --force-stages qa
+    """
+
+    parser = argparse.ArgumentParser(description="Run the video pipeline over many videos.")
+    parser.add_argument("source", help="A directory, a glob pattern or a JSONL manifest of videos")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to write the results to")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Number of videos processed concurrently")
+    parser.add_argument("--cache", help="SQLite file caching stage outputs between runs")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached outputs and overwrite them")
+    parser.add_argument("--metrics", help="File to export per-stage metrics to (.prom for Prometheus, JSON lines otherwise)")
+    parser.add_argument("--single-pass", action="store_true", help="Read each video once for all stages (network storage)")
+    parser.add_argument("--checkpoint-dir", help="Directory of per-video stage checkpoints, to resume interrupted runs")
+    parser.add_argument("--force-stages", nargs="+", default=[], metavar="STAGE", help="Stages to rerun despite their checkpoint")
+    parser.add_argument(
+        "--stages", nargs="+", choices=STAGES, metavar="STAGE",
+        help=f"Run only these stages and the stages they depend on, among {', '.join(STAGES)} (default: all)"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        api_key = load_api_key()
+        video_paths = collect_videos(args.source)
+        logger.info(f"Processing {len(video_paths)} videos with {args.workers} workers")
+        cache = ResultCache(args.cache, bypass=args.refresh_cache) if args.cache else None
+        set_scheduler(load_scheduler())
+        summary = run_batch(
+            api_key, video_paths, args.output, max_workers=args.workers, cache=cache, metrics_path=args.metrics,
+            single_pass=args.single_pass, checkpoint_dir=args.checkpoint_dir, force_stages=args.force_stages,
+            only_stages=args.stages
+        )
+        logger.info(f"Batch complete: {summary['ok']} succeeded, {summary['error']} failed")
+        logger.info(f"Requests: {get_scheduler().stats()}")
+
+    except Exception:
+        logger.exception("Fatal Error: Batch terminated unexpectedly.")
+        return 1
+
+    return 0 if summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
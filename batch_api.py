@@ -0,0 +1,377 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI
+from main import load_api_key, load_scheduler, make_client, RESPONSES_MODEL, ANALYSIS_CHUNK_TOKENS, format_output
+from sentiment_analysis import sentiment_analysis, build_sentiment_request
+from question_answer import question_answer, build_question_answer_request
+from text_chunking import count_tokens
+from request_scheduler import submit, set_scheduler
+from checkpoint import open_checkpoint
+from batch import collect_videos, process_video
+
+logger = logging.getLogger(__name__)
+
+# The text stages sent through the Batch API: the request builder and the interactive fallback of each
+TEXT_STAGES = {
+    "sentiment": (build_sentiment_request, sentiment_analysis),
+    "qa": (build_question_answer_request, question_answer)
+}
+
+# Stages run interactively before the batch, since the text stages need the transcription
+INTERACTIVE_STAGES = ["transcription", "objects"]
+
+BATCH_ENDPOINT = "/v1/responses"
+# Limit of requests in one batch input file
+MAX_BATCH_REQUESTS = 50000
+
+
+def build_batch_lines(transcriptions: dict[str, str], model: str, stages: list[str]) -> list[dict]:
+    """
+    Build the Batch API input lines of the text stages of many videos.
+    Each line holds the same request body as the interactive `responses.create` call of the stage.
+
+    Args:
+        transcriptions (dict[str, str]): The transcription of each video, keyed by video path.
+        model (str): Model ID used to generate the responses, like gpt-4o or o3.
+        stages (list[str]): The text stages to request, keys of `TEXT_STAGES`.
+
+    Returns:
+        list[dict]: One line per video and stage, with `custom_id` set to "<stage>-<video index>",
+            the index following the order of `transcriptions`.
+    """
+
+    return [
+        {
+            "custom_id": f"{stage}-{index}",
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": TEXT_STAGES[stage][0](transcription=transcription, model=model)
+        }
+        for index, transcription in enumerate(transcriptions.values())
+        for stage in stages
+    ]
+
+
+def submit_batch(client: OpenAI, lines: list[dict], work_dir: str | None=None) -> str:
+    """
+    Upload the input lines as a JSONL file and create a batch processing them.
+
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        lines (list[dict]): The input lines, see `build_batch_lines`.
+        work_dir (str, optional): If given, a copy of the input file is kept in this directory.
+
+    Returns:
+        str: The id of the batch.
+
+    Raises:
+        RuntimeError: If the file cannot be uploaded or the batch cannot be created.
+    """
+
+    name = f"batch_input_{int(time.time() * 1000)}.jsonl"
+    content = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode()
+    if work_dir:
+        os.makedirs(work_dir, exist_ok=True)
+        with open(os.path.join(work_dir, name), "wb") as file:
+            file.write(content)
+
+    # Call OpenAI API. The file is uploaded from memory, so a retried upload sends it whole again.
+    try:
+        input_file = submit(client.files.create, file=(name, content), purpose="batch")
+        batch = submit(
+            client.batches.create, input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h"
+        )
+
+    except Exception as e:
+        raise RuntimeError("Unexpected error occurred while submitting the batch") from e
+
+    logger.info(f"Submitted batch {batch.id} with {len(lines)} requests")
+    return batch.id
+
+
+def wait_for_batch(client: OpenAI, batch_id: str, poll_interval: float=60.0, timeout: float | None=None):
+    """
+    Poll a batch until it completes.
+
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        batch_id (str): The id of the batch.
+        poll_interval (float): Delay between two polls, in seconds.
+        timeout (float, optional): Maximum time to wait, in seconds. Waits until the batch ends if None.
+
+    Returns:
+        Batch: The completed batch.
+
+    Raises:
+        RuntimeError:
+            - If the batch failed, expired or was cancelled.
+            - If the batch is still running after `timeout`.
+    """
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+        batch = submit(client.batches.retrieve, batch_id)
+
+        if batch.status == "completed":
+            return batch
+        if batch.status in ("failed", "expired", "cancelled", "cancelling"):
+            errors = [error.message for error in (batch.errors.data or [])] if batch.errors else []
+            raise RuntimeError(f"Batch {batch_id} {batch.status}: {errors}")
+        if deadline is not None and time.monotonic() >= deadline:
+            raise RuntimeError(f"Batch {batch_id} is still {batch.status} after {timeout}s")
+
+        logger.info(f"Batch {batch_id} is {batch.status}, checking again in {poll_interval:g}s")
+        time.sleep(poll_interval)
+
+
+def read_batch_output(client: OpenAI, batch) -> dict[str, str]:
+    """
+    Download the output of a completed batch.
+
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        batch (Batch): The completed batch, see `wait_for_batch`.
+
+    Returns:
+        dict[str, str]: The output text of each successful request, keyed by `custom_id`.
+            Failed requests are logged and left out.
+    """
+
+    outputs = {}
+    for file_id in filter(None, (batch.output_file_id, batch.error_file_id)):
+        for line in submit(client.files.content, file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+
+            if entry.get("error") or response.get("status_code") != 200:
+                logger.error(f"Batch request {entry['custom_id']} failed: {entry.get('error') or response.get('body')}")
+                continue
+            outputs[entry["custom_id"]] = _output_text(response["body"])
+
+    return outputs
+
+
+def _output_text(body: dict) -> str:
+    # The text of a Responses API body, like `Response.output_text`
+    return "".join(
+        content["text"]
+        for item in body.get("output", []) if item.get("type") == "message"
+        for content in item.get("content", []) if content.get("type") == "output_text"
+    )
+
+
+def run_text_batch(
+    client: OpenAI,
+    transcriptions: dict[str, str],
+    model: str=RESPONSES_MODEL,
+    stages: list[str] | None=None,
+    max_tokens: int | None=ANALYSIS_CHUNK_TOKENS,
+    poll_interval: float=60.0,
+    timeout: float | None=None,
+    work_dir: str | None=None
+) -> dict[str, dict[str, str]]:
+    """
+    Run the text stages of many videos through the Batch API, which costs less than interactive requests
+    but answers within hours. Transcriptions longer than `max_tokens` would need the chunked map and reduce
+    requests of the interactive stages, so they are analysed interactively instead.
+
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        transcriptions (dict[str, str]): The transcription of each video, keyed by video path.
+        model (str): Model ID used to generate the responses, like gpt-4o or o3.
+        stages (list[str], optional): The text stages to run, all of `TEXT_STAGES` if None.
+        max_tokens (int, optional): Token budget of a transcription sent in one request, see `main.ANALYSIS_CHUNK_TOKENS`.
+        poll_interval (float): Delay between two polls of the batch, in seconds.
+        timeout (float, optional): Maximum time to wait for each batch, in seconds.
+        work_dir (str, optional): If given, a copy of each batch input file is kept in this directory, see `submit_batch`.
+            The files are uploaded from memory otherwise, and nothing is written to disk.
+
+    Returns:
+        dict[str, dict[str, str]]: The raw output of each stage, keyed by video path then stage.
+            A stage whose request failed is missing from its video's outputs.
+
+    Raises:
+        ValueError: If `stages` names an unknown stage.
+        RuntimeError: If a batch fails, expires or times out.
+    """
+
+    stages = list(TEXT_STAGES) if stages is None else stages
+    unknown = set(stages) - TEXT_STAGES.keys()
+    if unknown:
+        raise ValueError(f"Unknown text stage(s): {sorted(unknown)}")
+
+    results = {video_path: {} for video_path in transcriptions}
+
+    # Long transcriptions go through the chunked interactive stages
+    batched = {}
+    for video_path, transcription in transcriptions.items():
+        if max_tokens is not None and count_tokens(transcription) > max_tokens:
+            logger.info(f"Analysing the long transcription of {video_path} interactively")
+            for stage in stages:
+                try:
+                    results[video_path][stage] = TEXT_STAGES[stage][1](
+                        client=client, transcription=transcription, model=model, max_tokens=max_tokens
+                    )
+                except Exception as e:
+                    logger.error(f"Stage '{stage}' failed for {video_path}: {e}")
+        else:
+            batched[video_path] = transcription
+
+    if not batched:
+        return results
+
+    video_paths = list(batched)
+    lines = build_batch_lines(batched, model, stages)
+
+    for start in range(0, len(lines), MAX_BATCH_REQUESTS):
+        batch_id = submit_batch(client, lines[start:start + MAX_BATCH_REQUESTS], work_dir)
+        batch = wait_for_batch(client, batch_id, poll_interval=poll_interval, timeout=timeout)
+
+        # Map the outputs back to their video and stage
+        for custom_id, output in read_batch_output(client, batch).items():
+            stage, index = custom_id.rsplit("-", 1)
+            results[video_paths[int(index)]][stage] = output
+
+    return results
+
+
+def run_bulk(
+    api_key: str,
+    video_paths: list[str],
+    output_path: str,
+    max_workers: int=4,
+    single_pass: bool=False,
+    checkpoint_dir: str | None=None,
+    poll_interval: float=60.0,
+    timeout: float | None=None,
+    client: OpenAI | None=None
+) -> dict[str, int]:
+    """
+    Process many videos for a non-urgent backfill: transcription and object detection run interactively,
+    then sentiment analysis and Q&A generation of every video are sent as one Batch API job.
+    Results are written once the batch is complete, in the same format as `batch.run_batch`.
+
+    Args:
+        api_key (str): The OpenAI API key for authentication.
+        video_paths (list[str]): The paths of the video files to be processed.
+        output_path (str): The JSONL file the results are written to.
+        max_workers (int): Maximum number of videos transcribed at the same time.
+        single_pass (bool): Read each video once for all stages, see `main.openai_pipeline`.
+        checkpoint_dir (str, optional): Directory of per-video checkpoints. Text stages already checkpointed
+            are not requested again, and the batch outputs are saved to the checkpoints.
+        poll_interval (float): Delay between two polls of the batch, in seconds.
+        timeout (float, optional): Maximum time to wait for each batch, in seconds.
+        client (OpenAI, optional): A shared client. Created from `api_key` if omitted.
+
+    Returns:
+        dict[str, int]: The number of videos that succeeded ("ok") and failed ("error").
+
+    Raises:
+        RuntimeError: If a batch fails, expires or times out.
+    """
+
+    client = client or make_client(api_key)
+
+    # Transcribe and detect objects interactively
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="video") as executor:
+        records = list(executor.map(
+            lambda video_path: process_video(
+                api_key, video_path, client, single_pass=single_pass, checkpoint_dir=checkpoint_dir,
+                only_stages=INTERACTIVE_STAGES
+            ),
+            video_paths
+        ))
+
+    # Restore the text stages already checkpointed, and batch the others
+    checkpoints, text_outputs, pending = {}, {}, {}
+    for record in records:
+        if record["status"] != "ok":
+            continue
+        video_path = record["video_path"]
+        checkpoints[video_path] = open_checkpoint(checkpoint_dir, video_path) if checkpoint_dir else None
+        text_outputs[video_path] = {
+            stage: output for stage in TEXT_STAGES
+            if checkpoints[video_path] and (output := checkpoints[video_path].get(stage)) is not None
+        }
+        if len(text_outputs[video_path]) < len(TEXT_STAGES):
+            pending[video_path] = record["output"]["Transcription"]
+
+    logger.info(f"Sending the text stages of {len(pending)} videos to the Batch API")
+    for video_path, outputs in run_text_batch(client, pending, poll_interval=poll_interval, timeout=timeout).items():
+        for stage, output in outputs.items():
+            text_outputs[video_path].setdefault(stage, output)
+            if checkpoints[video_path]:
+                checkpoints[video_path].set(stage, output)
+
+    summary = {"ok": 0, "error": 0}
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        for record in records:
+            if record["status"] == "ok":
+                outputs = text_outputs[record["video_path"]]
+                missing = [stage for stage in TEXT_STAGES if stage not in outputs]
+                try:
+                    if missing:
+                        raise RuntimeError(f"Batch requests failed for stage(s): {missing}")
+                    record["output"].update(format_output(outputs))
+                except Exception as e:
+                    logger.error(f"Failed to process {record['video_path']}: {e}")
+                    record = {**record, "status": "error", "error": f"{type(e).__name__}: {e}"}
+                    record.pop("output")
+
+            summary[record["status"]] += 1
+            output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return summary
+
+
+def main(argv: list[str] | None=None) -> int:
+    """
+    Command line entry point for bulk processing through the Batch API.
+
+    Args:
+        argv (list[str], optional): Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code, 0 if every video succeeded and 1 otherwise.
+
+    Example:
+        $ python batch_api.py videos/ --output results.jsonl --poll-interval 300 --checkpoint-dir .checkpoints
+    """
+
+    parser = argparse.ArgumentParser(description="Run the video pipeline over many videos, with the text stages in a Batch API job.")
+    parser.add_argument("source", help="A directory, a glob pattern or a JSONL manifest of videos")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to write the results to")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Number of videos transcribed concurrently")
+    parser.add_argument("--single-pass", action="store_true", help="Read each video once for all stages (network storage)")
+    parser.add_argument("--checkpoint-dir", help="Directory of per-video stage checkpoints, to resume interrupted runs")
+    parser.add_argument("--poll-interval", type=float, default=60, help="Seconds between two polls of the batch")
+    parser.add_argument("--timeout", type=float, help="Maximum seconds to wait for the batch")
+    args = parser.parse_args(argv)
+
+    try:
+        api_key = load_api_key()
+        video_paths = collect_videos(args.source)
+        set_scheduler(load_scheduler())
+        summary = run_bulk(
+            api_key, video_paths, args.output, max_workers=args.workers, single_pass=args.single_pass,
+            checkpoint_dir=args.checkpoint_dir, poll_interval=args.poll_interval, timeout=args.timeout
+        )
+        logger.info(f"Bulk run complete: {summary['ok']} succeeded, {summary['error']} failed")
+
+    except Exception:
+        logger.exception("Fatal Error: Bulk run terminated unexpectedly.")
+        return 1
+
+    return 0 if summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Compare how many short on-screen events uniform and adaptive frame sampling catch with the same frame budget.
+
+Usage:
+    python -m benchmarks.adaptive_sampling [--seconds 120] [--events 8] [--max-frames 10]
+
+The synthetic video is a still picture interrupted by short events (a moving coloured square). An event counts as
+caught when at least one selected frame falls inside it. The scan time is the extra cost of adaptive sampling.
+"""
+
+import os
+import cv2
+import time
+import argparse
+import tempfile
+import numpy as np
+from adaptive_sampling import adaptive_frame_indices
+from frame_processing import apply_frame_budget
+from object_detection import sample_interval
+
+
+def make_event_video(path: str, seconds: float, fps: int, events: int, event_seconds: float, seed: int=0) -> list[range]:
+    # Write the video and return the frame range of each event
+    rng = np.random.default_rng(seed)
+    frame_count = int(seconds * fps)
+    event_frames = int(event_seconds * fps)
+    starts = np.sort(rng.choice(np.arange(0, frame_count - event_frames, event_frames * 2), events, replace=False))
+    ranges = [range(int(start), int(start) + event_frames) for start in starts]
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (320, 240))
+    background = np.full((240, 320, 3), 90, dtype=np.uint8)
+    try:
+        for index in range(frame_count):
+            frame = background.copy()
+            for number, frames in enumerate(ranges):
+                if index in frames:
+                    step = index - frames.start
+                    color = tuple(int(c) for c in rng.integers(0, 256, 3)) if step == 0 else color
+                    cv2.rectangle(frame, (20 + step * 4, 60), (100 + step * 4, 140), color, -1)
+                    cv2.putText(frame, str(number), (140, 200), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+            writer.write(frame)
+    finally:
+        writer.release()
+
+    return ranges
+
+
+def caught(indices: list[int], ranges: list[range]) -> int:
+    return sum(any(index in frames for index in indices) for frames in ranges)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--events", type=int, default=8)
+    parser.add_argument("--event-seconds", type=float, default=2)
+    parser.add_argument("--sample-rate", type=float, default=0.5, help="Rate of the uniform sampler")
+    parser.add_argument("--max-frames", type=int, default=10)
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+
+    totals = {"uniform": 0, "adaptive": 0}
+    scan_seconds = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for seed in range(args.seeds):
+            path = os.path.join(tmp_dir, f"events_{seed}.mp4")
+            ranges = make_event_video(path, args.seconds, args.fps, args.events, args.event_seconds, seed)
+            frame_count = int(args.seconds * args.fps)
+
+            interval = sample_interval(args.fps, frame_count, args.sample_rate)
+            uniform = apply_frame_budget(list(range(0, frame_count, interval)), args.max_frames)
+
+            start = time.perf_counter()
+            adaptive = adaptive_frame_indices(path, args.max_frames)
+            scan_seconds.append(time.perf_counter() - start)
+
+            totals["uniform"] += caught(uniform, ranges)
+            totals["adaptive"] += caught(adaptive, ranges)
+
+    events = args.events * args.seeds
+    print(f"{args.seeds} videos of {args.seconds:g}s with {args.events} events of {args.event_seconds:g}s, "
+          f"{args.max_frames} frames each")
+    for mode, count in totals.items():
+        print(f"{mode:<10} caught {count:3d}/{events} events ({count / events:.0%})")
+    print(f"scan time  {np.mean(scan_seconds):.3f}s per video")
+
+
+if __name__ == "__main__":
+    main()
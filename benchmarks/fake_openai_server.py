@@ -0,0 +1,335 @@
+"""
+A local stand-in for the OpenAI API, so the pipeline can be benchmarked end to end without network or cost.
+
+It implements `POST /v1/responses` and `POST /v1/audio/transcriptions`. Responses follow the JSON schema
+of the request, so every stage parses them like real ones. Latency is configurable, as a fixed delay per request
+plus a delay per uploaded megabyte.
+
+The Batch API is covered by `POST /v1/files`, `GET /v1/files/{id}/content`, `POST /v1/batches` and
+`GET /v1/batches/{id}`: a batch stays "in_progress" for `batch_delay` seconds, then its output file
+holds the answer to each request line.
+
+Usage:
+    python -m benchmarks.fake_openai_server [--port 8000] [--latency 0.5]
+
+    with FakeOpenAIServer(latency=0.2) as server:
+        client = OpenAI(api_key="sk-fake", base_url=server.url)
+"""
+
+import json
+import time
+import uuid
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRANSCRIPT_SENTENCE = "The quick brown fox jumps over the lazy dog while the cook seasons a thick steak."
+
+
+def sample_from_schema(schema: dict, array_items: int=5, label: str="value") -> object:
+    """
+    Build a value that matches a JSON schema, as a structured output would.
+
+    Args:
+        schema (dict): The JSON schema.
+        array_items (int): Number of items generated for each array.
+        label (str): Text used for generated strings.
+
+    Returns:
+        object: The generated value.
+    """
+
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: sample_from_schema(prop, array_items, name)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [sample_from_schema(schema.get("items", {}), array_items, f"{i}. {label} {i}") for i in range(1, array_items + 1)]
+    if kind in ("integer", "number"):
+        return 1
+    if kind == "boolean":
+        return True
+    return label
+
+
+class FakeOpenAIServer:
+    """
+    A threaded HTTP server answering like the OpenAI API, with counters of the requests it received.
+    """
+
+    def __init__(
+        self,
+        host: str="127.0.0.1",
+        port: int=0,
+        latency: float=0.0,
+        latency_per_mb: float=0.0,
+        transcript_words: int=150,
+        array_items: int=5,
+        batch_delay: float=0.0
+    ):
+        """
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on, a free one if 0.
+            latency (float): Delay added to every request, in seconds.
+            latency_per_mb (float): Delay added per megabyte of request body, in seconds.
+            transcript_words (int): Number of words of each transcription.
+            array_items (int): Number of items of each array in structured outputs.
+            batch_delay (float): Time a batch stays in progress before completing, in seconds.
+        """
+
+        self.latency = latency
+        self.latency_per_mb = latency_per_mb
+        self.transcript_words = transcript_words
+        self.array_items = array_items
+        self.batch_delay = batch_delay
+        self.stats = {"requests": {}, "bytes_received": 0}
+        self.files = {}
+        self.batches = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """The base URL to give to the OpenAI client."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _count(self, path: str, size: int) -> None:
+        with self._lock:
+            self.stats["requests"][path] = self.stats["requests"].get(path, 0) + 1
+            self.stats["bytes_received"] += size
+
+    def transcript(self) -> str:
+        words = TRANSCRIPT_SENTENCE.split()
+        return " ".join(words[i % len(words)] for i in range(self.transcript_words))
+
+    def segments(self, text: str) -> dict:
+        # The `verbose_json` fields: one segment per sentence length of words, spoken at 2.5 words per second
+        words = text.split()
+        size = len(TRANSCRIPT_SENTENCE.split())
+        segments = [
+            {
+                "id": index,
+                "start": round(start / 2.5, 3),
+                "end": round(min(start + size, len(words)) / 2.5, 3),
+                "text": " " + " ".join(words[start:start + size]),
+                "seek": 0, "tokens": [], "temperature": 0.0, "avg_logprob": -0.2,
+                "compression_ratio": 1.0, "no_speech_prob": 0.01
+            }
+            for index, start in enumerate(range(0, len(words), size))
+        ]
+        return {"language": "english", "duration": len(words) / 2.5, "segments": segments}
+
+    def respond(self, path: str, body: bytes, content_type: str="application/json") -> tuple[int, dict | bytes]:
+        """
+        Build the response of a request.
+
+        Args:
+            path (str): The request path.
+            body (bytes): The request body.
+            content_type (str): The request content type, for file uploads.
+
+        Returns:
+            tuple[int, dict | bytes]: The status code and JSON body, or the raw content of a file.
+        """
+
+        if path == "/v1/files":
+            return 200, self._upload(body, content_type)
+
+        if path == "/v1/batches":
+            return 200, self._create_batch(json.loads(body))
+
+        if path.startswith("/v1/files/") and path.endswith("/content"):
+            file_id = path.split("/")[3]
+            if file_id in self.files:
+                return 200, self.files[file_id]["content"]
+
+        if path.startswith("/v1/batches/") and path.split("/")[3] in self.batches:
+            return 200, self._batch(path.split("/")[3])
+
+        if path == "/v1/audio/transcriptions":
+            text = self.transcript()
+            response = {
+                "text": text,
+                "usage": {"type": "tokens", "input_tokens": len(body) // 1000, "output_tokens": len(text) // 4}
+            }
+            form = _form(body, content_type) if content_type.startswith("multipart/") else {}
+            if "response_format" in form and form["response_format"].get_content().strip() == "verbose_json":
+                response.update(self.segments(text))
+            return 200, response
+
+        if path == "/v1/responses":
+            request = json.loads(body)
+            schema = request.get("text", {}).get("format", {}).get("schema", {"type": "string"})
+            text = json.dumps(sample_from_schema(schema, self.array_items))
+            return 200, {
+                "id": f"resp_{time.monotonic_ns()}",
+                "object": "response",
+                "created_at": int(time.time()),
+                "status": "completed",
+                "model": request.get("model", "fake"),
+                "output": [{
+                    "id": "msg_fake",
+                    "type": "message",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}]
+                }],
+                "parallel_tool_calls": True,
+                "tool_choice": "auto",
+                "tools": [],
+                "usage": {
+                    "input_tokens": len(body) // 4,
+                    "input_tokens_details": {"cached_tokens": 0},
+                    "output_tokens": len(text) // 4,
+                    "output_tokens_details": {"reasoning_tokens": 0},
+                    "total_tokens": (len(body) + len(text)) // 4
+                }
+            }
+
+        return 404, {"error": {"message": f"Unknown path: {path}", "type": "invalid_request_error"}}
+
+    def _upload(self, body: bytes, content_type: str) -> dict:
+        # Keep the file part of a multipart upload
+        fields = _form(body, content_type)
+        upload = fields["file"]
+
+        file = {
+            "id": f"file-{uuid.uuid4().hex}",
+            "object": "file",
+            "bytes": len(upload.get_payload(decode=True)),
+            "created_at": int(time.time()),
+            "filename": upload.get_filename(),
+            "purpose": fields["purpose"].get_content().strip() if "purpose" in fields else "batch",
+            "status": "processed"
+        }
+        with self._lock:
+            self.files[file["id"]] = {**file, "content": upload.get_payload(decode=True)}
+        return file
+
+    def _create_batch(self, request: dict) -> dict:
+        # Answer every request line now, the output file is revealed once the batch delay has passed
+        lines = self.files[request["input_file_id"]]["content"].decode().splitlines()
+        output = []
+        for line in filter(None, map(str.strip, lines)):
+            entry = json.loads(line)
+            status, body = self.respond(entry["url"], json.dumps(entry["body"]).encode())
+            self._count(f"batch:{entry['url']}", len(line))
+            output.append({
+                "id": f"batch_req_{uuid.uuid4().hex}",
+                "custom_id": entry["custom_id"],
+                "response": {"status_code": status, "request_id": uuid.uuid4().hex, "body": body},
+                "error": None
+            })
+
+        output_file = {
+            "id": f"file-{uuid.uuid4().hex}",
+            "content": "".join(json.dumps(entry) + "\n" for entry in output).encode()
+        }
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "object": "batch",
+            "endpoint": request["endpoint"],
+            "completion_window": request["completion_window"],
+            "input_file_id": request["input_file_id"],
+            "created_at": int(time.time()),
+            "metadata": request.get("metadata"),
+            "request_counts": {"total": len(output), "completed": len(output), "failed": 0}
+        }
+        with self._lock:
+            self.files[output_file["id"]] = output_file
+            self.batches[batch["id"]] = {**batch, "output_file_id": output_file["id"], "ready_at": time.monotonic() + self.batch_delay}
+        return self._batch(batch["id"])
+
+    def _batch(self, batch_id: str) -> dict:
+        batch = dict(self.batches[batch_id])
+        done = time.monotonic() >= batch.pop("ready_at")
+        batch["status"] = "completed" if done else "in_progress"
+        batch["output_file_id"] = batch["output_file_id"] if done else None
+        return batch
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._handle(body)
+
+            def do_GET(self):
+                self._handle(b"")
+
+            def _handle(self, body: bytes):
+                path = self.path.split("?")[0]
+                server._count(path, len(body))
+
+                time.sleep(server.latency + server.latency_per_mb * len(body) / 1e6)
+                status, payload = server.respond(path, body, self.headers.get("Content-Type", "application/json"))
+
+                if isinstance(payload, bytes):
+                    data, content_type = payload, "application/octet-stream"
+                else:
+                    data, content_type = json.dumps(payload).encode(), "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _form(body: bytes, content_type: str) -> dict:
+    # The parts of a multipart form, keyed by field name
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    return {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay per request, in seconds")
+    parser.add_argument("--latency-per-mb", type=float, default=0.0, help="Delay per uploaded megabyte, in seconds")
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="Time a batch stays in progress, in seconds")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        args.host, args.port, latency=args.latency, latency_per_mb=args.latency_per_mb, batch_delay=args.batch_delay
+    )
+    print(f"Serving a fake OpenAI API on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
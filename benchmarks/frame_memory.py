@@ -0,0 +1,105 @@
+"""
+Compare the peak memory of object detection when every frame is encoded up front (the original behaviour)
+and when frames are streamed into the requests window by window, against the local fake OpenAI server.
+
+Usage:
+    python -m benchmarks.frame_memory [--seconds 300] [--sample-rate 2] [--window-size 10]
+
+Each mode runs in its own process, so the peak RSS of one does not hide the other's.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import subprocess
+import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI
+from benchmarks.synthetic_video import make_video
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from object_detection import object_detection, video_to_base64, build_object_detection_request
+
+MODES = ("legacy", "streaming")
+
+
+def legacy_object_detection(client: OpenAI, video_path: str, sample_rate: float, window_size: int, max_workers: int) -> None:
+    # The original implementation: encode every frame, then build each request with a data-URL copy of its images
+    base64_images = video_to_base64(video_path, sample_rate=sample_rate)
+    windows = [base64_images[i:i + window_size] for i in range(0, len(base64_images), window_size)]
+    requests = [build_object_detection_request(images, model="gpt-4.1") for images in windows]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda request: client.responses.create(**request), requests))
+
+
+def run_child(mode: str, video_path: str, url: str, sample_rate: float, window_size: int, max_workers: int) -> dict:
+    client = OpenAI(api_key="sk-benchmark", base_url=url, max_retries=0)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "legacy":
+        legacy_object_detection(client, video_path, sample_rate, window_size, max_workers)
+    else:
+        object_detection(
+            client, video_path, model="gpt-4.1", sample_rate=sample_rate, window_size=window_size, max_workers=max_workers
+        )
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_peak = rss_peak / (1024 * 1024) if sys.platform == "darwin" else rss_peak / 1024
+
+    return {"seconds": round(elapsed, 2), "python_peak_mb": round(python_peak / 1e6, 1), "rss_peak_mb": round(rss_peak, 1)}
+
+
+def measure(mode: str, video_path: str, url: str, args: argparse.Namespace) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.frame_memory", "--child", mode, "--video", video_path, "--url", url,
+            "--sample-rate", str(args.sample_rate), "--window-size", str(args.window_size), "--workers", str(args.workers)
+        ],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=300)
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--sample-rate", type=float, default=2)
+    parser.add_argument("--window-size", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.1, help="Fake API delay per request, in seconds")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--video", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.video, args.url, args.sample_rate, args.window_size, args.workers)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir, FakeOpenAIServer(latency=args.latency) as server:
+        video_path = make_video(os.path.join(tmp_dir, "synthetic.mp4"), args.seconds, args.fps, args.width, args.height)
+        frames = int(args.seconds * args.sample_rate)
+        print(f"{args.seconds:g}s {args.width}x{args.height}@{args.fps}fps, ~{frames} frames, window_size={args.window_size}")
+
+        for mode in MODES:
+            result = measure(mode, video_path, server.url, args)
+            print(f"{mode:<12} {result['seconds']:8.2f}s  python peak {result['python_peak_mb']:7.1f} MB  "
+                  f"peak RSS {result['rss_peak_mb']:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure the frames and bytes the quality gate saves, and what it costs, on a video with fades and blurred shots.
+
+Usage:
+    python -m benchmarks.frame_quality [--seconds 120] [--fps 10] [--sample-rate 0.5] [--max-edge 1024]
+
+The synthetic video alternates sharp shots with fades to black and defocused shots, for about a third of its length.
+Both runs send the same sampled frames to `stream_images`, with and without `quality_gate`.
+"""
+
+import os
+import cv2
+import time
+import argparse
+import tempfile
+import numpy as np
+from frame_processing import frame_quality
+from object_detection import sample_frames, stream_images
+
+
+def make_shot_video(path: str, seconds: float, fps: int, width: int=1280, height: int=720) -> None:
+    # Ten-second shots: sharp scenes, with a fade to black every third shot and a defocused shot every fifth
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    try:
+        for index in range(int(seconds * fps)):
+            shot, step = divmod(index, 10 * fps)
+            scene = np.full((height, width, 3), 60 + (shot * 37) % 120, dtype=np.uint8)
+            for _ in range(12):
+                x, y = (int(v) for v in rng.integers(0, (width - 100, height - 100)))
+                color = tuple(int(c) for c in rng.integers(0, 256, 3))
+                cv2.rectangle(scene, (x, y), (x + 100, y + 80), color, -1)
+            cv2.putText(scene, f"shot {shot}", (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 4)
+
+            if shot % 3 == 2:
+                scene = (scene * max(0.0, 1 - step / (3 * fps))).astype(np.uint8)
+            elif shot % 5 == 4:
+                scene = cv2.GaussianBlur(scene, (0, 0), 8)
+            writer.write(scene)
+    finally:
+        writer.release()
+
+
+def run(frames: list[np.ndarray], quality_gate: bool, max_edge: int) -> dict:
+    stats = {}
+    start = time.perf_counter()
+    images = list(stream_images(
+        "", frames=(img for img in frames), quality_gate=quality_gate, deduplicate=True, max_edge=max_edge, stats=stats
+    ))
+    return {"seconds": time.perf_counter() - start, "images": len(images), "bytes": sum(map(len, images)), **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--sample-rate", type=float, default=0.5)
+    parser.add_argument("--max-edge", type=int, default=1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "shots.mp4")
+        make_shot_video(path, args.seconds, args.fps)
+        frames = list(sample_frames(path, sample_rate=args.sample_rate))
+
+    start = time.perf_counter()
+    for img in frames:
+        frame_quality(img)
+    gate_ms = (time.perf_counter() - start) / len(frames) * 1000
+
+    baseline, gated = run(frames, False, args.max_edge), run(frames, True, args.max_edge)
+    print(f"{len(frames)} sampled frames, quality check {gate_ms:.2f} ms per frame")
+    for name, result in (("no gate", baseline), ("gate", gated)):
+        print(f"{name:<8} {result['images']:4d} images {result['bytes'] / 1024:8.0f} KiB {result['seconds']:6.2f}s")
+    print(f"saved    {baseline['images'] - gated['images']:4d} images "
+          f"{(baseline['bytes'] - gated['bytes']) / 1024:8.0f} KiB (estimated {gated['saved_bytes'] / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the streaming frame sampler with the original read-every-frame loop.
+
+Usage:
+    python -m benchmarks.frame_sampling [--seconds 60] [--fps 30] [--sample-rate 0.5]
+"""
+
+import os
+import cv2
+import time
+import base64
+import argparse
+import tempfile
+from benchmarks.synthetic_video import make_video
+from object_detection import iter_base64_frames
+
+
+def legacy_video_to_base64(video_path: str, sample_rate: float) -> list[str]:
+    # The original implementation: decode and retrieve every frame, keep one per interval
+    cap = cv2.VideoCapture(video_path)
+    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    sample_interval = max(1, min(int(fps / sample_rate), frame_count))
+
+    frame_index = 0
+    base64_images = []
+    while True:
+        ret, img = cap.read()
+        if not ret:
+            break
+        if frame_index % sample_interval == 0:
+            _, buffer = cv2.imencode('.jpg', img)
+            base64_images.append(base64.b64encode(buffer).decode("utf-8"))
+        frame_index += 1
+
+    cap.release()
+    return base64_images
+
+
+def bench(name: str, func, repeat: int) -> list[str]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<12} {best:8.3f}s  {len(frames):5d} frames")
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--sample-rate", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = make_video(os.path.join(tmp_dir, "synthetic.mp4"), args.seconds, args.fps, args.width, args.height)
+        print(f"{args.seconds:g}s {args.width}x{args.height}@{args.fps}fps, sample_rate={args.sample_rate}")
+
+        legacy = bench("legacy", lambda: legacy_video_to_base64(video_path, args.sample_rate), args.repeat)
+        streaming = bench("streaming", lambda: list(iter_base64_frames(video_path, args.sample_rate)), args.repeat)
+
+        assert legacy == streaming, "Samplers returned different frames"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare frame decoding and encoding in one process with worker processes splitting the video into time ranges.
+
+Usage:
+    python -m benchmarks.frame_workers [--seconds 300] [--sample-rate 2] [--workers 2 4 8]
+
+The speed-up is bounded by the number of CPU cores, and each run includes the start-up of its worker processes.
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from benchmarks.synthetic_video import make_video
+from object_detection import video_to_base64
+
+
+def bench(name: str, func, repeat: int) -> tuple[float, list[str]]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<12} {best:8.3f}s  {len(frames):5d} frames")
+    return best, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=300)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--sample-rate", type=float, default=2)
+    parser.add_argument("--max-edge", type=int, default=1024)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    options = {"sample_rate": args.sample_rate, "deduplicate": True, "max_edge": args.max_edge}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = make_video(os.path.join(tmp_dir, "synthetic.mp4"), args.seconds, args.fps, args.width, args.height)
+        print(f"{args.seconds:g}s {args.width}x{args.height}@{args.fps}fps, sample_rate={args.sample_rate}, "
+              f"{os.cpu_count()} CPU cores")
+
+        baseline, expected = bench("1 process", lambda: video_to_base64(video_path, **options), args.repeat)
+        for workers in args.workers:
+            elapsed, frames = bench(
+                f"{workers} workers", lambda: video_to_base64(video_path, workers=workers, **options), args.repeat
+            )
+            assert frames == expected, f"{workers} workers returned different frames"
+            print(f"{'':<12} {baseline / elapsed:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
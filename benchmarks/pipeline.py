@@ -0,0 +1,122 @@
+"""
+Run `openai_pipeline` end to end on synthetic videos against the local fake OpenAI server,
+and report per-stage wall time, throughput and memory.
+
+Usage:
+    python -m benchmarks.pipeline [--scenarios 10x640x360 60x1280x720] [--latency 0.2] [--single-pass] [--json results.json]
+
+Each scenario is SECONDSxWIDTHxHEIGHT. Nothing leaves the machine and no API key is needed.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from openai import OpenAI
+from benchmarks.synthetic_video import make_video
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from main import openai_pipeline
+from metrics import RunMetrics
+
+
+def parse_scenario(text: str) -> tuple[float, int, int]:
+    seconds, width, height = text.lower().split("x")
+    return float(seconds), int(width), int(height)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(server: FakeOpenAIServer, video_path: str, seconds: float, max_workers: int, single_pass: bool=False) -> dict:
+    """
+    Run the pipeline once and collect its metrics report, with throughput and memory added.
+
+    Args:
+        server (FakeOpenAIServer): The running fake server.
+        video_path (str): The synthetic video.
+        seconds (float): Duration of the video.
+        max_workers (int): Maximum number of stages running at the same time.
+        single_pass (bool): Read the video once for all stages, see `media_ingest.MediaIngest`.
+
+    Returns:
+        dict: The metrics report with `throughput` per stage, `python_peak_mb` and `rss_peak_mb`.
+    """
+
+    client = OpenAI(api_key="sk-benchmark", base_url=server.url, max_retries=0)
+    metrics = RunMetrics(labels={"video": os.path.basename(video_path)})
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    openai_pipeline(
+        "sk-benchmark", video_path, max_workers=max_workers, client=client, metrics=metrics, single_pass=single_pass
+    )
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = metrics.report()
+    report["wall_seconds"] = round(elapsed, 3)
+    report["python_peak_mb"] = round(python_peak / 1e6, 1)
+    report["rss_peak_mb"] = round(peak_rss_mb(), 1)
+
+    stages = report["stages"]
+    report["throughput"] = {
+        "transcription_realtime": round(seconds / stages["transcription"]["wall_seconds"], 1),
+        "objects_frames_per_second": round(stages["objects"]["images"] / stages["objects"]["wall_seconds"], 1),
+        "upload_mb_per_second": round(report["totals"]["upload_bytes"] / 1e6 / elapsed, 2)
+    }
+
+    return report
+
+
+def print_report(name: str, report: dict) -> None:
+    print(f"\n{name}: {report['wall_seconds']:.2f}s total, "
+          f"python peak {report['python_peak_mb']} MB, process peak RSS {report['rss_peak_mb']} MB")
+    print(f"  {'stage':<14}{'wall s':>8}{'api s':>8}{'calls':>7}{'images':>8}{'upload MB':>11}{'tokens in':>11}")
+    for stage, counters in report["stages"].items():
+        print(
+            f"  {stage:<14}{counters['wall_seconds']:>8.2f}{counters['api_seconds']:>8.2f}{counters['api_calls']:>7}"
+            f"{counters['images']:>8}{counters['upload_bytes'] / 1e6:>11.2f}{counters['input_tokens']:>11}"
+        )
+    print("  " + ", ".join(f"{key}={value}" for key, value in report["throughput"].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=["10x640x360", "60x1280x720", "300x1280x720"])
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake API delay per request, in seconds")
+    parser.add_argument("--latency-per-mb", type=float, default=0.05, help="Fake API delay per uploaded megabyte")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--single-pass", action="store_true", help="Read each video once for all stages")
+    parser.add_argument("--json", help="Write every report to this JSON file, to compare runs")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            FakeOpenAIServer(latency=args.latency, latency_per_mb=args.latency_per_mb) as server:
+        for scenario in args.scenarios:
+            seconds, width, height = parse_scenario(scenario)
+            video_path = make_video(os.path.join(tmp_dir, f"{scenario}.mp4"), seconds, args.fps, width, height, audio=True)
+            results[scenario] = run_scenario(server, video_path, seconds, args.workers, args.single_pass)
+            print_report(f"{seconds:g}s {width}x{height}@{args.fps}fps", results[scenario])
+
+        print(f"\nFake server: {server.stats}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
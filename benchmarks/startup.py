@@ -0,0 +1,76 @@
+"""
+Measure the startup cost of `main.py` in each mode with `python -X importtime`.
+
+Usage:
+    python -m benchmarks.startup [--repeat 5]
+
+Each mode runs in a fresh interpreter, from an empty directory so no `.env` file is loaded:
+
+- help: `main.py --help`, which exits before any stage module is imported.
+- invalid env: `main.py` without an API key, which fails in `load_env`.
+- a stage selection: the imports `main.py --stages ...` makes before its stages start.
+- eager: every stage module and moviepy, which is what `import main` used to cost.
+
+The import time is the sum of the self times of every module reported by `-X importtime`.
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The imports of a run with these stages, before the first stage starts
+PRELOAD = "import main; main._load('OpenAI', *(name for stage in {stages} for name in main._STAGE_IMPORTS[stage]))"
+
+MODES = {
+    "help": [os.path.join(ROOT, "main.py"), "--help"],
+    "invalid env": [os.path.join(ROOT, "main.py")],
+    "transcription qa": ["-c", PRELOAD.format(stages=("transcription", "qa"))],
+    "objects": ["-c", PRELOAD.format(stages=("objects",))],
+    "all stages": ["-c", PRELOAD.format(stages=("transcription", "objects", "sentiment", "qa"))],
+    "eager": ["-c", "import main, moviepy; main._load(*main._LAZY_IMPORTS)"]
+}
+
+HEAVY = ("openai", "cv2", "moviepy")
+
+
+def measure(args: list[str], cwd: str) -> tuple[float, float, list[str]]:
+    # Run one interpreter, returning its wall time, its import time (both in ms) and the heavy packages it imported
+    env = {**os.environ, "PYTHONPATH": ROOT, "OPENAI_API_KEY": "", "VIDEO_PATH": ""}
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - start) * 1000
+
+    import_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        import_us += int(self_us)
+        loaded.add(name.strip().split(".")[0])
+
+    return wall, import_us / 1000, [package for package in HEAVY if package in loaded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<18}{'wall ms':>9}{'import ms':>11}  heavy imports")
+    with tempfile.TemporaryDirectory() as cwd:
+        for mode, mode_args in MODES.items():
+            runs = [measure(mode_args, cwd) for _ in range(args.repeat)]
+            wall = statistics.median(run[0] for run in runs)
+            imports = statistics.median(run[1] for run in runs)
+            print(f"{mode:<18}{wall:>9.0f}{imports:>11.0f}  {', '.join(runs[-1][2]) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import cv2
+import subprocess
+import numpy as np
+from imageio_ffmpeg import get_ffmpeg_exe
+
+
+def make_video(path: str, seconds: float=10, fps: int=30, width: int=640, height: int=360, audio: bool=False) -> str:
+    """
+    Write a synthetic test video: a moving gradient with a bouncing square and a frame counter.
+    With `audio`, a tone of changing pitch is muxed in so the transcription stage has a track to extract.
+
+    Args:
+        path (str): The output `.mp4` path. Parent directories are created if needed.
+        seconds (float): Duration of the video.
+        fps (int): Frames per second.
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+        audio (bool): Whether to add an audio track.
+
+    Returns:
+        str: The path of the written video.
+
+    Raises:
+        RuntimeError: If the video writer cannot be opened.
+        subprocess.CalledProcessError: If ffmpeg fails to add the audio track.
+    """
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    video_path = f"{path}.video.mp4" if audio else path
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Cannot open the video writer: {video_path}")
+
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    size = max(8, min(width, height) // 6)
+
+    try:
+        for index in range(int(seconds * fps)):
+            shift = index * 2
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[..., 0] = (x + shift) % 256
+            frame[..., 1] = (y + shift) % 256
+            frame[..., 2] = 128
+
+            # Bouncing square, so consecutive frames differ
+            left = (index * 7) % max(1, width - size)
+            top = (index * 5) % max(1, height - size)
+            frame[top:top + size, left:left + size] = (255, 255, 255)
+            cv2.putText(frame, str(index), (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+
+            writer.write(frame)
+
+    finally:
+        writer.release()
+
+    if audio:
+        try:
+            subprocess.run([
+                get_ffmpeg_exe(), "-y", "-loglevel", "error", "-i", video_path,
+                "-f", "lavfi", "-i", f"sine=frequency=220:beep_factor=4:duration={seconds}",
+                "-c:v", "copy", "-c:a", "aac", "-shortest", path
+            ], check=True)
+        finally:
+            os.remove(video_path)
+
+    return path
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import logging
+import threading
+from result_cache import file_digest, text_digest
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    Per-video record of the stage outputs of a pipeline run, saved to a JSON file as each stage completes,
+    so a rerun after a failure or an interruption only executes the stages that are missing or failed.
+    Safe to share between the threads running the stages.
+    """
+
+    def __init__(self, path: str, video_path: str | None=None):
+        """
+        Args:
+            path (str): The JSON checkpoint file. It is loaded if it exists; parent directories are created if needed.
+            video_path (str, optional): The video the checkpoint belongs to, kept for inspection.
+        """
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {"video_path": video_path, "stages": {}}
+
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    self._data = json.load(file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+
+        if video_path is not None:
+            self._data["video_path"] = video_path
+
+    def get(self, stage: str, options: dict | None=None) -> str | None:
+        """
+        Look up the output of a completed stage.
+
+        Args:
+            stage (str): The stage name.
+            options (dict, optional): The options the stage runs with, like its output format.
+                An output saved with other options is not returned.
+
+        Returns:
+            str | None: The saved output, or None if the stage has not completed yet, failed or ran with other options.
+        """
+
+        with self._lock:
+            entry = self._data["stages"].get(stage)
+        if not entry or entry["status"] != "ok":
+            return None
+        if entry.get("options") != _options_digest(options):
+            logger.info(f"Ignoring the checkpoint of stage '{stage}', saved with other options")
+            return None
+        return entry["output"]
+
+    def completed(self) -> list[str]:
+        """
+        The names of the completed stages.
+
+        Returns:
+            list[str]: The stages whose output is saved, in completion order.
+        """
+
+        with self._lock:
+            return [stage for stage, entry in self._data["stages"].items() if entry["status"] == "ok"]
+
+    def set(self, stage: str, output: str, options: dict | None=None) -> None:
+        """
+        Save the output of a completed stage.
+
+        Args:
+            stage (str): The stage name.
+            output (str): The stage output.
+            options (dict, optional): The options the stage ran with, see `get`.
+        """
+
+        self._update(stage, {"status": "ok", "output": output, "options": _options_digest(options)})
+
+    def fail(self, stage: str, error: BaseException) -> None:
+        """
+        Record that a stage failed, replacing any output saved for it.
+
+        Args:
+            stage (str): The stage name.
+            error (BaseException): The error raised by the stage.
+        """
+
+        self._update(stage, {"status": "error", "error": f"{type(error).__name__}: {error}"})
+
+    def _update(self, stage: str, entry: dict) -> None:
+        with self._lock:
+            # Re-insert, so the stages are kept in completion order
+            self._data["stages"].pop(stage, None)
+            self._data["stages"][stage] = {**entry, "updated": time.time()}
+
+            # Write then rename, so an interruption never leaves a partial checkpoint
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self._data, file, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+
+def _options_digest(options: dict | None) -> str | None:
+    # Stage options are compared by digest, so any JSON-serialisable value can be used
+    return text_digest(json.dumps(options, sort_keys=True)) if options is not None else None
+
+
+def open_checkpoint(directory: str, video_path: str) -> Checkpoint:
+    """
+    Open the checkpoint of a video in a directory of checkpoints.
+    Checkpoints are named after the digest of the video's content, so a moved or renamed video
+    resumes from its checkpoint and a modified one starts over.
+
+    Args:
+        directory (str): The directory holding the checkpoints.
+        video_path (str): The path of the video file.
+
+    Returns:
+        Checkpoint: The checkpoint of the video, empty if it has never been run.
+
+    Raises:
+        OSError: If the video cannot be read.
+    """
+
+    return Checkpoint(os.path.join(directory, f"{file_digest(video_path)}.json"), video_path=video_path)
@@ -0,0 +1,382 @@
+import cv2
+import logging
+import numpy as np
+from typing import Callable, Iterable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Frames are compared on tiny grayscale thumbnails, which is cheap and ignores compression noise
+HASH_SIZE = 8
+HISTOGRAM_BINS = 32
+# Minimum brightness step between adjacent thumbnail pixels that sets a hash bit,
+# so flat regions hash to stable zeros instead of flickering with noise
+HASH_MARGIN = 2
+
+# Frame quality is measured on a grayscale thumbnail of this longest edge, so the thresholds do not depend on the resolution
+QUALITY_EDGE = 256
+# Below this variance of the Laplacian, a frame is too blurred to show objects (motion blur, defocus, flat fades)
+BLUR_THRESHOLD = 20.0
+# A frame outside this mean brightness and below this histogram entropy, in bits (0 to 8), is almost uniformly
+# black or white; dark scenes and white backgrounds with varied content pass
+BRIGHTNESS_RANGE = (16.0, 240.0)
+ENTROPY_THRESHOLD = 1.0
+
+
+def frame_signature(img: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute a compact signature of a frame used to detect near-duplicates.
+
+    Args:
+        img (np.ndarray): A BGR (or grayscale) frame.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: A tuple containing:
+            - hash (np.ndarray): The 64-bit difference hash (dHash) as a boolean array.
+            - histogram (np.ndarray): The normalised grayscale histogram.
+    """
+
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # dHash: compare horizontally adjacent pixels of a (HASH_SIZE + 1) x HASH_SIZE thumbnail
+    thumb = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA).astype(np.int16)
+    dhash = (thumb[:, 1:] - thumb[:, :-1] > HASH_MARGIN).ravel()
+
+    small = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA)
+    histogram = np.bincount((small // (256 // HISTOGRAM_BINS)).ravel(), minlength=HISTOGRAM_BINS)
+
+    return dhash, histogram / histogram.sum()
+
+
+def frame_difference(a: tuple[np.ndarray, np.ndarray], b: tuple[np.ndarray, np.ndarray]) -> tuple[int, float]:
+    """
+    Compare two frame signatures.
+
+    Args:
+        a (tuple[np.ndarray, np.ndarray]): A signature returned by `frame_signature`.
+        b (tuple[np.ndarray, np.ndarray]): Another signature returned by `frame_signature`.
+
+    Returns:
+        tuple[int, float]: A tuple containing:
+            - hash_distance (int): The number of differing hash bits (0 to 64).
+            - histogram_distance (float): Half the L1 distance between histograms (0 to 1).
+    """
+
+    return int(np.count_nonzero(a[0] != b[0])), float(np.abs(a[1] - b[1]).sum() / 2)
+
+
+def deduplicate_frames(
+    frames: Iterable[T],
+    hash_threshold: int=6,
+    histogram_threshold: float=0.1,
+    stats: dict[str, int] | None=None,
+    signature: Callable[[T], tuple[np.ndarray, np.ndarray]]=frame_signature
+) -> Iterator[T]:
+    """
+    Lazily drop frames that are near-duplicates of the last kept frame.
+    A frame is dropped only if both its hash distance and histogram distance from the last kept frame
+    are at or below the thresholds, so a change in either structure or tone keeps the frame.
+
+    Args:
+        frames (Iterable[T]): The sampled BGR frames, in order.
+        hash_threshold (int): Maximum dHash distance, in bits, of a duplicate (0 to 64).
+        histogram_threshold (float): Maximum histogram distance of a duplicate (0 to 1).
+        stats (dict[str, int], optional): If given, "sampled" and "duplicates" counters are added to it.
+        signature (Callable, optional): Returns the signature of an item. `frame_signature` by default;
+            items can also carry a signature computed elsewhere, like in a worker process.
+
+    Returns:
+        Iterator[T]: A generator of the kept frames.
+
+    Raises:
+        ValueError: If a threshold is negative.
+    """
+
+    if hash_threshold < 0 or histogram_threshold < 0:
+        raise ValueError("Thresholds must be greater than or equal to 0")
+
+    stats = stats if stats is not None else {}
+    stats.setdefault("sampled", 0)
+    stats.setdefault("duplicates", 0)
+
+    def select() -> Iterator[T]:
+        last = None
+        for img in frames:
+            stats["sampled"] += 1
+            current = signature(img)
+            if last is not None:
+                hash_distance, histogram_distance = frame_difference(last, current)
+                if hash_distance <= hash_threshold and histogram_distance <= histogram_threshold:
+                    stats["duplicates"] += 1
+                    continue
+            last = current
+            yield img
+
+    return select()
+
+
+def frame_quality(img: np.ndarray) -> tuple[float, float, float]:
+    """
+    Measure how much a frame can show, on a grayscale thumbnail of `QUALITY_EDGE` pixels.
+
+    Args:
+        img (np.ndarray): A BGR (or grayscale) frame.
+
+    Returns:
+        tuple[float, float, float]: A tuple containing:
+            - sharpness (float): The variance of the Laplacian, low for blurred frames.
+            - brightness (float): The mean gray level (0 to 255).
+            - entropy (float): The entropy of the gray level histogram, in bits (0 to 8).
+    """
+
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = resize_frame(gray, QUALITY_EDGE)
+
+    sharpness = float(cv2.Laplacian(small, cv2.CV_64F).var())
+    histogram = np.bincount(small.ravel(), minlength=256) / small.size
+    brightness = float(histogram @ np.arange(256))
+    probabilities = histogram[histogram > 0]
+    entropy = float(-(probabilities * np.log2(probabilities)).sum())
+
+    return sharpness, brightness, entropy
+
+
+def filter_low_quality(
+    frames: Iterable[T],
+    blur_threshold: float=BLUR_THRESHOLD,
+    brightness_range: tuple[float, float]=BRIGHTNESS_RANGE,
+    entropy_threshold: float=ENTROPY_THRESHOLD,
+    stats: dict[str, int] | None=None,
+    quality: Callable[[T], tuple[float, float, float]]=frame_quality
+) -> Iterator[T]:
+    """
+    Lazily drop frames that are blurred, or almost uniformly black or white, like fade transitions.
+    If every frame is dropped, the one with the most entropy is still yielded at the end,
+    so a dark or soft video keeps one frame for object detection.
+
+    Args:
+        frames (Iterable[T]): The sampled BGR frames, in order.
+        blur_threshold (float): Minimum variance of the Laplacian of a kept frame.
+        brightness_range (tuple[float, float]): Mean brightness range of a kept frame, unless its entropy is
+            at least `entropy_threshold`.
+        entropy_threshold (float): Minimum histogram entropy, in bits, of a kept frame outside `brightness_range`.
+        stats (dict[str, int], optional): If given, a "low_quality" counter is added to it.
+        quality (Callable, optional): Returns the quality of an item. `frame_quality` by default;
+            items can also carry a quality measured elsewhere, like in a worker process.
+
+    Returns:
+        Iterator[T]: A generator of the kept frames.
+
+    Raises:
+        ValueError: If a threshold is negative or the brightness range is empty.
+    """
+
+    if blur_threshold < 0 or entropy_threshold < 0:
+        raise ValueError("Thresholds must be greater than or equal to 0")
+    if brightness_range[0] > brightness_range[1]:
+        raise ValueError("brightness_range must be a (minimum, maximum) pair")
+
+    stats = stats if stats is not None else {}
+    stats.setdefault("low_quality", 0)
+
+    def select() -> Iterator[T]:
+        kept = 0
+        best, best_entropy = None, -1.0
+        for img in frames:
+            sharpness, brightness, entropy = quality(img)
+            exposed = brightness_range[0] <= brightness <= brightness_range[1]
+            if sharpness < blur_threshold or (not exposed and entropy < entropy_threshold):
+                stats["low_quality"] += 1
+                if not kept and entropy > best_entropy:
+                    best, best_entropy = img, entropy
+                continue
+            kept += 1
+            yield img
+
+        if not kept and best is not None:
+            stats["low_quality"] -= 1
+            yield best
+
+    return select()
+
+
+def drop_covered_frames(frames: Iterable[T], detect: Callable[[T], set[str]], stats: dict[str, int] | None=None) -> Iterator[T]:
+    """
+    Lazily drop frames whose objects, found by a local detector, were all found in earlier kept frames.
+    Frames where the detector finds nothing are kept, since the vision model may recognise what the detector cannot.
+
+    Args:
+        frames (Iterable[T]): The sampled BGR frames, in order.
+        detect (Callable[[T], set[str]]): Returns the labels of the objects in a frame, like `local_detector.DnnDetector`.
+        stats (dict[str, int], optional): If given, a "covered" counter is added to it.
+
+    Returns:
+        Iterator[T]: A generator of the kept frames.
+    """
+
+    stats = stats if stats is not None else {}
+    stats.setdefault("covered", 0)
+
+    def select() -> Iterator[T]:
+        seen = set()
+        for img in frames:
+            labels = detect(img)
+            if labels and labels <= seen:
+                stats["covered"] += 1
+                continue
+            seen |= labels
+            yield img
+
+    return select()
+
+
+def apply_frame_budget(items: list[T], max_frames: int | None, stats: dict[str, int] | None=None) -> list[T]:
+    """
+    Keep at most `max_frames` items, evenly spread over the sequence.
+
+    Args:
+        items (list[T]): The frames (or encoded frames) in order.
+        max_frames (int, optional): The frame budget. No limit if None.
+        stats (dict[str, int], optional): If given, an "over_budget" counter is added to it.
+
+    Returns:
+        list[T]: The selected items, in order.
+
+    Raises:
+        ValueError: If `max_frames` is less than or equal to 0.
+    """
+
+    if max_frames is not None and max_frames <= 0:
+        raise ValueError("max_frames must be greater than 0")
+
+    if max_frames is None or len(items) <= max_frames:
+        selected = items
+    else:
+        indices = np.linspace(0, len(items) - 1, max_frames).round().astype(int)
+        selected = [items[i] for i in indices]
+
+    if stats is not None:
+        stats["over_budget"] = stats.get("over_budget", 0) + len(items) - len(selected)
+
+    return selected
+
+
+def thin_frames(items: Iterable[T], max_frames: int, stats: dict[str, int] | None=None) -> list[T]:
+    """
+    Streaming version of `apply_frame_budget` that holds at most `2 * max_frames` items at a time,
+    so memory is bounded by the budget rather than the length of the video.
+    Every other buffered item is dropped whenever the buffer overflows, which keeps the buffer evenly spread;
+    the budget is then applied to the buffer. Up to `2 * max_frames` items, the result is the same as `apply_frame_budget`.
+
+    Args:
+        items (Iterable[T]): The frames (or encoded frames) in order.
+        max_frames (int): The frame budget.
+        stats (dict[str, int], optional): If given, an "over_budget" counter is added to it.
+
+    Returns:
+        list[T]: The selected items, in order.
+
+    Raises:
+        ValueError: If `max_frames` is less than or equal to 0.
+    """
+
+    if max_frames <= 0:
+        raise ValueError("max_frames must be greater than 0")
+
+    buffer = []
+    stride = 1
+    count = 0
+    for index, item in enumerate(items):
+        count += 1
+        if index % stride:
+            continue
+        buffer.append(item)
+        if len(buffer) > 2 * max_frames:
+            # The buffer holds the items at multiples of `stride`; keep the multiples of twice the stride
+            buffer = buffer[::2]
+            stride *= 2
+
+    selected = apply_frame_budget(buffer, max_frames)
+    if stats is not None:
+        stats["over_budget"] = stats.get("over_budget", 0) + count - len(selected)
+
+    return selected
+
+
+def resize_frame(img: np.ndarray, max_edge: int | None) -> np.ndarray:
+    """
+    Downscale a frame so that its longest edge is at most `max_edge` pixels, keeping the aspect ratio.
+    Frames that are already small enough are returned unchanged.
+
+    Args:
+        img (np.ndarray): A BGR frame.
+        max_edge (int, optional): Maximum length of the longest edge. No resizing if None.
+
+    Returns:
+        np.ndarray: The (possibly) downscaled frame.
+
+    Raises:
+        ValueError: If `max_edge` is less than or equal to 0.
+    """
+
+    if max_edge is None:
+        return img
+    if max_edge <= 0:
+        raise ValueError("max_edge must be greater than 0")
+
+    height, width = img.shape[:2]
+    scale = max_edge / max(height, width)
+    if scale >= 1:
+        return img
+
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def make_contact_sheets(frames: Iterable[np.ndarray], grid: tuple[int, int], tile_edge: int=512) -> Iterator[np.ndarray]:
+    """
+    Lazily pack consecutive frames into contact sheets, so several frames are sent as one image.
+    Frames fill each sheet left to right, top to bottom; the last sheet is cropped to its used rows.
+
+    Args:
+        frames (Iterable[np.ndarray]): The BGR frames, in order. All frames are scaled to the size of the first one.
+        grid (tuple[int, int]): Number of (columns, rows) per sheet.
+        tile_edge (int): Longest edge of each tile, in pixels.
+
+    Returns:
+        Iterator[np.ndarray]: A generator of contact sheets.
+
+    Raises:
+        ValueError: If the grid or `tile_edge` is not positive.
+    """
+
+    columns, rows = grid
+    if columns <= 0 or rows <= 0 or tile_edge <= 0:
+        raise ValueError("grid and tile_edge must be greater than 0")
+
+    def pack() -> Iterator[np.ndarray]:
+        sheet = None
+        count = 0
+        for img in frames:
+            tile = resize_frame(img, tile_edge)
+            if sheet is None:
+                tile_height, tile_width = tile.shape[:2]
+                sheet = np.zeros((rows * tile_height, columns * tile_width, 3), dtype=np.uint8)
+            elif tile.shape[:2] != (tile_height, tile_width):
+                tile = cv2.resize(tile, (tile_width, tile_height), interpolation=cv2.INTER_AREA)
+
+            row, column = divmod(count, columns)
+            sheet[row * tile_height:(row + 1) * tile_height, column * tile_width:(column + 1) * tile_width] = tile
+            count += 1
+
+            if count == columns * rows:
+                yield sheet
+                sheet = np.zeros_like(sheet)
+                count = 0
+
+        if count:
+            used_rows = -(-count // columns)
+            yield sheet[:used_rows * tile_height]
+
+    return pack()
@@ -0,0 +1,132 @@
+import os
+import cv2
+import logging
+import threading
+import numpy as np
+from result_cache import text_digest
+
+logger = logging.getLogger(__name__)
+
+
+class DnnDetector:
+    """
+    Local object detector run on the CPU with OpenCV's DNN module, used to skip frames whose objects
+    were already seen before they are sent to the vision model, see `frame_processing.drop_covered_frames`.
+
+    The model must produce SSD-style detections, an array of shape (1, 1, N, 7) where each row is
+    (image, class id, confidence, x1, y1, x2, y2), like the MobileNet-SSD Caffe and TensorFlow models.
+    A network is not thread-safe, so calls are serialised and one detector can be shared by several videos.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        config: str | None=None,
+        labels: list[str] | None=None,
+        confidence: float=0.5,
+        input_size: tuple[int, int]=(300, 300),
+        scale: float=1 / 127.5,
+        mean: tuple[float, float, float]=(127.5, 127.5, 127.5),
+        swap_rb: bool=False
+    ):
+        """
+        Args:
+            model (str): The weights file, in any format read by `cv2.dnn.readNet` (.caffemodel, .pb, .onnx...).
+            config (str, optional): The network description file, like a .prototxt or .pbtxt, if the format needs one.
+            labels (list[str], optional): The label of each class id. Class ids are used as labels if None.
+            confidence (float): Minimum confidence of a detection, 0 to 1.
+            input_size (tuple[int, int]): The (width, height) the frames are resized to.
+            scale (float): Multiplier of the pixel values, applied after subtracting `mean`.
+            mean (tuple[float, float, float]): Value subtracted from each channel.
+            swap_rb (bool): Convert the BGR frames to RGB.
+
+        Raises:
+            ValueError: If `confidence` is out of range.
+            RuntimeError: If the model cannot be loaded.
+        """
+
+        if not 0 <= confidence <= 1:
+            raise ValueError("confidence must be between 0 and 1")
+
+        try:
+            self.net = cv2.dnn.readNet(model, config or "")
+        except cv2.error as e:
+            raise RuntimeError(f"Cannot load the detector model: {model}") from e
+
+        self.model = model
+        self.config = config
+        self.labels = labels
+        self.confidence = confidence
+        self.input_size = input_size
+        self.scale = scale
+        self.mean = mean
+        self.swap_rb = swap_rb
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        # Identifies the detector in cache keys, so it includes every parameter that changes the labels of a frame
+        labels = text_digest("\n".join(self.labels))[:12] if self.labels else None
+        # Full paths, so same-named models of different directories do not share cached results
+        config = os.path.abspath(self.config) if self.config else None
+        return (
+            f"DnnDetector({os.path.abspath(self.model)!r}, config={config!r}, labels={labels!r}, "
+            f"confidence={self.confidence}, input_size={tuple(self.input_size)}, scale={self.scale}, "
+            f"mean={tuple(self.mean)}, swap_rb={self.swap_rb})"
+        )
+
+    def __call__(self, img: np.ndarray) -> set[str]:
+        """
+        Detect the objects in a frame.
+
+        Args:
+            img (np.ndarray): A BGR frame.
+
+        Returns:
+            set[str]: The labels of the objects detected with at least `confidence`.
+        """
+
+        blob = cv2.dnn.blobFromImage(img, self.scale, self.input_size, self.mean, swapRB=self.swap_rb, crop=False)
+        with self._lock:
+            self.net.setInput(blob)
+            detections = self.net.forward().reshape(-1, 7)
+
+        class_ids = detections[detections[:, 2] >= self.confidence, 1].astype(int)
+        return {
+            self.labels[class_id] if self.labels and 0 <= class_id < len(self.labels) else str(class_id)
+            for class_id in np.unique(class_ids)
+        }
+
+
+def load_detector(model: str, labels_path: str | None=None, **options) -> DnnDetector:
+    """
+    Load a `DnnDetector`, finding its network description next to the weights.
+
+    Args:
+        model (str): The weights file.
+        labels_path (str, optional): A text file with the label of each class id, one per line.
+        **options: The other arguments of `DnnDetector`.
+
+    Returns:
+        DnnDetector: The detector.
+
+    Raises:
+        RuntimeError: If the model or the labels cannot be loaded.
+    """
+
+    if "config" not in options:
+        base = os.path.splitext(model)[0]
+        options["config"] = next(
+            (base + extension for extension in (".prototxt", ".pbtxt") if os.path.exists(base + extension)), None
+        )
+
+    labels = None
+    if labels_path:
+        try:
+            with open(labels_path, encoding="utf-8") as file:
+                labels = [line.strip() for line in file]
+        except OSError as e:
+            raise RuntimeError(f"Cannot read the detector labels: {labels_path}") from e
+
+    detector = DnnDetector(model, labels=labels, **options)
+    logger.info(f"Loaded local detector {detector}")
+    return detector
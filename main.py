@@ -1,13 +1,22 @@
 import os
 import json
 import logging
+import argparse
+import importlib
 import mimetypes
-from openai import OpenAI
 from dotenv import load_dotenv
-from video_transcript import video_transcript
-from object_detection import object_detection
-from sentiment_analysis import sentiment_analysis
-from question_answer import question_answer
+from itertools import chain
+from typing import TYPE_CHECKING, Callable, Iterable
+from timed_transcript import TimedTranscript
+from checkpoint import Checkpoint, open_checkpoint
+from stage_scheduler import run_stages
+from result_cache import ResultCache, file_digest, text_digest, make_key
+from metrics import RunMetrics, export_reports
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from media_ingest import MediaIngest
+    from request_scheduler import RequestScheduler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +26,131 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+# The stage modules and their heavy dependencies (openai, cv2, moviepy) are imported on first use, see `__getattr__`,
+# so an invalid environment fails before paying for them and a run only imports the modules of its stages
+_LAZY_IMPORTS = {
+    "OpenAI": "openai",
+    "video_transcript": "video_transcript",
+    "build_transcription_request": "video_transcript",
+    "object_detection": "object_detection",
+    "build_object_detection_request": "object_detection",
+    "sentiment_analysis": "sentiment_analysis",
+    "build_sentiment_request": "sentiment_analysis",
+    "question_answer": "question_answer",
+    "build_question_answer_request": "question_answer",
+    "transcript_analysis": "transcript_analysis",
+    "build_transcript_analysis_request": "transcript_analysis",
+    "MediaIngest": "media_ingest",
+    "adaptive_frames": "adaptive_sampling",
+    "load_detector": "local_detector",
+    "RequestScheduler": "request_scheduler",
+    "get_scheduler": "request_scheduler",
+    "set_scheduler": "request_scheduler"
+}
+
+# The names used by each stage
+_STAGE_IMPORTS = {
+    "transcription": ("video_transcript", "build_transcription_request"),
+    "objects": ("object_detection", "build_object_detection_request"),
+    "sentiment": ("sentiment_analysis", "build_sentiment_request"),
+    "qa": ("question_answer", "build_question_answer_request"),
+    "analysis": ("transcript_analysis", "build_transcript_analysis_request")
+}
+
+# The stages that can be selected from the command line
+STAGES = ("transcription", "objects", "sentiment", "qa")
+
+# Models and frame selection used by the pipeline stages
+TRANSCRIPTION_MODEL = "whisper-1"
+RESPONSES_MODEL = "gpt-4.1"
+TRANSCRIPTION_CHUNK_SECONDS = 600
+ANALYSIS_CHUNK_TOKENS = 16000
+SAMPLE_RATE = 0.5
+IMAGE_DETAIL = "auto"
+WINDOW_SIZE = 20
+
+# Frame selection and encoding options of object detection, see `object_detection.stream_images`.
+# Every filter is off, so each sampled frame is sent at full size; callers opt in with `frame_options`
+FRAME_OPTIONS = {
+    "quality_gate": False,
+    "deduplicate": False,
+    "max_frames": None,
+    "max_edge": None,
+    "jpeg_quality": None,
+    "contact_sheet": None,
+    "workers": None
+}
+
+# Frame budget of adaptive sampling when `max_frames` is not set
+ADAPTIVE_MAX_FRAMES = 40
+
+
+def __getattr__(name: str):
+    # Import a lazily loaded name on first access, and keep it as a module global for the next lookups
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def _load(*names: str) -> None:
+    # Function bodies look names up in the module globals without calling `__getattr__`, so load them first.
+    # Names already set, like test doubles, are left untouched
+    for name in names:
+        if name not in globals():
+            __getattr__(name)
+
+
+def load_api_key() -> str:
+    """
+    This function loads the `.env` file from the current working directory (if present)
+    and retrieves the OpenAI API key from the environment.
+
+    Returns:
+        str: The OpenAI API key for authentication.
+
+    Raises:
+        RuntimeError: If `OPENAI_API_KEY` is missing.
+    """
+
+    # Load .env
+    load_dotenv()
+
+    # Load and validate api key
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing OPENAI_API_KEY. Check `.env` file or environment variables")
+
+    return api_key
+
+
+def validate_video_path(video_path: str) -> str:
+    """
+    Check that a video file exists and has a supported type.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+
+    Returns:
+        str: The validated video path.
+
+    Raises:
+        FileNotFoundError: If the specified video file does not exist.
+        ValueError: If the file type is unsupported.
+    """
+
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+
+    # Check file type
+    mime_type, _ = mimetypes.guess_type(video_path)
+    if not mime_type or not mime_type.startswith("video/"):
+        raise ValueError(f"Unsupported file type: {mime_type}")
+
+    return video_path
+
 
 def load_env() -> tuple[str, str]:
     """
@@ -35,37 +169,293 @@ def load_env() -> tuple[str, str]:
         ValueError: If the file type is unsupported.
     """
 
-    # Load .env
-    load_dotenv()
-
-    # Load and validate api key
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("Missing OPENAI_API_KEY. Check `.env` file or environment variables")
+    api_key = load_api_key()
 
     # Load and validate video path
     video_path = os.getenv("VIDEO_PATH")
     if not video_path:
         raise RuntimeError("Missing VIDEO_PATH. Check `.env` file or environment variables")
-    if not os.path.exists(video_path):
-        raise FileNotFoundError(f"Video file not found: {video_path}")
 
-    # Check file type
-    mime_type, _ = mimetypes.guess_type(video_path)
-    if not mime_type or not mime_type.startswith("video/"):
-        raise ValueError(f"Unsupported file type: {mime_type}")
+    return api_key, validate_video_path(video_path)
+
+
+def load_cache() -> ResultCache | None:
+    """
+    Build the result cache from environment variables, if enabled.
+
+    Environment:
+        PIPELINE_CACHE_PATH: SQLite file of the cache. The cache is disabled if unset.
+        PIPELINE_CACHE_MAX_MB: Maximum total size of the cached results, in megabytes.
+        PIPELINE_CACHE_TTL: Maximum age of a cached result, in seconds.
+        PIPELINE_CACHE_BYPASS: Set to "1" or "true" to ignore cached results and refresh them.
+
+    Returns:
+        ResultCache | None: The configured cache, or None if caching is disabled.
+
+    Raises:
+        ValueError: If a numeric setting is invalid.
+    """
+
+    path = os.getenv("PIPELINE_CACHE_PATH")
+    if not path:
+        return None
+
+    max_mb = os.getenv("PIPELINE_CACHE_MAX_MB")
+    ttl = os.getenv("PIPELINE_CACHE_TTL")
+
+    return ResultCache(
+        path,
+        max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None,
+        ttl=float(ttl) if ttl else None,
+        bypass=os.getenv("PIPELINE_CACHE_BYPASS", "").lower() in ("1", "true")
+    )
+
+
+def make_client(api_key: str) -> "OpenAI":
+    """
+    Create the OpenAI client of the pipeline stages.
+    The client does not retry on its own: retries are left to the shared request scheduler, see `load_scheduler`.
+
+    Args:
+        api_key (str): The OpenAI API key for authentication.
+
+    Returns:
+        OpenAI: The client.
+    """
+
+    _load("OpenAI")
+    return OpenAI(api_key=api_key, max_retries=0)
+
+
+def load_scheduler() -> "RequestScheduler":
+    """
+    Build the shared request scheduler from environment variables.
+
+    Environment:
+        PIPELINE_MAX_RETRIES: Maximum number of retries of a failed request (default 5).
+        PIPELINE_RPM: Requests per minute allowed by the account. Unlimited if unset.
+        PIPELINE_TPM: Tokens per minute allowed by the account. Unlimited if unset.
+
+    Returns:
+        RequestScheduler: The configured scheduler.
+
+    Raises:
+        ValueError: If a numeric setting is invalid.
+    """
+
+    rpm = os.getenv("PIPELINE_RPM")
+    tpm = os.getenv("PIPELINE_TPM")
+
+    _load("RequestScheduler")
+    return RequestScheduler(
+        max_retries=int(os.getenv("PIPELINE_MAX_RETRIES", "5")),
+        requests_per_minute=float(rpm) if rpm else None,
+        tokens_per_minute=float(tpm) if tpm else None
+    )
+
+
+def _transcribe(timestamps: bool, **kwargs) -> str:
+    # Stage outputs are strings, so a timed transcription is kept as the JSON of its columns
+    transcript = video_transcript(timestamps=timestamps, **kwargs)
+    return transcript.to_json() if timestamps else transcript
+
+
+def _cached(
+    cache: ResultCache | None,
+    stage: str,
+    content_hash: Callable[[], str],
+    model: str,
+    request: dict,
+    compute: Callable[[], str]
+) -> str:
+    # Run the stage directly, or through the cache keyed by input, stage, model, prompt and schema
+    if cache is None:
+        return compute()
+
+    key = make_key(stage=stage, content_hash=content_hash(), model=model, request=request)
+    return cache.get_or_compute(key, compute, stage=stage)
+
+
+def _checkpointed(
+    checkpoint: Checkpoint | None, name: str, fn: Callable, force: bool, options: dict | None=None
+) -> Callable:
+    # Restore the stage from the checkpoint unless it is forced or saved with other options, and save its output or failure
+    if checkpoint is None:
+        return fn
+
+    def run(**results):
+        output = None if force else checkpoint.get(name, options)
+        if output is not None:
+            logger.info(f"Stage '{name}' restored from checkpoint")
+            return output
+
+        try:
+            output = fn(**results)
+        except Exception as e:
+            checkpoint.fail(name, e)
+            raise
+
+        checkpoint.set(name, output, options)
+        return output
+
+    return run
+
+
+def _with_dependents(stages: dict[str, tuple], names: Iterable[str]) -> set[str]:
+    # Add every stage that depends, directly or not, on one of `names`, since its input would change
+    selected = set(names)
+    unknown = selected - stages.keys()
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+
+    changed = True
+    while changed:
+        dependents = {name for name, (deps, _) in stages.items() if selected.intersection(deps)}
+        changed = not dependents <= selected
+        selected |= dependents
+
+    return selected
+
+
+def _with_dependencies(stages: dict[str, tuple], names: Iterable[str]) -> set[str]:
+    # Add every stage that one of `names` depends on, directly or not, since it needs its output
+    selected = set(names)
+    unknown = selected - stages.keys()
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+
+    pending = list(selected)
+    while pending:
+        for dep in stages[pending.pop()][0]:
+            if dep not in selected:
+                selected.add(dep)
+                pending.append(dep)
+
+    return selected
+
+
+def _releasing(ingest: "MediaIngest | None", fn: Callable) -> Callable:
+    # Let the demux pass complete the audio if the stage did not read the frames
+    if ingest is None:
+        return fn
+
+    def run(**results):
+        try:
+            return fn(**results)
+        finally:
+            ingest.discard_frames()
+
+    return run
+
+
+def _instrumented(metrics: RunMetrics | None, name: str, fn: Callable) -> Callable:
+    # Time the stage and attribute its API calls, tokens and uploads to it
+    if metrics is None:
+        return fn
+
+    def run(**results):
+        with metrics.stage(name):
+            return fn(**results)
+
+    return run
+
+
+def format_output(results: dict[str, str]) -> dict:
+    """
+    Merge the raw stage outputs into the final output structure of the pipeline.
+    
+    Args:
+        results (dict[str, str]): The raw output of each stage, keyed by
+            "transcription", "objects", and either "sentiment" and "qa" or the combined "analysis",
+            and optionally "segments", the JSON timestamp columns of the transcription.
+            Sections of the stages missing from `results` are left out of the output.
+    
+    Returns:
+        dict: The merged output, see `openai_pipeline` for its structure.
     
-    return api_key, video_path
+    Raises:
+        Exception: Propagates any error raised while parsing the JSON stage outputs.
+    """
+
+    try:
+        # Split the combined analysis into the sentiment and Q&A outputs
+        results = dict(results)
+        if "analysis" in results:
+            analysis = json.loads(results.pop("analysis"))
+            results["sentiment"] = json.dumps({key: analysis[key] for key in ("mode", "sentiment", "explanation")})
+            results["qa"] = json.dumps({"QA_pairs": analysis.get("QA_pairs", [])})
+
+        # Merge and format output
+        sections = {
+            "Transcription": ("transcription", lambda output: output),
+            "Objects": ("objects", lambda output: json.loads(output).get("objects", [])),
+            "Mode and sentiment": ("sentiment", json.loads),
+            "Q&A pairs": ("qa", lambda output: json.loads(output).get("QA_pairs", [])),
+            "Segments": ("segments", json.loads)
+        }
+        merged = {
+            section: parse(results[stage]) for section, (stage, parse) in sections.items() if stage in results
+        }
+
+    except Exception:
+        logger.exception("Unexpected error occurred while merging and formatting output")
+        raise
+
+    return merged
 
 
-def openai_pipeline(api_key: str, video_path: str) -> dict:
+def openai_pipeline(
+    api_key: str,
+    video_path: str,
+    max_workers: int=4,
+    timings: dict[str, float] | None=None,
+    client: "OpenAI | None"=None,
+    cache: ResultCache | None=None,
+    combined_analysis: bool=False,
+    metrics: RunMetrics | None=None,
+    single_pass: bool=False,
+    checkpoint: Checkpoint | None=None,
+    force_stages: Iterable[str]=(),
+    only_stages: Iterable[str] | None=None,
+    timestamps: bool=False,
+    adaptive_sampling: bool=False,
+    detector: Callable | None=None,
+    frame_options: dict | None=None
+) -> dict:
     """
     This function orchestrates the complete video parsing pipeline.
-    Each stage is executed sequentially and logged for traceability.
+    Stages run concurrently according to their dependencies: transcription and object detection
+    start together, and sentiment analysis and Q&A generation start once the transcription is ready.
     
     Args:
         api_key (str): The OpenAI API key for authentication.
         video_path (str): The path of the video file to be processed.
+        max_workers (int): Maximum number of stages running at the same time.
+        timings (dict[str, float], optional): If given, filled with the wall time in seconds of each stage.
+        client (OpenAI, optional): A shared client to reuse across videos. Created from `api_key` if omitted.
+        cache (ResultCache, optional): Cache of stage outputs. Stages whose input, model, prompt and schema
+            are unchanged are served from the cache instead of calling the API again.
+        combined_analysis (bool): Analyse mode and sentiment and generate Q&A pairs in a single request,
+            which sends the transcription once instead of twice. The output structure is unchanged.
+            Transcriptions longer than `ANALYSIS_CHUNK_TOKENS` are still analysed in chunks by both stages.
+        metrics (RunMetrics, optional): If given, filled with the wall time, API calls and latency, token usage,
+            images and uploaded bytes of each stage, see `RunMetrics.report`.
+        single_pass (bool): Read the video once for transcription and object detection, see `MediaIngest`,
+            instead of letting each stage open it. Useful when the video is on network storage.
+        checkpoint (Checkpoint, optional): Saves each stage's output as it completes. Stages already completed
+            by a previous run are restored from it instead of being executed again, see `open_checkpoint`.
+        force_stages (Iterable[str]): Stages executed again even if the checkpoint has their output,
+            together with the stages that depend on them.
+        only_stages (Iterable[str], optional): Execute only these stages and the stages they depend on,
+            like ["transcription", "objects"]. The output then only has the sections of the executed stages.
+        timestamps (bool): Transcribe with segment timestamps, added to the output as "Segments", the columns
+            `start`, `end` (seconds) and `offset` (index of the segment in the transcription), see `TimedTranscript`.
+        adaptive_sampling (bool): Spend the frame budget (`max_frames`, or `ADAPTIVE_MAX_FRAMES`) where the picture changes
+            or the audio is loud instead of sampling at `SAMPLE_RATE`, see `adaptive_sampling.adaptive_frames`.
+        detector (Callable, optional): A local detector, like `local_detector.DnnDetector`. Frames whose objects
+            it has already seen in the video are not sent to the vision model. Can be shared between videos.
+        frame_options (dict, optional): Frame selection and encoding options of object detection overriding
+            `FRAME_OPTIONS`, like {"deduplicate": True, "max_frames": 40, "max_edge": 1024}.
     
     Returns:
         dict: A dictionary with the following structure:
@@ -80,73 +470,239 @@ def openai_pipeline(api_key: str, video_path: str) -> dict:
                 "Q&A pairs": [             # Convert video's transcript to list of QA pairs about the video
                     {"Q": <str>, "A": <str>},
                     ...
-                ]
+                ],
+                "Segments": {              # Only with `timestamps`
+                    "start": <list[float]>, "end": <list[float]>, "offset": <list[int]>
+                }
             }
     Raises:
+        ValueError: If `force_stages` or `only_stages` names an unknown stage.
         Exception: Propagates any unexpected error that occurs during execution.
     """
     
     # Initialise the client
-    client = OpenAI(api_key=api_key)
+    if client is None:
+        client = make_client(api_key)
 
-    try:
+    # Share one demux pass, and one content hash, between the stages reading the video
+    if single_pass:
+        _load("MediaIngest")
+    ingest = MediaIngest(video_path, sample_rate=SAMPLE_RATE) if single_pass else None
+    video_digest = ingest.digest if ingest else lambda: file_digest(video_path)
+
+    frame_options = {**FRAME_OPTIONS, **(frame_options or {})}
+
+    # Frames chosen by activity, or sampled at a fixed rate by the shared demux pass or by object detection itself
+    if adaptive_sampling:
+        _load("adaptive_frames")
+        frames = lambda: adaptive_frames(video_path, max_frames=frame_options["max_frames"] or ADAPTIVE_MAX_FRAMES)
+    else:
+        frames = lambda: ingest.frames() if ingest else None
+
+    # With timestamps, the transcription stage outputs the JSON of a `TimedTranscript` and the text stages read its text
+    transcript_text = (lambda output: TimedTranscript.from_json(output).text) if timestamps else (lambda output: output)
+
+    # The worker count does not change the frames, so it does not invalidate cached or checkpointed results
+    frame_key = {key: value for key, value in frame_options.items() if key != "workers"}
+
+    # Options that change the output of a stage, so a checkpoint saved with others is not restored
+    stage_options = {
+        "transcription": {"timestamps": timestamps},
+        "objects": {
+            "adaptive_sampling": adaptive_sampling, "frame_options": frame_key,
+            "detector": repr(detector) if detector is not None else None
+        }
+    }
+
+    # Declare each stage together with the stages it depends on
+    stages = {
         # Get the complete transcription
-        transcription = video_transcript(client=client, video_path=video_path, model="whisper-1")
-        logger.info("Transcription is complete")
+        "transcription": ((), lambda: _cached(
+            cache, "transcription", video_digest, TRANSCRIPTION_MODEL,
+            {
+                "chunk_seconds": TRANSCRIPTION_CHUNK_SECONDS,
+                **build_transcription_request(model=TRANSCRIPTION_MODEL, timestamps=timestamps)
+            },
+            lambda: _transcribe(
+                client=client, video_path=video_path, model=TRANSCRIPTION_MODEL, chunk_seconds=TRANSCRIPTION_CHUNK_SECONDS,
+                ingest=ingest, timestamps=timestamps
+            )
+        )),
 
         # Detect objects in the video
-        objects = object_detection(client=client, video_path=video_path, model="gpt-4.1", sample_rate=0.5)
-        logger.info("Object detection is complete")
+        "objects": ((), lambda: _cached(
+            cache, "objects", video_digest, RESPONSES_MODEL,
+            {
+                "sample_rate": SAMPLE_RATE,
+                "frame_options": frame_key,
+                "window_size": WINDOW_SIZE,
+                **({"sampling": "adaptive"} if adaptive_sampling else {}),
+                **({"detector": repr(detector)} if detector is not None else {}),
+                **build_object_detection_request(base64_images=[], model=RESPONSES_MODEL, detail=IMAGE_DETAIL)
+            },
+            lambda: object_detection(
+                client=client, video_path=video_path, model=RESPONSES_MODEL, sample_rate=SAMPLE_RATE,
+                detail=IMAGE_DETAIL, window_size=WINDOW_SIZE, frames=frames(), detector=detector,
+                **frame_options
+            )
+        )),
 
         # Analyse the mode and sentiment of the video
-        mode_sentiment = sentiment_analysis(client=client, transcription=transcription, model="gpt-4.1")
-        logger.info("Mode and sentiment analysis are complete")
+        "sentiment": (("transcription",), lambda transcription: _cached(
+            cache, "sentiment", lambda: text_digest(transcript_text(transcription)), RESPONSES_MODEL,
+            {"max_tokens": ANALYSIS_CHUNK_TOKENS, **build_sentiment_request(transcription="", model=RESPONSES_MODEL)},
+            lambda: sentiment_analysis(
+                client=client, transcription=transcript_text(transcription), model=RESPONSES_MODEL,
+                max_tokens=ANALYSIS_CHUNK_TOKENS
+            )
+        )),
 
         # Generate Q&A pairs
-        qa_pairs = question_answer(client=client, transcription=transcription, model="gpt-4.1")
-        logger.info("Q&A pairs generation is complete")
+        "qa": (("transcription",), lambda transcription: _cached(
+            cache, "qa", lambda: text_digest(transcript_text(transcription)), RESPONSES_MODEL,
+            {"max_tokens": ANALYSIS_CHUNK_TOKENS, **build_question_answer_request(transcription="", model=RESPONSES_MODEL)},
+            lambda: question_answer(
+                client=client, transcription=transcript_text(transcription), model=RESPONSES_MODEL,
+                max_tokens=ANALYSIS_CHUNK_TOKENS
+            )
+        ))
+    }
 
-    except Exception:
-        logger.exception("Unexpected error occurred while parsing video")
-        raise
+    # Replace sentiment analysis and Q&A generation with one combined request
+    if combined_analysis:
+        del stages["sentiment"], stages["qa"]
+        stages["analysis"] = (("transcription",), lambda transcription: _cached(
+            cache, "analysis", lambda: text_digest(transcript_text(transcription)), RESPONSES_MODEL,
+            {"max_tokens": ANALYSIS_CHUNK_TOKENS, **build_transcript_analysis_request(transcription="", model=RESPONSES_MODEL)},
+            lambda: transcript_analysis(
+                client=client, transcription=transcript_text(transcription), model=RESPONSES_MODEL,
+                max_tokens=ANALYSIS_CHUNK_TOKENS
+            )
+        ))
+
+    if only_stages is not None:
+        selected = _with_dependencies(stages, only_stages)
+        stages = {name: stage for name, stage in stages.items() if name in selected}
+    _load(*chain.from_iterable(_STAGE_IMPORTS[name] for name in stages))
+
+    forced = _with_dependents(stages, force_stages)
+    stages = {
+        name: (deps, _instrumented(
+            metrics, name, _checkpointed(checkpoint, name, fn, name in forced, stage_options.get(name))
+        ))
+        for name, (deps, fn) in stages.items()
+    }
+
+    # The audio of the shared pass is complete once its frames are read, so the objects stage reading them
+    # needs a worker of its own next to the transcription, and they are discarded up front if nothing reads them
+    if ingest is not None and "objects" in stages and not adaptive_sampling:
+        stages["objects"] = (stages["objects"][0], _releasing(ingest, stages["objects"][1]))
+        if "transcription" in stages and max_workers < 2:
+            logger.info("Running 2 stages at the same time, so the single pass can read the frames and the audio together")
+            max_workers = 2
+    elif ingest is not None:
+        ingest.discard_frames()
+
+    stage_timings = {} if timings is None else timings
 
     try:
-        # Merge and format output
-        merge_output = {
-            "Transcription": transcription,
-            "Objects": json.loads(objects).get("objects", []),
-            "Mode and sentiment": json.loads(mode_sentiment),
-            "Q&A pairs": json.loads(qa_pairs).get("QA_pairs", [])
-        }
+        results = run_stages(stages, max_workers=max_workers, timings=stage_timings)
+        logger.info(
+            "All stages are complete: "
+            + ", ".join(f"{name}={elapsed:.2f}s" for name, elapsed in stage_timings.items())
+        )
 
     except Exception:
-        logger.exception("Unexpected error occurred while merging and formatting output")
+        logger.exception("Unexpected error occurred while parsing video")
         raise
 
-    return merge_output
+    # Split the timed transcription into its text and its timestamp columns
+    if timestamps and "transcription" in results:
+        columns = TimedTranscript.from_json(results["transcription"]).to_dict()
+        results = {**results, "transcription": columns.pop("text"), "segments": json.dumps(columns)}
+
+    return format_output(results)
 
 
-def main():
+def main(argv: list[str] | None=None):
     """
     Main entry point for execution.
     The function serves as the top-level orchestration layer,
     all lower-level exceptions are propagated upward and logged here.
+    The environment is validated before the stage modules are imported, and only the modules of the selected
+    stages are imported, so an invalid run fails fast and a partial run starts faster.
+
+    Args:
+        argv (list[str], optional): Command line arguments, defaults to `sys.argv[1:]`.
     
     Logging:
-        - INFO: Prints the final formatted JSON output.
+        - INFO: Prints the final formatted JSON output and the per-stage metrics report.
         - EXCEPTION: Captures full traceback information if a fatal error occurs.
     
+    Environment:
+        PIPELINE_METRICS_PATH: If set, the metrics report is exported to this file, see `metrics.export_reports`.
+        PIPELINE_CHECKPOINT_DIR: If set, stage outputs are checkpointed in this directory and a rerun resumes
+            from them, see `checkpoint.open_checkpoint`.
+        PIPELINE_FORCE_STAGES: Comma-separated stages to execute again despite their checkpoint, like "qa,sentiment".
+        PIPELINE_TIMESTAMPS: `1`/`true` to add the segment timestamps of the transcription to the output.
+        PIPELINE_ADAPTIVE_SAMPLING: `1`/`true` to select frames by visual change and audio energy.
+        PIPELINE_DETECTOR_MODEL: If set, the weights of a local OpenCV DNN detector used to skip frames
+            whose objects were already seen, see `local_detector.load_detector`.
+        PIPELINE_DETECTOR_LABELS: A text file with the label of each class id of the detector, one per line.
+    
     Raises:
         Exception: Any unexpected error that occurs during execution.
     
     Example:
         >>> if __name__ == "__main__":
         ...     main()
+
+        $ python main.py --stages transcription qa
+        $ python main.py --deduplicate --quality-gate --max-frames 40 --max-edge 1024 --jpeg-quality 80
     """
+
+    parser = argparse.ArgumentParser(description="Transcribe a video, detect its objects and analyse its transcription.")
+    parser.add_argument(
+        "--stages", nargs="+", choices=STAGES, metavar="STAGE",
+        help=f"Run only these stages and the stages they depend on, among {', '.join(STAGES)} (default: all)"
+    )
+    frames = parser.add_argument_group("object detection frames", "Filters and encoding of the frames, all off by default")
+    frames.add_argument("--deduplicate", action="store_true", help="Drop frames that are near-duplicates of the last kept frame")
+    frames.add_argument("--quality-gate", action="store_true", help="Drop blurred frames and almost uniformly black or white ones")
+    frames.add_argument("--max-frames", type=int, help="Maximum number of frames sent to the vision model")
+    frames.add_argument("--max-edge", type=int, help="Longest edge of each image sent, in pixels")
+    frames.add_argument("--jpeg-quality", type=int, help="JPEG quality of each image sent, from 0 to 100")
+    args = parser.parse_args(argv)
     
     try:
         api_key, video_path = load_env()
-        merge_output = openai_pipeline(api_key, video_path)
+        _load("get_scheduler", "set_scheduler")
+        set_scheduler(load_scheduler())
+        metrics = RunMetrics(labels={"video": video_path})
+        checkpoint_dir = os.getenv("PIPELINE_CHECKPOINT_DIR")
+        detector_model = os.getenv("PIPELINE_DETECTOR_MODEL")
+        if detector_model:
+            _load("load_detector")
+        merge_output = openai_pipeline(
+            api_key, video_path, cache=load_cache(), metrics=metrics,
+            checkpoint=open_checkpoint(checkpoint_dir, video_path) if checkpoint_dir else None,
+            force_stages=[name.strip() for name in os.getenv("PIPELINE_FORCE_STAGES", "").split(",") if name.strip()],
+            only_stages=args.stages,
+            timestamps=os.getenv("PIPELINE_TIMESTAMPS", "").lower() in ("1", "true"),
+            adaptive_sampling=os.getenv("PIPELINE_ADAPTIVE_SAMPLING", "").lower() in ("1", "true"),
+            detector=load_detector(detector_model, os.getenv("PIPELINE_DETECTOR_LABELS")) if detector_model else None,
+            frame_options={
+                "deduplicate": args.deduplicate, "quality_gate": args.quality_gate, "max_frames": args.max_frames,
+                "max_edge": args.max_edge, "jpeg_quality": args.jpeg_quality
+            }
+        )
+        logger.info(f"Requests: {get_scheduler().stats()}")
+
+        # Report and export the metrics of the run
+        report = metrics.report()
+        logger.info(f"Metrics: {json.dumps(report)}")
+        if os.getenv("PIPELINE_METRICS_PATH"):
+            export_reports([report], os.getenv("PIPELINE_METRICS_PATH"))
         
         # Format JSON output
         json_output = json.dumps(merge_output, indent=4, ensure_ascii=False).replace(',\n    "', ',\n\n    "')
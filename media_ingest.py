@@ -0,0 +1,289 @@
+import io
+import os
+import re
+import logging
+import threading
+import subprocess
+import numpy as np
+from typing import Iterator
+from imageio_ffmpeg import get_ffmpeg_exe
+from result_cache import file_digest
+from video_transcript import AUDIO_SAMPLE_RATE, AUDIO_ENCODER_ARGS, AUDIO_BUFFER_NAME
+from object_detection import sample_interval
+
+logger = logging.getLogger(__name__)
+
+# Stream information printed by ffmpeg for its input
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO_STREAM = re.compile(r"Stream #\d+:\d+.*?: Video: .*")
+_AUDIO_STREAM = re.compile(r"Stream #\d+:\d+.*?: Audio: ")
+_SIZE = re.compile(r", (\d+)x(\d+)[ ,]")
+_FPS = re.compile(r", (\d+(?:\.\d+)?) (?:fps|tbr)")
+_ROTATION = re.compile(r"rotation of -?(90|270)\.00 degrees")
+
+
+def probe(video_path: str) -> dict:
+    """
+    Read the metadata of a video from its container header, without decoding it.
+
+    Args:
+        video_path (str): The path of the video file.
+
+    Returns:
+        dict: `duration` (seconds), `fps`, `frame_count`, `width` and `height` (after rotation) of the first
+            video stream, and `has_audio`.
+
+    Raises:
+        RuntimeError: If the file cannot be opened or has no video stream.
+    """
+
+    # Without an output, ffmpeg prints the input information and exits with an error
+    header = subprocess.run(
+        [get_ffmpeg_exe(), "-hide_banner", "-nostdin", "-i", video_path], capture_output=True
+    ).stderr.decode(errors="replace")
+
+    duration = _DURATION.search(header)
+    video = _VIDEO_STREAM.search(header)
+    if duration is None or video is None:
+        raise RuntimeError(f"Cannot open the video file: {video_path}")
+
+    hours, minutes, seconds = duration.groups()
+    size = _SIZE.search(video.group())
+    fps = _FPS.search(video.group())
+    if size is None or fps is None:
+        raise RuntimeError(f"Invalid video metadata: {video.group().strip()}")
+
+    width, height = int(size.group(1)), int(size.group(2))
+    # ffmpeg applies the rotation of the display matrix when decoding
+    if _ROTATION.search(header):
+        width, height = height, width
+
+    metadata = {
+        "duration": int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+        "fps": float(fps.group(1)),
+        "width": width,
+        "height": height,
+        "has_audio": _AUDIO_STREAM.search(header) is not None
+    }
+    metadata["frame_count"] = int(round(metadata["duration"] * metadata["fps"]))
+    return metadata
+
+
+class MediaIngest:
+    """
+    Read a video once for every stage of the pipeline: the container is probed once, and a single ffmpeg pass
+    demuxes and decodes it into the audio track for transcription and the sampled frames for object detection.
+
+    The pass starts on the first call to `frames` or `audio`. The audio is complete once every frame has been read,
+    so the stage that owns the frames must consume them or call `discard_frames` (closing the `frames` generator
+    does it).
+    """
+
+    def __init__(self, video_path: str, sample_rate: float=0.5):
+        """
+        Args:
+            video_path (str): The path of the video file to be processed.
+            sample_rate (float): Number of frames sampled per second (must be > 0).
+
+        Raises:
+            ValueError: If `sample_rate` is less than or equal to 0.
+        """
+
+        if sample_rate <= 0:
+            raise ValueError("sample_rate must be greater than 0")
+
+        self.video_path = video_path
+        self.sample_rate = sample_rate
+        self._metadata = None
+        self._digest = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._frames_fd = None
+        self._frames_claimed = False
+        self._frames_discarded = False
+        self._audio = None
+        self._error = None
+        self._done = threading.Event()
+
+    def metadata(self) -> dict:
+        """
+        The metadata of the video, probed on first use, see `probe`.
+        """
+
+        with self._lock:
+            if self._metadata is None:
+                self._metadata = probe(self.video_path)
+            return self._metadata
+
+    def digest(self) -> str:
+        """
+        The content hash of the video, computed on first use, see `result_cache.file_digest`.
+        """
+
+        with self._lock:
+            if self._digest is None:
+                self._digest = file_digest(self.video_path)
+            return self._digest
+
+    def _start(self, for_frames: bool) -> None:
+        # Start the ffmpeg pass, once. Frames are decoded unless they were discarded before the pass started.
+        metadata = self.metadata()
+
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            with_frames = for_frames or not self._frames_discarded
+
+            command = [get_ffmpeg_exe(), "-nostdin", "-loglevel", "error", "-i", self.video_path]
+            pass_fds = ()
+
+            if metadata["has_audio"]:
+                command += [
+                    "-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), *AUDIO_ENCODER_ARGS, "pipe:1"
+                ]
+
+            if with_frames:
+                # Keep the same frame indices as `object_detection.sample_frames`
+                interval = sample_interval(int(metadata["fps"]), metadata["frame_count"], self.sample_rate)
+                read_fd, write_fd = os.pipe()
+                pass_fds = (write_fd,)
+                command += [
+                    "-map", "0:v:0", "-an", "-vf", f"select=not(mod(n\\,{interval}))", "-fps_mode", "passthrough",
+                    "-f", "rawvideo", "-pix_fmt", "bgr24", f"pipe:{write_fd}"
+                ]
+
+            if not metadata["has_audio"] and not with_frames:
+                self._done.set()
+                return
+
+            logger.info("Demuxing video...")
+            process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, pass_fds=pass_fds
+            )
+            if with_frames:
+                os.close(write_fd)
+                self._frames_fd = read_fd
+
+        threading.Thread(target=self._collect, args=(process,), name="media-ingest", daemon=True).start()
+
+    def _collect(self, process: subprocess.Popen) -> None:
+        # Read the encoded audio and the errors until ffmpeg exits
+        audio, error = process.communicate()
+        if process.returncode != 0:
+            self._error = RuntimeError(f"ffmpeg failed to demux the video: {error.decode(errors='replace').strip()}")
+        self._audio = audio
+        self._done.set()
+
+    def frames(self) -> Iterator[np.ndarray]:
+        """
+        Stream the sampled frames of the video, decoded by the shared ffmpeg pass.
+        Frames can only be streamed once, and the pass starts when the first frame is requested.
+
+        Returns:
+            Iterator[np.ndarray]: A generator of BGR frames, in presentation order.
+
+        Raises:
+            RuntimeError:
+                - If the frames were already streamed or discarded.
+                - If ffmpeg fails to decode the video.
+        """
+
+        def read() -> Iterator[np.ndarray]:
+            with self._lock:
+                if self._frames_claimed:
+                    raise RuntimeError("The frames were already streamed or discarded")
+                self._frames_claimed = True
+
+            self._start(for_frames=True)
+            metadata = self.metadata()
+            height, width = metadata["height"], metadata["width"]
+            frame_bytes = width * height * 3
+
+            pipe = open(self._frames_fd, "rb")
+            try:
+                logger.info("Sampling video...")
+                while len(data := pipe.read(frame_bytes)) == frame_bytes:
+                    yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+
+                self._done.wait()
+                if self._error is not None:
+                    raise self._error
+
+            finally:
+                # Let ffmpeg finish the audio even if the consumer stopped early
+                threading.Thread(target=_drain, args=(pipe,), name="media-ingest-drain", daemon=True).start()
+
+        return read()
+
+    def discard_frames(self) -> None:
+        """
+        Declare that the frames are not needed, so the audio does not wait for them to be read.
+        Does nothing if the frames were already streamed.
+        """
+
+        with self._lock:
+            if self._frames_claimed:
+                return
+            self._frames_claimed = self._frames_discarded = True
+            fd = self._frames_fd
+
+        if fd is not None:
+            threading.Thread(target=_drain, args=(open(fd, "rb"),), name="media-ingest-drain", daemon=True).start()
+
+    def audio(self, start: float | None=None, end: float | None=None) -> io.BytesIO:
+        """
+        Return the audio track, or a section of it, as 16 kHz mono Opus, waiting for the ffmpeg pass to finish.
+        Sections are cut from the audio held in memory, without reading the video again.
+
+        Args:
+            start (float, optional): Start of the section, in seconds.
+            end (float, optional): End of the section, in seconds.
+
+        Returns:
+            io.BytesIO: The encoded audio, named `audio.ogg` so the API can infer its format.
+
+        Raises:
+            RuntimeError:
+                - If the video has no audio track.
+                - If ffmpeg fails to decode the video or cut the section.
+        """
+
+        if not self.metadata()["has_audio"]:
+            raise RuntimeError(f"The video has no audio track: {self.video_path}")
+
+        self._start(for_frames=False)
+        self._done.wait()
+
+        if self._error is not None:
+            raise self._error
+
+        audio = self._audio
+        if start or end is not None:
+            audio = _cut_audio(audio, start, end)
+
+        buffer = io.BytesIO(audio)
+        buffer.name = AUDIO_BUFFER_NAME
+        return buffer
+
+
+def _drain(pipe: io.BufferedReader) -> None:
+    with pipe:
+        while pipe.read(1 << 20):
+            pass
+
+
+def _cut_audio(audio: bytes, start: float | None, end: float | None) -> bytes:
+    # Copy the Opus packets of the section into a new Ogg stream, without re-encoding
+    command = [get_ffmpeg_exe(), "-nostdin", "-loglevel", "error"]
+    if start:
+        command += ["-ss", f"{start:.3f}"]
+    command += ["-i", "pipe:0"]
+    if end is not None:
+        command += ["-t", f"{end - (start or 0):.3f}"]
+    command += ["-c", "copy", "-f", "ogg", "pipe:1"]
+
+    result = subprocess.run(command, input=audio, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to cut the audio: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
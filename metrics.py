@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from typing import Any, Callable
+from contextlib import contextmanager
+
+# Counters recorded for each stage of a run
+FIELDS = (
+    "wall_seconds", "api_calls", "api_seconds", "retries", "input_tokens", "output_tokens", "images", "upload_bytes",
+    "skipped_frames", "saved_bytes"
+)
+
+# The run and stage being executed, so requests made deep inside a stage are attributed to it
+_current_run = contextvars.ContextVar("current_run", default=None)
+_current_stage = contextvars.ContextVar("current_stage", default=None)
+
+
+class RunMetrics:
+    """
+    Thread-safe per-stage counters of one pipeline run.
+    Stages are timed with `stage()`; API calls, tokens and uploads made while a stage runs are added with `record()`.
+    """
+
+    def __init__(self, labels: dict[str, str] | None=None):
+        """
+        Args:
+            labels (dict[str, str], optional): Labels identifying the run in exports, like the video path.
+        """
+
+        self.labels = dict(labels or {})
+        self._stages: dict[str, dict[str, float]] = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, **values: float) -> None:
+        """
+        Add values to the counters of a stage.
+
+        Args:
+            stage (str): The stage name.
+            **values (float): Amounts to add, keyed by a name of `FIELDS`.
+        """
+
+        with self._lock:
+            counters = self._stages.setdefault(stage, dict.fromkeys(FIELDS, 0))
+            for name, value in values.items():
+                counters[name] += value
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage and attribute the requests made inside it, including from threads started with `propagate`.
+
+        Args:
+            name (str): The stage name.
+        """
+
+        run_token = _current_run.set(self)
+        stage_token = _current_stage.set(name)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(name, wall_seconds=time.perf_counter() - start)
+            _current_stage.reset(stage_token)
+            _current_run.reset(run_token)
+
+    def report(self) -> dict:
+        """
+        Build the structured report of the run.
+
+        Returns:
+            dict: A dictionary with `labels`, `wall_seconds` (since the run started),
+                `stages` (the counters of each stage) and `totals` (the counters summed over stages,
+                where `wall_seconds` is the summed stage time, not the run time).
+        """
+
+        with self._lock:
+            stages = {name: {key: _round(value) for key, value in counters.items()} for name, counters in self._stages.items()}
+
+        totals = {key: _round(sum(counters[key] for counters in stages.values())) for key in FIELDS}
+
+        return {
+            "labels": self.labels,
+            "wall_seconds": _round(time.perf_counter() - self._start),
+            "stages": stages,
+            "totals": totals
+        }
+
+
+def _round(value: float) -> float:
+    return round(value, 3) if isinstance(value, float) else value
+
+
+def record(**values: float) -> None:
+    """
+    Add values to the counters of the current stage. Does nothing outside of `RunMetrics.stage`.
+
+    Args:
+        **values (float): Amounts to add, keyed by a name of `FIELDS`.
+    """
+
+    run = _current_run.get()
+    if run is not None:
+        run.add(_current_stage.get(), **values)
+
+
+def record_call(seconds: float, response: Any=None) -> None:
+    """
+    Record one API call of the current stage, with the token usage reported in `response.usage`.
+
+    Args:
+        seconds (float): The latency of the call.
+        response (Any, optional): The API response, None if the call failed.
+    """
+
+    usage = getattr(response, "usage", None)
+    tokens = {}
+    for name in ("input_tokens", "output_tokens"):
+        value = getattr(usage, name, None)
+        if isinstance(value, int):
+            tokens[name] = value
+
+    record(api_calls=1, api_seconds=seconds, **tokens)
+
+
+def propagate(fn: Callable) -> Callable:
+    """
+    Wrap a function submitted to a thread pool so it runs with the caller's current run and stage.
+    Each call runs in its own copy of the context, so the wrapper can be used by many threads at once.
+
+    Args:
+        fn (Callable): The function to wrap.
+
+    Returns:
+        Callable: The wrapped function.
+    """
+
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def to_prometheus(reports: list[dict]) -> str:
+    """
+    Render run reports in the Prometheus text exposition format, one gauge per counter,
+    labelled with the run labels and the stage.
+
+    Args:
+        reports (list[dict]): Reports returned by `RunMetrics.report`.
+
+    Returns:
+        str: The exposition text.
+    """
+
+    lines = []
+    for field in FIELDS:
+        metric = f"pipeline_stage_{field}"
+        lines.append(f"# TYPE {metric} gauge")
+        for report in reports:
+            for stage, counters in report["stages"].items():
+                labels = {**report["labels"], "stage": stage}
+                label_text = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {counters[field]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def export_reports(reports: list[dict], path: str) -> None:
+    """
+    Export run reports to a file. A `.prom` file is replaced with the Prometheus text of `reports`
+    (for a node exporter textfile collector); any other file gets one JSON line appended per report.
+
+    Args:
+        reports (list[dict]): Reports returned by `RunMetrics.report`.
+        path (str): The output file.
+    """
+
+    if path.endswith(".prom"):
+        # Write then rename, so a scraper never reads a partial file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(to_prometheus(reports))
+        os.replace(temp_path, path)
+        return
+
+    with open(path, "a", encoding="utf-8") as file:
+        for report in reports:
+            file.write(json.dumps(report, ensure_ascii=False) + "\n")
@@ -1,29 +1,89 @@
+import re
 import cv2
+import json
 import base64
+import asyncio
 import logging
-from openai import OpenAI
+import multiprocessing
+import numpy as np
+from typing import Callable, Iterable, Iterator
+from operator import itemgetter
+from functools import partial
+from itertools import chain
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from openai import OpenAI, AsyncOpenAI
+from request_scheduler import submit, submit_async
+from metrics import record, propagate
+from frame_processing import (
+    frame_signature, frame_quality, filter_low_quality, deduplicate_frames, drop_covered_frames, thin_frames, resize_frame,
+    make_contact_sheets
+)
 
 logger = logging.getLogger(__name__)
 
-def video_to_base64(video_path: str, sample_rate: float=0.5) -> list[str]:
+# Sampling intervals (in frames) from which seeking is cheaper than grabbing every skipped frame.
+# A seek decodes from the previous keyframe, so it only pays off for gaps longer than a typical GOP.
+SEEK_THRESHOLD = 300
+
+# Sampled frames decoded and encoded by one worker process task, see `iter_base64_frames`
+RANGE_FRAMES = 16
+
+# Ranges below which the video is decoded in this process, as starting the worker processes takes longer (about 0.8s)
+# than the ranges they would share (about 1.2s each for a 720p video), see `benchmarks/frame_workers.py`
+MIN_PARALLEL_RANGES = 4
+
+# Prefix of an image sent inline to the Responses API
+DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+# List numbering the model prefixes to object names, like "1. " or "2) "
+_NUMBERING = re.compile(r"^\s*\d+\s*[.)]\s*")
+
+# Common plurals that the suffix rules of `normalize_object` do not cover
+_IRREGULAR_PLURALS = {
+    "children": "child", "feet": "foot", "knives": "knife", "leaves": "leaf", "loaves": "loaf",
+    "men": "man", "mice": "mouse", "people": "person", "shelves": "shelf", "teeth": "tooth",
+    "women": "woman"
+}
+
+# Singulars ending in "s" whose plural adds "es", like "buses", which the trailing "s" rule would turn into "buse"
+_S_SINGULARS = frozenset({
+    "atlas", "bonus", "bus", "cactus", "campus", "canvas", "gas", "iris", "lens", "octopus", "virus", "walrus"
+})
+
+
+def sample_frames(video_path: str, sample_rate: float=0.5, seek_threshold: int=SEEK_THRESHOLD) -> Iterator[np.ndarray]:
     """
-    Convert a video into a list of base64-encoded JPEG images.
+    Lazily sample frames from a video at a fixed rate.
+    Skipped frames are never converted to images: they are either grabbed without being retrieved,
+    or, when the sampling interval reaches `seek_threshold` frames, jumped over by seeking.
     
     Args:
         video_path (str): The path of the video file to be processed.
         sample_rate (float): Number of frames sampled per second (must be > 0).
+        seek_threshold (int): Minimum sampling interval, in frames, from which the sampler seeks.
 
     Returns:
-        list[str]: A list of base64-encoded JPEG images.
+        Iterator[np.ndarray]: A generator of BGR frames, in presentation order.
+            The video is released once the generator is exhausted or closed.
 
     Raises:
         ValueError:  If `sample_rate` is less than or equal to 0.
         RuntimeError:
             - If the video file cannot be opened.
             - If the video metadata is invalid.
-            - If an unexpected error occurs while converting a video to base64.
     """
 
+    cap, sample_interval, frame_count = _open_video(video_path, sample_rate)
+
+    if sample_interval >= seek_threshold:
+        return _seek_frames(cap, sample_interval, frame_count)
+    return _grab_frames(cap, sample_interval)
+
+
+def _open_video(video_path: str, sample_rate: float) -> tuple[cv2.VideoCapture, int, int]:
+    # Open a video and compute the interval, in frames, between sampled frames
     if sample_rate <= 0:
         raise ValueError("sample_rate must be greater than 0")
 
@@ -36,69 +96,468 @@ def video_to_base64(video_path: str, sample_rate: float=0.5) -> list[str]:
 
     # Validate video metadata
     if fps <= 0 or frame_count <=0:
+        cap.release()
         raise RuntimeError(f"Invalid video metadata: fps={fps}, frame_count={frame_count}")
     
-    sample_interval = int(fps / sample_rate)
+    return cap, sample_interval(fps, frame_count, sample_rate), frame_count
+
+
+def sample_interval(fps: int, frame_count: int, sample_rate: float) -> int:
+    """
+    Compute the interval, in frames, between two sampled frames of a video.
+
+    Args:
+        fps (int): Frames per second of the video.
+        frame_count (int): Number of frames of the video.
+        sample_rate (float): Number of frames sampled per second (must be > 0).
+
+    Returns:
+        int: The interval, between 1 and `frame_count`.
+
+    Raises:
+        ValueError: If `sample_rate` is less than or equal to 0.
+    """
+
+    if sample_rate <= 0:
+        raise ValueError("sample_rate must be greater than 0")
+
+    interval = int(fps / sample_rate)
     
-    if sample_interval > frame_count:
+    if interval > frame_count:
         logger.warning(f"sample_rate is too low, only one frame will be sampled")
     
-    elif sample_interval < 1:
+    elif interval < 1:
         logger.warning(f"sample_rate is too high, all frames will be sampled, may exceed the API limit")
     
-    sample_interval = max(1, min(sample_interval, frame_count))
+    return max(1, min(interval, frame_count))
+
+
+def sample_times(fps: float, frame_count: int, sample_rate: float) -> list[float]:
+    """
+    Compute the timestamps of the sampled frames of a video, before deduplication,
+    for example to align them with a `TimedTranscript`.
+
+    Args:
+        fps (float): Frames per second of the video.
+        frame_count (int): Number of frames of the video.
+        sample_rate (float): Number of frames sampled per second (must be > 0).
+
+    Returns:
+        list[float]: The time of each sampled frame, in seconds.
+
+    Raises:
+        ValueError: If `sample_rate` is less than or equal to 0.
+    """
+
+    interval = sample_interval(int(fps), frame_count, sample_rate)
+    return [index / fps for index in range(0, frame_count, interval)]
+
+
+def _grab_frames(cap: cv2.VideoCapture, sample_interval: int, start: int=0, stop: int | None=None) -> Iterator[np.ndarray]:
+    # Decode every frame but only retrieve (convert) the sampled ones, from `start` to `stop` (the end if None)
+    try:
+        logger.info("Sampling video...")
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frame_index = start
+        while stop is None or frame_index < stop:
+            if frame_index % sample_interval == 0:
+                ret, img = cap.read()
+                if not ret:
+                    break
+                yield img
+            elif not cap.grab():
+                break
+            frame_index += 1
+
+    finally:
+        cap.release()
 
-    frame_index = 0
-    base64_images = []
 
+def _seek_frames(cap: cv2.VideoCapture, sample_interval: int, frame_count: int, start: int=0) -> Iterator[np.ndarray]:
+    # Jump straight to each sampled frame, from `start` to `frame_count`
     try:
         logger.info("Sampling video...")
-        while True:
+        for frame_index in range(start, frame_count, sample_interval):
+            if frame_index:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
             ret, img = cap.read()
             if not ret:
                 break
-            if frame_index % sample_interval == 0:
-                _, buffer = cv2.imencode('.jpg', img)
-                base64_str = base64.b64encode(buffer).decode("utf-8")
-                base64_images.append(base64_str)
-            frame_index += 1
-    
-    except Exception as e:
-        raise RuntimeError(f"Unexpected error occurred while converting a video to base64") from e
+            yield img
 
     finally:
         cap.release()
 
-    return base64_images
 
+def encode_frame(img: np.ndarray, max_edge: int | None=None, jpeg_quality: int | None=None, data_url: bool=False) -> str:
+    """
+    Encode a frame as a base64 JPEG string.
+
+    Args:
+        img (np.ndarray): A BGR frame.
+        max_edge (int, optional): Downscale the frame so its longest edge is at most this many pixels.
+        jpeg_quality (int, optional): JPEG quality from 0 to 100. OpenCV's default (95) if None.
+        data_url (bool): Return a `data:image/jpeg;base64,...` URL, ready to be sent as an `input_image`.
 
-def object_detection(client: OpenAI, video_path: str, model: str, sample_rate: float=0.5) -> str:
+    Returns:
+        str: The base64-encoded JPEG image, or its data URL.
     """
-    Detect distinct objects appearing in a video using OpenAI.
+
+    params = [] if jpeg_quality is None else [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+    _, buffer = cv2.imencode('.jpg', resize_frame(img, max_edge), params)
+    encoded = base64.b64encode(buffer)
+    if data_url:
+        # Prefix the bytes before decoding, so the image is only copied into a string once
+        encoded = DATA_URL_PREFIX + encoded
+    return encoded.decode("utf-8")
+
+
+def iter_base64_frames(
+    video_path: str,
+    sample_rate: float=0.5,
+    deduplicate: bool=False,
+    max_edge: int | None=None,
+    jpeg_quality: int | None=None,
+    contact_sheet: tuple[int, int] | None=None,
+    stats: dict[str, int] | None=None,
+    data_url: bool=False,
+    workers: int | None=None,
+    frames: Iterator[np.ndarray] | None=None,
+    quality_gate: bool=False,
+    detector: Callable[[np.ndarray], set[str]] | None=None
+) -> Iterator[str]:
+    """
+    Stream the sampled frames of a video as base64-encoded JPEG images, one at a time.
+    With `workers`, the video is split into time ranges of `RANGE_FRAMES` sampled frames that worker processes
+    decode and encode in parallel. The images are the same, in the same order, as with a single process.
     
     Args:
-        client (OpenAI): An initialised OpenAI client with a valid API key.
         video_path (str): The path of the video file to be processed.
-        model (str): Model ID used to generate the response, like gpt-4o or o3.
         sample_rate (float): Number of frames sampled per second (must be > 0).
-    
+        deduplicate (bool): Drop frames that are near-duplicates of the last kept frame.
+        max_edge (int, optional): Longest edge of each encoded image, in pixels.
+        jpeg_quality (int, optional): JPEG quality from 0 to 100.
+        contact_sheet (tuple[int, int], optional): Pack frames into sheets of (columns, rows) tiles.
+            Each tile's longest edge is `max_edge` divided by the number of columns (512 if `max_edge` is None).
+        stats (dict[str, int], optional): If given, filled with frame counters, see `deduplicate_frames`.
+        data_url (bool): Yield data URLs instead of bare base64 strings, see `encode_frame`.
+        workers (int, optional): Number of worker processes. Frames are decoded in this process if None or 1,
+            if the video has fewer than `MIN_PARALLEL_RANGES` ranges, with `contact_sheet`, which packs
+            consecutive frames together, or with `detector`. Workers are spawned, so the calling script
+            must start under an `if __name__ == "__main__":` guard.
+        frames (Iterator[np.ndarray], optional): A generator of frames already sampled from the video, like
+            `MediaIngest.frames`, used instead of decoding `video_path`. `workers` is then ignored.
+        quality_gate (bool): Drop blurred frames and almost uniformly black or white ones, see `filter_low_quality`.
+        detector (Callable[[np.ndarray], set[str]], optional): A local detector returning the labels in a frame.
+            Frames whose labels were all seen in earlier frames are dropped, see `drop_covered_frames`.
+
     Returns:
-        str: A JSON-formatted string containing the detected object.
-    
+        Iterator[str]: A generator of base64-encoded JPEG images.
+
     Raises:
-        ValueError:  If `sample_rate` is less than or equal to 0.
+        ValueError:
+            - If `sample_rate` is less than or equal to 0.
+            - If `max_edge`, `jpeg_quality`, `contact_sheet` or `workers` is out of range.
         RuntimeError:
-            - If frame extraction fails.
-            - If an unexpected error occurs while detecting objects.
+            - If the video file cannot be opened.
+            - If the video metadata is invalid.
+            - If an unexpected error occurs while converting a video to base64.
+    """
+
+    if max_edge is not None and max_edge <= 0:
+        raise ValueError("max_edge must be greater than 0")
+    if jpeg_quality is not None and not 0 <= jpeg_quality <= 100:
+        raise ValueError("jpeg_quality must be between 0 and 100")
+    if workers is not None and workers <= 0:
+        raise ValueError("workers must be greater than 0")
+
+    if frames is None and workers and workers > 1 and contact_sheet is None and detector is None:
+        spans, sample_interval, frame_count = _sample_ranges(video_path, sample_rate)
+        if len(spans) >= MIN_PARALLEL_RANGES:
+            return _parallel_base64_frames(
+                video_path, spans, sample_interval, frame_count, workers, deduplicate=deduplicate,
+                quality_gate=quality_gate, max_edge=max_edge, jpeg_quality=jpeg_quality, stats=stats, data_url=data_url
+            )
+
+    # Only the sampler created here is closed, frames given by the caller are theirs to release
+    owned = frames is None
+    if owned:
+        frames = sample_frames(video_path=video_path, sample_rate=sample_rate)
+
+    # Duplicates first, so the frames counted by the quality gate are frames that would have been sent,
+    # and the local detector last, so it only runs on the frames left
+    selected = deduplicate_frames(frames, stats=stats) if deduplicate else frames
+    if quality_gate:
+        selected = filter_low_quality(selected, stats=stats)
+    if detector is not None:
+        selected = drop_covered_frames(selected, detector, stats=stats)
+
+    if contact_sheet is not None:
+        tile_edge = max_edge // contact_sheet[0] if max_edge else 512
+        selected = make_contact_sheets(selected, grid=contact_sheet, tile_edge=max(1, tile_edge))
+
+    def encode() -> Iterator[str]:
+        try:
+            for img in selected:
+                yield encode_frame(img, max_edge=max_edge, jpeg_quality=jpeg_quality, data_url=data_url)
+
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error occurred while converting a video to base64") from e
+
+        finally:
+            if owned:
+                frames.close()
+
+    return encode()
+
+
+def _encode_range(
+    span: tuple[int, int | None],
+    video_path: str,
+    sample_interval: int,
+    frame_count: int,
+    max_edge: int | None,
+    jpeg_quality: int | None,
+    data_url: bool,
+    with_signature: bool,
+    with_quality: bool=False
+) -> list[tuple[tuple[np.ndarray, np.ndarray] | None, tuple[float, float, float] | None, str]]:
+    # Worker process task: sample and encode the frames from `start` to `stop`, the same way `sample_frames` would
+    start, stop = span
+    cap = cv2.VideoCapture(video_path)
+    if sample_interval >= SEEK_THRESHOLD:
+        frames = _seek_frames(cap, sample_interval, frame_count if stop is None else min(stop, frame_count), start=start)
+    else:
+        frames = _grab_frames(cap, sample_interval, start=start, stop=stop)
+
+    # Low-quality frames and duplicates are filtered in the parent process, in order,
+    # so only the frame quality and signature are sent back
+    return [
+        (frame_signature(img) if with_signature else None,
+         frame_quality(img) if with_quality else None,
+         encode_frame(img, max_edge=max_edge, jpeg_quality=jpeg_quality, data_url=data_url))
+        for img in frames
+    ]
+
+
+def _ordered_map(executor: Executor, fn: Callable, items: Iterable, max_pending: int) -> Iterator:
+    # Like `executor.map`, but items are submitted lazily with at most `max_pending` results waiting to be consumed
+    pending = deque()
+    for item in items:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _sample_ranges(video_path: str, sample_rate: float) -> tuple[list[tuple[int, int | None]], int, int]:
+    # Split the sampled frames into time ranges of `RANGE_FRAMES`, as (start, end) frame indices
+    cap, sample_interval, frame_count = _open_video(video_path, sample_rate)
+    cap.release()
+
+    step = sample_interval * RANGE_FRAMES
+    starts = range(0, frame_count, step)
+    # The last range reads until the end of the stream, in case the container under-reports its frame count
+    spans = [(start, start + step if start != starts[-1] else None) for start in starts]
+    return spans, sample_interval, frame_count
+
+
+def _parallel_base64_frames(
+    video_path: str,
+    spans: list[tuple[int, int | None]],
+    sample_interval: int,
+    frame_count: int,
+    workers: int,
+    deduplicate: bool=False,
+    quality_gate: bool=False,
+    max_edge: int | None=None,
+    jpeg_quality: int | None=None,
+    stats: dict[str, int] | None=None,
+    data_url: bool=False
+) -> Iterator[str]:
+    # Encode the time ranges in worker processes, yielding their frames in order
+    encode_range = partial(
+        _encode_range, video_path=video_path, sample_interval=sample_interval, frame_count=frame_count,
+        max_edge=max_edge, jpeg_quality=jpeg_quality, data_url=data_url, with_signature=deduplicate,
+        with_quality=quality_gate
+    )
+
+    def encode() -> Iterator[str]:
+        try:
+            # Spawned workers do not inherit the locks of the threads running other pipeline stages
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                items = chain.from_iterable(_ordered_map(executor, encode_range, spans, 2 * workers))
+                if deduplicate:
+                    items = deduplicate_frames(items, stats=stats, signature=itemgetter(0))
+                if quality_gate:
+                    items = filter_low_quality(items, stats=stats, quality=itemgetter(1))
+                for _, _, base64_image in items:
+                    yield base64_image
+
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error occurred while converting a video to base64") from e
+
+    return encode()
+
+
+def stream_images(
+    video_path: str,
+    sample_rate: float=0.5,
+    deduplicate: bool=False,
+    max_frames: int | None=None,
+    max_edge: int | None=None,
+    jpeg_quality: int | None=None,
+    contact_sheet: tuple[int, int] | None=None,
+    stats: dict[str, int] | None=None,
+    data_url: bool=False,
+    workers: int | None=None,
+    frames: Iterator[np.ndarray] | None=None,
+    quality_gate: bool=False,
+    detector: Callable[[np.ndarray], set[str]] | None=None
+) -> Iterator[str]:
+    """
+    Stream the selected frames of a video as base64-encoded JPEG images.
+    Without `max_frames`, each image is encoded when it is consumed, so memory does not grow with the video;
+    with it, at most `2 * max_frames` images are held while the budget is applied, see `thin_frames`.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+        sample_rate (float): Number of frames sampled per second (must be > 0).
+        deduplicate (bool): Drop frames that are near-duplicates of the last kept frame.
+        max_frames (int, optional): Image budget. Extra images are dropped evenly across the video.
+        max_edge (int, optional): Longest edge of each encoded image, in pixels.
+        jpeg_quality (int, optional): JPEG quality from 0 to 100.
+        contact_sheet (tuple[int, int], optional): Pack frames into sheets of (columns, rows) tiles.
+        stats (dict[str, int], optional): If given, filled with the "sampled", "low_quality", "duplicates", "covered",
+            "over_budget" and "kept" frame counters once the generator is exhausted. With `quality_gate` or `detector`,
+            "saved_bytes" is the upload they avoided, estimated from the average size of the images sent.
+        data_url (bool): Yield data URLs instead of bare base64 strings, see `encode_frame`.
+        workers (int, optional): Number of processes decoding and encoding frames, see `iter_base64_frames`.
+        frames (Iterator[np.ndarray], optional): Frames already sampled from the video, see `iter_base64_frames`.
+        quality_gate (bool): Drop blurred frames and almost uniformly black or white ones, see `iter_base64_frames`.
+        detector (Callable[[np.ndarray], set[str]], optional): A local detector, see `iter_base64_frames`.
+
+    Returns:
+        Iterator[str]: A generator of base64-encoded JPEG images.
+
+    Raises:
+        ValueError:
+            - If `sample_rate` is less than or equal to 0.
+            - If `max_frames`, `max_edge`, `jpeg_quality`, `contact_sheet` or `workers` is out of range.
+        RuntimeError:
+            - If the video file cannot be opened.
+            - If the video metadata is invalid.
+            - If an unexpected error occurs while converting a video to base64.
     """
+
+    if max_frames is not None and max_frames <= 0:
+        raise ValueError("max_frames must be greater than 0")
+
+    stats = stats if stats is not None else {}
+    base64_images = iter_base64_frames(
+        video_path=video_path, sample_rate=sample_rate, deduplicate=deduplicate, max_edge=max_edge,
+        jpeg_quality=jpeg_quality, contact_sheet=contact_sheet, stats=stats, data_url=data_url, workers=workers,
+        frames=frames, quality_gate=quality_gate, detector=detector
+    )
+
+    def select() -> Iterator[str]:
+        selected = base64_images if max_frames is None else thin_frames(base64_images, max_frames, stats=stats)
+        stats["kept"] = 0
+        kept_bytes = 0
+        for base64_image in selected:
+            stats["kept"] += 1
+            kept_bytes += len(base64_image)
+            yield base64_image
+
+        stats["over_budget"] = stats.get("over_budget", 0)
+        skipped = stats.get("low_quality", 0) + stats.get("covered", 0)
+        if quality_gate or detector is not None:
+            stats["saved_bytes"] = _saved_bytes(skipped, stats["kept"], kept_bytes, max_frames, contact_sheet)
+            record(skipped_frames=skipped, saved_bytes=stats["saved_bytes"])
+        if deduplicate or max_frames is not None or quality_gate or detector is not None:
+            sampled = stats.get("sampled", stats["kept"] + stats["over_budget"] + skipped)
+            logger.info(
+                f"Kept {stats['kept']} of {sampled} sampled frames "
+                f"({stats.get('low_quality', 0)} low quality, {stats.get('duplicates', 0)} near-duplicates, "
+                f"{stats.get('covered', 0)} covered, {stats['over_budget']} over budget)"
+                + (f", about {stats['saved_bytes'] / 1024:.0f} KiB not uploaded" if skipped else "")
+            )
+
+    return select()
+
+
+def _saved_bytes(
+    skipped: int, kept: int, kept_bytes: int, max_frames: int | None, contact_sheet: tuple[int, int] | None
+) -> int:
+    # The skipped frames would have been sent as images of the average size, as far as the budget allowed
+    if not kept:
+        return 0
+    tiles = contact_sheet[0] * contact_sheet[1] if contact_sheet else 1
+    images = kept + skipped // tiles
+    if max_frames is not None:
+        images = min(images, max_frames)
+    return (images - kept) * kept_bytes // kept
+
+
+def video_to_base64(
+    video_path: str,
+    sample_rate: float=0.5,
+    deduplicate: bool=False,
+    max_frames: int | None=None,
+    max_edge: int | None=None,
+    jpeg_quality: int | None=None,
+    contact_sheet: tuple[int, int] | None=None,
+    stats: dict[str, int] | None=None,
+    workers: int | None=None
+) -> list[str]:
+    """
+    Convert a video into a list of base64-encoded JPEG images, see `stream_images`.
     
-    # Extract frames from the video
-    base64_images = video_to_base64(video_path=video_path, sample_rate=sample_rate)
+    Args:
+        video_path (str): The path of the video file to be processed.
+        sample_rate (float): Number of frames sampled per second (must be > 0).
+        deduplicate (bool): Drop frames that are near-duplicates of the last kept frame.
+        max_frames (int, optional): Image budget. Extra images are dropped evenly across the video.
+        max_edge (int, optional): Longest edge of each encoded image, in pixels.
+        jpeg_quality (int, optional): JPEG quality from 0 to 100.
+        contact_sheet (tuple[int, int], optional): Pack frames into sheets of (columns, rows) tiles.
+        stats (dict[str, int], optional): If given, filled with the "sampled", "duplicates",
+            "over_budget" and "kept" frame counters.
+        workers (int, optional): Number of processes decoding and encoding frames, see `iter_base64_frames`.
+
+    Returns:
+        list[str]: A list of base64-encoded JPEG images.
+
+    Raises:
+        ValueError:
+            - If `sample_rate` is less than or equal to 0.
+            - If `max_frames`, `max_edge`, `jpeg_quality`, `contact_sheet` or `workers` is out of range.
+        RuntimeError:
+            - If the video file cannot be opened.
+            - If the video metadata is invalid.
+            - If an unexpected error occurs while converting a video to base64.
+    """
+
+    return list(stream_images(
+        video_path=video_path, sample_rate=sample_rate, deduplicate=deduplicate, max_frames=max_frames,
+        max_edge=max_edge, jpeg_quality=jpeg_quality, contact_sheet=contact_sheet, stats=stats, workers=workers
+    ))
+
 
-    if not base64_images:
-        raise RuntimeError("No frames were extracted from the video")
+def build_object_detection_request(base64_images: list[str], model: str, detail: str="auto") -> dict:
+    """
+    Build the keyword arguments of the `responses.create` call used for object detection.
+    
+    Args:
+        base64_images (list[str]): The base64-encoded JPEG frames to analyse, or their data URLs.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        detail (str): Image detail level, one of "low", "high" or "auto".
     
-    logger.debug(f"Extracted {len(base64_images)} frames from the video")
+    Returns:
+        dict: The request parameters (model, input and text format).
+    """
 
     # Build input content
     dev_content = [
@@ -122,8 +581,8 @@ def object_detection(client: OpenAI, video_path: str, model: str, sample_rate: f
         usr_content.append(
             {
                 "type": "input_image",
-                "image_url": f"data:image/jpeg;base64,{base64_image}",
-                "detail": "auto"
+                "image_url": base64_image if base64_image.startswith("data:") else f"data:image/jpeg;base64,{base64_image}",
+                "detail": detail
             }
         )
 
@@ -146,19 +605,266 @@ def object_detection(client: OpenAI, video_path: str, model: str, sample_rate: f
         }
     }
 
-    # Call OpenAI API
+    return {
+        "model": model,
+        "input": [
+            {"role": "developer", "content": dev_content},
+            {"role": "user", "content": usr_content}
+        ],
+        "text": json_schema
+    }
+
+
+def normalize_object(name: str) -> str:
+    """
+    Normalise an object name for deduplication: drop list numbering, lowercase,
+    collapse whitespace and singularise the last word ("1. Frying Pans" -> "frying pan").
+
+    Args:
+        name (str): An object name returned by the model.
+
+    Returns:
+        str: The normalised name.
+    """
+
+    words = _NUMBERING.sub("", name).lower().replace("-", " ").split()
+    words = [word.strip(".,;:!?\"'()") for word in words]
+    words = [word for word in words if word]
+    if not words:
+        return ""
+
+    last = words[-1]
+    if last in _IRREGULAR_PLURALS:
+        last = _IRREGULAR_PLURALS[last]
+    elif len(last) > 3 and last.endswith("ies"):
+        last = last[:-3] + "y"
+    elif len(last) > 3 and last.endswith(("ches", "shes", "sses", "xes", "zes")):
+        last = last[:-2]
+    elif last.endswith("ses") and last[:-2] in _S_SINGULARS:
+        last = last[:-2]
+    elif len(last) > 2 and last.endswith("s") and not last.endswith(("ss", "us", "is")):
+        last = last[:-1]
+
+    return " ".join(words[:-1] + [last])
+
+
+def merge_objects(object_lists: list[list[str]]) -> list[str]:
+    """
+    Merge the object lists of several windows into one numbered list without duplicates.
+    The first spelling seen of each object is kept, in order of appearance.
+
+    Args:
+        object_lists (list[list[str]]): The `objects` list returned for each window, in window order.
+
+    Returns:
+        list[str]: The merged objects, numbered like "1. Stove".
+    """
+
+    merged = {}
+    for objects in object_lists:
+        for name in objects:
+            key = normalize_object(name)
+            if key and key not in merged:
+                merged[key] = _NUMBERING.sub("", name).strip()
+
+    return [f"{index}. {name}" for index, name in enumerate(merged.values(), start=1)]
+
+
+def _check_window_size(window_size: int | None) -> None:
+    if window_size is not None and window_size <= 0:
+        raise ValueError("window_size must be greater than 0")
+
+
+def _windows(base64_images: Iterable[str], window_size: int | None) -> Iterator[list[str]]:
+    # Group the frames into consecutive windows of at most `window_size` images, as they are encoded
+    window = []
+    for base64_image in base64_images:
+        window.append(base64_image)
+        if window_size and len(window) == window_size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def _merge_responses(output_texts: list[str]) -> str:
+    # A single window is returned untouched; several windows are merged into the same JSON shape
+    if len(output_texts) == 1:
+        return output_texts[0]
+    object_lists = [json.loads(output_text).get("objects", []) for output_text in output_texts]
+    return json.dumps({"objects": merge_objects(object_lists)}, ensure_ascii=False)
+
+
+def _log_payload(image_count: int, payload_bytes: int, window_count: int, detail: str) -> None:
+    logger.info(f"Sent {image_count} images ({payload_bytes / 1024:.0f} KiB, detail={detail}) in {window_count} window(s)")
+
+
+def _detect_windows(detect: Callable[[list[str]], str], windows: Iterator[list[str]], max_workers: int, detail: str) -> list[str]:
+    # Send each window as soon as it is filled, with at most `max_workers` windows in flight,
+    # so only those windows (and the one being encoded) are held in memory
+    payload = {"images": 0, "bytes": 0}
+
+    def count(windows: Iterator[list[str]]) -> Iterator[list[str]]:
+        for window in windows:
+            # Images are ASCII strings, so their length is the number of bytes uploaded
+            payload["images"] += len(window)
+            payload["bytes"] += sum(map(len, window))
+            yield window
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="detect") as executor:
+        output_texts = list(_ordered_map(executor, propagate(detect), count(windows), max_workers))
+
+    _log_payload(payload["images"], payload["bytes"], len(output_texts), detail)
+    return output_texts
+
+
+def object_detection(
+    client: OpenAI,
+    video_path: str,
+    model: str,
+    sample_rate: float=0.5,
+    detail: str="auto",
+    window_size: int | None=None,
+    max_workers: int=4,
+    **frame_options
+) -> str:
+    """
+    Detect distinct objects appearing in a video using OpenAI.
+    With `window_size`, the frames are split into windows that are sent concurrently,
+    and the objects of every window are merged and deduplicated.
+    Frames are encoded while earlier windows are being sent, so memory is bounded by
+    `window_size * max_workers` images rather than the length of the video.
+    
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        video_path (str): The path of the video file to be processed.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        sample_rate (float): Number of frames sampled per second (must be > 0).
+        detail (str): Image detail level, one of "low", "high" or "auto".
+        window_size (int, optional): Maximum number of images per request. All images in one request if None.
+        max_workers (int): Maximum number of window requests in flight at the same time.
+        **frame_options: Frame selection and encoding options forwarded to `stream_images`,
+            like `deduplicate`, `max_frames`, `max_edge`, `jpeg_quality` or `contact_sheet`.
+    
+    Returns:
+        str: A JSON-formatted string containing the detected object.
+    
+    Raises:
+        ValueError:  If `sample_rate`, `window_size` or a frame option is out of range.
+        RuntimeError:
+            - If frame extraction fails.
+            - If an unexpected error occurs while detecting objects.
+    """
+    
+    _check_window_size(window_size)
+
+    # Extract frames from the video, lazily
+    base64_images = stream_images(video_path=video_path, sample_rate=sample_rate, data_url=True, **frame_options)
+    windows = _windows(base64_images, window_size)
+
     try:
-        logger.info("Detecting objects...")
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "developer", "content": dev_content},
-                {"role": "user", "content": usr_content}
-            ],
-            text=json_schema
-        )
+        first = next(windows, None)
+        if first is None:
+            raise RuntimeError("No frames were extracted from the video")
+
+        def detect(images: list[str]) -> str:
+            request = build_object_detection_request(base64_images=images, model=model, detail=detail)
+            record(images=len(images), upload_bytes=sum(map(len, images)))
+            return submit(client.responses.create, **request).output_text
+
+        # Call OpenAI API
+        try:
+            logger.info("Detecting objects...")
+            output_texts = _detect_windows(detect, chain([first], windows), max_workers, detail)
+            return _merge_responses(output_texts)
+
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error occurred while detecting objects") from e
+
+    finally:
+        windows.close()
+
+
+async def object_detection_async(
+    client: AsyncOpenAI,
+    video_path: str,
+    model: str,
+    sample_rate: float=0.5,
+    detail: str="auto",
+    window_size: int | None=None,
+    semaphore: asyncio.Semaphore | None=None,
+    max_workers: int=4,
+    **frame_options
+) -> str:
+    """
+    Asynchronous version of `object_detection` built on `AsyncOpenAI`.
+    Frames are encoded in a worker thread so the event loop is not blocked.
     
-    except Exception as e:
-        raise RuntimeError(f"Unexpected error occurred while detecting objects") from e
+    Args:
+        client (AsyncOpenAI): An initialised asynchronous OpenAI client with a valid API key.
+        video_path (str): The path of the video file to be processed.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        sample_rate (float): Number of frames sampled per second (must be > 0).
+        detail (str): Image detail level, one of "low", "high" or "auto".
+        window_size (int, optional): Maximum number of images per request. All images in one request if None.
+        semaphore (asyncio.Semaphore, optional): Limits the number of in-flight requests to the endpoint.
+        max_workers (int): Maximum number of windows encoded ahead of their request, which bounds memory.
+        **frame_options: Frame selection and encoding options forwarded to `stream_images`.
     
-    return response.output_text
+    Returns:
+        str: A JSON-formatted string containing the detected object.
+    
+    Raises:
+        ValueError:  If `sample_rate`, `window_size` or a frame option is out of range.
+        RuntimeError:
+            - If frame extraction fails.
+            - If an unexpected error occurs while detecting objects.
+    """
+    
+    _check_window_size(window_size)
+
+    # Extract frames from the video, lazily
+    base64_images = await asyncio.to_thread(
+        stream_images, video_path=video_path, sample_rate=sample_rate, data_url=True, **frame_options
+    )
+    windows = _windows(base64_images, window_size)
+    tasks = []
+
+    try:
+        window = await asyncio.to_thread(next, windows, None)
+        if window is None:
+            raise RuntimeError("No frames were extracted from the video")
+
+        async def detect(images: list[str]) -> str:
+            request = build_object_detection_request(base64_images=images, model=model, detail=detail)
+            record(images=len(images), upload_bytes=sum(map(len, images)))
+            async with semaphore or nullcontext():
+                response = await submit_async(client.responses.create, **request)
+            return response.output_text
+
+        # Call OpenAI API
+        try:
+            logger.info("Detecting objects...")
+            image_count = payload_bytes = 0
+            while window is not None:
+                image_count += len(window)
+                payload_bytes += sum(map(len, window))
+                tasks.append(asyncio.create_task(detect(window)))
+
+                # Wait for a request to finish before encoding more windows than `max_workers` ahead
+                running = [task for task in tasks if not task.done()]
+                if len(running) >= max_workers:
+                    await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                window = await asyncio.to_thread(next, windows, None)
+
+            output_texts = await asyncio.gather(*tasks)
+            _log_payload(image_count, payload_bytes, len(output_texts), detail)
+            return _merge_responses(output_texts)
+
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error occurred while detecting objects") from e
+
+    finally:
+        for task in tasks:
+            task.cancel()
+        windows.close()
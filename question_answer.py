@@ -1,22 +1,25 @@
+import json
+import asyncio
 import logging
-from openai import OpenAI
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, AsyncOpenAI
+from request_scheduler import submit, submit_async
+from metrics import propagate
+from text_chunking import split_transcript
 
 logger = logging.getLogger(__name__)
 
-def question_answer(client: OpenAI, transcription: str, model: str) -> str:
+def build_question_answer_request(transcription: str, model: str) -> dict:
     """
-    Convert a video transcription into a list of question-answer (Q&A) pairs about the video.
+    Build the keyword arguments of the `responses.create` call used for Q&A generation.
     
     Args:
-        client (OpenAI): An initialised OpenAI client with a valid API key.
         transcription (str): The complete transcription of the video.
         model (str): Model ID used to generate the response, like gpt-4o or o3.
     
     Returns:
-        str: A JSON-formatted string containing a list of Q&A pairs.
-    
-    Raises:
-        RuntimeError: If an unexpected error occurs while generating Q&A pairs.
+        dict: The request parameters (model, input and text format).
     """
 
     # Build input content
@@ -67,19 +70,192 @@ def question_answer(client: OpenAI, transcription: str, model: str) -> str:
         }
     }
 
+    return {
+        "model": model,
+        "input": [
+            {"role": "developer", "content": dev_content},
+            {"role": "user", "content": usr_content}
+        ],
+        "text": json_schema
+    }
+
+
+def build_question_answer_reduce_request(candidates: list[dict], model: str) -> dict:
+    """
+    Build the keyword arguments of the `responses.create` call that selects the best Q&A pairs
+    among those generated from consecutive transcript chunks. The output schema is the same as
+    `build_question_answer_request`.
+
+    Args:
+        candidates (list[dict]): The candidate Q&A pairs, as `{"Q": ..., "A": ...}` dictionaries.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+
+    Returns:
+        dict: The request parameters (model, input and text format).
+    """
+
+    # Build input content
+    dev_content = [
+        {
+            "type": "input_text",
+            "text": (
+                "Only select or lightly merge the given Q&A pairs, do not invent new content."
+                "Return results that strictly match the given JSON format."
+            )
+        }
+    ]
+
+    usr_content = [
+        {
+            "type": "input_text",
+            "text": (
+                "The following Q&A pairs were generated from consecutive parts of one video transcription."
+                "Select the 5 to 10 most useful pairs, avoiding duplicates and covering the whole video."
+                f"Candidates: {json.dumps(candidates, ensure_ascii=False)}"
+            )
+        }
+    ]
+
+    return {
+        "model": model,
+        "input": [
+            {"role": "developer", "content": dev_content},
+            {"role": "user", "content": usr_content}
+        ],
+        "text": build_question_answer_request(transcription="", model=model)["text"]
+    }
+
+
+def question_answer(
+    client: OpenAI,
+    transcription: str,
+    model: str,
+    max_tokens: int | None=None,
+    max_workers: int=4
+) -> str:
+    """
+    Convert a video transcription into a list of question-answer (Q&A) pairs about the video.
+    A transcription longer than `max_tokens` is split into chunks whose Q&A pairs are generated concurrently,
+    then a final request selects the best 5 to 10 of them.
+    
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        transcription (str): The complete transcription of the video.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        max_tokens (int, optional): Token budget of each chunk. The whole transcription is sent at once if None.
+        max_workers (int): Maximum number of chunks processed at the same time.
+    
+    Returns:
+        str: A JSON-formatted string containing a list of Q&A pairs.
+    
+    Raises:
+        ValueError: If `max_tokens` is less than or equal to 0.
+        RuntimeError: If an unexpected error occurs while generating Q&A pairs.
+    """
+
+    if max_tokens is not None:
+        chunks = split_transcript(transcription, max_tokens)
+        if len(chunks) > 1:
+            return _generate_chunks(client, chunks, model, max_workers)
+
+    request = build_question_answer_request(transcription=transcription, model=model)
+
     # Call OpenAI API
     try:
         logger.info("Generating Q&A pairs...")
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "developer", "content": dev_content},
-                {"role": "user", "content": usr_content}
-            ],
-            text=json_schema
-        )
+        response = submit(client.responses.create, **request)
+    
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while generating Q&A pairs") from e
+    
+    return response.output_text
+
+
+def _generate_chunks(client: OpenAI, chunks: list[str], model: str, max_workers: int) -> str:
+    def generate(chunk: str) -> list[dict]:
+        response = submit(client.responses.create, **build_question_answer_request(transcription=chunk, model=model))
+        return json.loads(response.output_text).get("QA_pairs", [])
+
+    try:
+        logger.info(f"Generating Q&A pairs in {len(chunks)} chunks...")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qa") as executor:
+            candidates = [pair for pairs in executor.map(propagate(generate), chunks) for pair in pairs]
+
+        # Few enough candidates are returned as they are, without a selection request
+        if len(candidates) <= 10:
+            return json.dumps({"QA_pairs": candidates}, ensure_ascii=False)
+
+        logger.info(f"Selecting Q&A pairs among {len(candidates)} candidates...")
+        response = submit(client.responses.create, **build_question_answer_reduce_request(candidates=candidates, model=model))
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while generating Q&A pairs") from e
+
+    return response.output_text
+
+
+async def question_answer_async(
+    client: AsyncOpenAI,
+    transcription: str,
+    model: str,
+    semaphore: asyncio.Semaphore | None=None,
+    max_tokens: int | None=None
+) -> str:
+    """
+    Asynchronous version of `question_answer` built on `AsyncOpenAI`.
+    
+    Args:
+        client (AsyncOpenAI): An initialised asynchronous OpenAI client with a valid API key.
+        transcription (str): The complete transcription of the video.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        semaphore (asyncio.Semaphore, optional): Limits the number of in-flight requests to the endpoint.
+        max_tokens (int, optional): Token budget of each chunk, see `question_answer`.
+    
+    Returns:
+        str: A JSON-formatted string containing a list of Q&A pairs.
+    
+    Raises:
+        ValueError: If `max_tokens` is less than or equal to 0.
+        RuntimeError: If an unexpected error occurs while generating Q&A pairs.
+    """
+
+    if max_tokens is not None:
+        chunks = split_transcript(transcription, max_tokens)
+        if len(chunks) > 1:
+            return await _generate_chunks_async(client, chunks, model, semaphore)
+
+    request = build_question_answer_request(transcription=transcription, model=model)
+
+    # Call OpenAI API
+    try:
+        async with semaphore or nullcontext():
+            logger.info("Generating Q&A pairs...")
+            response = await submit_async(client.responses.create, **request)
     
     except Exception as e:
         raise RuntimeError(f"Unexpected error occurred while generating Q&A pairs") from e
     
     return response.output_text
+
+
+async def _generate_chunks_async(client: AsyncOpenAI, chunks: list[str], model: str, semaphore: asyncio.Semaphore | None) -> str:
+    async def generate(request: dict) -> str:
+        async with semaphore or nullcontext():
+            return (await submit_async(client.responses.create, **request)).output_text
+
+    try:
+        logger.info(f"Generating Q&A pairs in {len(chunks)} chunks...")
+        outputs = await asyncio.gather(
+            *(generate(build_question_answer_request(transcription=chunk, model=model)) for chunk in chunks)
+        )
+        candidates = [pair for output in outputs for pair in json.loads(output).get("QA_pairs", [])]
+
+        # Few enough candidates are returned as they are, without a selection request
+        if len(candidates) <= 10:
+            return json.dumps({"QA_pairs": candidates}, ensure_ascii=False)
+
+        logger.info(f"Selecting Q&A pairs among {len(candidates)} candidates...")
+        return await generate(build_question_answer_reduce_request(candidates=candidates, model=model))
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while generating Q&A pairs") from e
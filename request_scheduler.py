@@ -0,0 +1,328 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Callable
+from openai import APIConnectionError, APIStatusError
+from text_chunking import count_tokens
+from metrics import record, record_call
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 429}
+# Estimated prompt tokens of one image, by detail level
+IMAGE_TOKENS = {"low": 85, "high": 765, "auto": 765}
+
+
+def estimate_tokens(request: dict) -> int:
+    """
+    Estimate the prompt tokens of a `responses.create` request, for the tokens-per-minute budget.
+
+    Args:
+        request (dict): The keyword arguments of the request.
+
+    Returns:
+        int: The estimated number of tokens. Requests without an `input` list, like transcriptions, count as 0.
+    """
+
+    tokens = 0
+    messages = request.get("input")
+    if not isinstance(messages, list):
+        return tokens
+
+    for message in messages:
+        for content in message.get("content", []):
+            if content.get("type") == "input_text":
+                tokens += count_tokens(content["text"])
+            elif content.get("type") == "input_image":
+                tokens += IMAGE_TOKENS.get(content.get("detail", "auto"), IMAGE_TOKENS["auto"])
+
+    return tokens
+
+
+def retry_after(error: Exception) -> float | None:
+    """
+    Read the delay requested by the server in the `Retry-After` (or `retry-after-ms`) header of a failed request.
+
+    Args:
+        error (Exception): The error raised by the OpenAI client.
+
+    Returns:
+        float | None: The delay in seconds, or None if the server did not request one.
+    """
+
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+
+    try:
+        if "retry-after-ms" in response.headers:
+            return float(response.headers["retry-after-ms"]) / 1000
+        if "retry-after" in response.headers:
+            return float(response.headers["retry-after"])
+    except ValueError:
+        pass
+
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether a failed request is worth retrying.
+    Connection errors, timeouts, rate limits and server errors are retried;
+    client errors and an exhausted quota are not.
+
+    Args:
+        error (Exception): The error raised by the OpenAI client.
+
+    Returns:
+        bool: True if the request may succeed when retried.
+    """
+
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        if getattr(error, "code", None) == "insufficient_quota":
+            return False
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+class TokenBucket:
+    """
+    A thread-safe budget that refills continuously up to `per_minute` units per minute.
+    Callers reserve units up front and wait for the returned delay, so concurrent callers queue fairly.
+    """
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute (float): Number of units available per minute (must be > 0).
+
+        Raises:
+            ValueError: If `per_minute` is less than or equal to 0.
+        """
+
+        if per_minute <= 0:
+            raise ValueError("per_minute must be greater than 0")
+
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self._level = per_minute
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` units from the budget, going into debt if it is not available yet.
+
+        Args:
+            amount (float): Number of units used by the request.
+
+        Returns:
+            float: How long to wait, in seconds, before the reserved units are actually available.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            self._level -= amount
+            return max(0.0, -self._level / self.rate)
+
+
+class RequestScheduler:
+    """
+    Send OpenAI requests with a shared requests/tokens-per-minute budget and retries with exponential backoff.
+    One scheduler is shared by every thread and event loop of the process, see `get_scheduler`.
+    """
+
+    def __init__(
+        self,
+        max_retries: int=5,
+        base_delay: float=0.5,
+        max_delay: float=30.0,
+        requests_per_minute: float | None=None,
+        tokens_per_minute: float | None=None
+    ):
+        """
+        Args:
+            max_retries (int): Maximum number of retries of one request (must be >= 0).
+            base_delay (float): Backoff before the first retry, in seconds. It doubles on each retry.
+            max_delay (float): Upper bound of the backoff, in seconds.
+            requests_per_minute (float, optional): Request budget. Unlimited if None.
+            tokens_per_minute (float, optional): Estimated prompt token budget, see `estimate_tokens`. Unlimited if None.
+
+        Raises:
+            ValueError: If `max_retries` is negative or a budget is not positive.
+        """
+
+        if max_retries < 0:
+            raise ValueError("max_retries must be greater than or equal to 0")
+
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "throttle_seconds": 0.0, "backoff_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, float]:
+        """
+        Snapshot of the counters since the scheduler was created.
+
+        Returns:
+            dict[str, float]: `requests` (attempts sent), `retries`, `failures` (requests that gave up),
+                `throttle_seconds` (time waited for the budget) and `backoff_seconds` (time waited between retries).
+        """
+
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, name: str, value: float=1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _throttle_delay(self, kwargs: dict) -> float:
+        # Reserve one request and the estimated tokens, and wait for whichever budget is furthest behind
+        delay = 0.0
+        if self.requests:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens:
+            delay = max(delay, self.tokens.reserve(estimate_tokens(kwargs)))
+        if delay:
+            self._count("throttle_seconds", delay)
+        return delay
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float | None:
+        if attempt >= self.max_retries or not is_retryable(error):
+            self._count("failures")
+            return None
+
+        # Full jitter, unless the server asked for a specific delay
+        delay = retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+        self._count("retries")
+        self._count("backoff_seconds", delay)
+        record(retries=1)
+        logger.warning(f"Request failed ({type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call `fn(*args, **kwargs)` within the budget, retrying transient failures.
+        The latency, token usage and retries of each attempt are added to the current stage's metrics.
+
+        Args:
+            fn (Callable[..., Any]): The client method to call, like `client.responses.create`.
+            *args: Positional arguments of `fn`.
+            **kwargs: Keyword arguments of `fn`. Its tokens are estimated from `input`, if present.
+
+        Returns:
+            Any: The return value of `fn`.
+
+        Raises:
+            Exception: The last error, if it is not retryable or the retries are exhausted.
+        """
+
+        attempt = 0
+        while True:
+            time.sleep(self._throttle_delay(kwargs))
+            self._count("requests")
+            start = time.perf_counter()
+            try:
+                response = fn(*args, **kwargs)
+                record_call(time.perf_counter() - start, response)
+                return response
+            except Exception as e:
+                record_call(time.perf_counter() - start)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Asynchronous version of `call`, for coroutine functions like `AsyncOpenAI.responses.create`.
+        Waiting for the budget or a retry does not block the event loop.
+
+        Args:
+            fn (Callable[..., Any]): The coroutine function to call.
+            *args: Positional arguments of `fn`.
+            **kwargs: Keyword arguments of `fn`.
+
+        Returns:
+            Any: The awaited return value of `fn`.
+
+        Raises:
+            Exception: The last error, if it is not retryable or the retries are exhausted.
+        """
+
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._throttle_delay(kwargs))
+            self._count("requests")
+            start = time.perf_counter()
+            try:
+                response = await fn(*args, **kwargs)
+                record_call(time.perf_counter() - start, response)
+                return response
+            except Exception as e:
+                record_call(time.perf_counter() - start)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+_scheduler = RequestScheduler()
+
+
+def get_scheduler() -> RequestScheduler:
+    """
+    Return the scheduler shared by all stages.
+
+    Returns:
+        RequestScheduler: The current shared scheduler.
+    """
+
+    return _scheduler
+
+
+def set_scheduler(scheduler: RequestScheduler) -> RequestScheduler:
+    """
+    Replace the scheduler shared by all stages, for example to apply the account's rate limits.
+
+    Args:
+        scheduler (RequestScheduler): The new shared scheduler.
+
+    Returns:
+        RequestScheduler: The previous scheduler.
+    """
+
+    global _scheduler
+    previous, _scheduler = _scheduler, scheduler
+    return previous
+
+
+def submit(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Send a request through the shared scheduler, see `RequestScheduler.call`.
+    """
+
+    return _scheduler.call(fn, *args, **kwargs)
+
+
+async def submit_async(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Send an asynchronous request through the shared scheduler, see `RequestScheduler.call_async`.
+    """
+
+    return await _scheduler.call_async(fn, *args, **kwargs)
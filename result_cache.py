@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+_digest_lock = threading.Lock()
+_file_digests: dict[tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str, chunk_size: int=1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file's content.
+    Digests are memoised per (path, size, mtime), so several stages of one run hash the video only once.
+
+    Args:
+        path (str): The path of the file to hash.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _digest_lock:
+        if memo_key in _file_digests:
+            return _file_digests[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+
+    with _digest_lock:
+        _file_digests[memo_key] = digest.hexdigest()
+
+    return _file_digests[memo_key]
+
+
+def text_digest(text: str) -> str:
+    """
+    Compute the SHA-256 digest of a string.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(stage: str, content_hash: str, model: str, request: dict) -> str:
+    """
+    Build a cache key from everything that determines a stage's output.
+
+    Args:
+        stage (str): The stage name, like "transcription" or "objects".
+        content_hash (str): The digest of the stage input (video file or transcription).
+        model (str): The model ID used by the stage.
+        request (dict): The remaining request parameters, including the prompt text and JSON schema.
+
+    Returns:
+        str: The hexadecimal SHA-256 cache key.
+    """
+
+    payload = json.dumps(
+        {"stage": stage, "content": content_hash, "model": model, "request": request},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return text_digest(payload)
+
+
+class ResultCache:
+    """
+    On-disk SQLite cache of stage outputs, safe to share between threads.
+
+    Entries older than `ttl` seconds are expired, and once the cache exceeds `max_bytes`
+    the least recently used entries are evicted. With `bypass` enabled, lookups always miss
+    but fresh results are still written, which refreshes stale entries.
+    """
+
+    def __init__(self, path: str, max_bytes: int | None=None, ttl: float | None=None, bypass: bool=False):
+        """
+        Args:
+            path (str): The SQLite database file. Parent directories are created if needed.
+            max_bytes (int, optional): Maximum total size of the cached values.
+            ttl (float, optional): Maximum age in seconds of a cached value.
+            bypass (bool): Ignore cached values on lookup.
+
+        Raises:
+            ValueError: If `max_bytes` or `ttl` is less than or equal to 0.
+        """
+
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be greater than 0")
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, stage TEXT, value TEXT, size INTEGER, created REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a cached value.
+
+        Args:
+            key (str): The cache key, see `make_key`.
+
+        Returns:
+            str | None: The cached value, or None on a miss, an expired entry or when bypassing.
+        """
+
+        if self.bypass:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        return row[0]
+
+    def set(self, key: str, value: str, stage: str="") -> None:
+        """
+        Store a value and evict expired or least recently used entries if needed.
+
+        Args:
+            key (str): The cache key, see `make_key`.
+            value (str): The stage output to cache.
+            stage (str, optional): The stage name, kept for inspection.
+        """
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, stage, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stage, value, len(value.encode("utf-8")), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def get_or_compute(self, key: str, compute: Callable[[], str], stage: str="") -> str:
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+
+        Args:
+            key (str): The cache key, see `make_key`.
+            compute (Callable[[], str]): Produces the value on a miss.
+            stage (str, optional): The stage name, used for logging.
+
+        Returns:
+            str: The cached or freshly computed value.
+        """
+
+        value = self.get(key)
+        if value is not None:
+            logger.info(f"Cache hit for stage '{stage}'")
+            return value
+
+        value = compute()
+        self.set(key, value, stage=stage)
+        return value
+
+    def _evict(self, now: float) -> None:
+        # Drop expired entries first, then the least recently used ones until under budget
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+
+        if self.max_bytes is not None:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed ASC").fetchall()
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    total -= size
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+
+        with self._lock:
+            self._conn.close()
@@ -1,22 +1,24 @@
+import asyncio
 import logging
-from openai import OpenAI
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, AsyncOpenAI
+from request_scheduler import submit, submit_async
+from metrics import propagate
+from text_chunking import split_transcript
 
 logger = logging.getLogger(__name__)
 
-def sentiment_analysis(client: OpenAI, transcription: str, model: str) -> str:
+def build_sentiment_request(transcription: str, model: str) -> dict:
     """
-    Analyse the overall mode and sentiment of the video using OpenAI.
+    Build the keyword arguments of the `responses.create` call used for sentiment analysis.
     
     Args:
-        client (OpenAI): An initialised OpenAI client with a valid API key.
         transcription (str): The complete transcription of the video.
         model (str): Model ID used to generate the response, like gpt-4o or o3.
     
     Returns:
-        str: A JSON-formatted string containing the mode and sentiment analysis results.
-    
-    Raises:
-        RuntimeError: If an unexpected error occurs while analysing mode and sentiment.
+        dict: The request parameters (model, input and text format).
     """
 
     # Build input content
@@ -67,19 +69,180 @@ def sentiment_analysis(client: OpenAI, transcription: str, model: str) -> str:
         }
     }
 
+    return {
+        "model": model,
+        "input": [
+            {"role": "developer", "content": dev_content},
+            {"role": "user", "content": usr_content}
+        ],
+        "text": json_schema
+    }
+
+
+def build_sentiment_reduce_request(partials: list[str], model: str) -> dict:
+    """
+    Build the keyword arguments of the `responses.create` call that merges the mode and sentiment analyses
+    of consecutive transcript chunks into one for the whole video. The output schema is the same as
+    `build_sentiment_request`.
+
+    Args:
+        partials (list[str]): The JSON analysis of each chunk, in order.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+
+    Returns:
+        dict: The request parameters (model, input and text format).
+    """
+
+    # Build input content
+    dev_content = [
+        {
+            "type": "input_text",
+            "text": "Return results that strictly match the given JSON format."
+        }
+    ]
+
+    usr_content = [
+        {
+            "type": "input_text",
+            "text": (
+                "The following are mode and sentiment analyses of consecutive parts of one video transcription."
+                "Combine them into the overall mode and sentiment of the whole video,"
+                "and briefly explain the reasons for choosing these labels."
+                + "".join(f"\nPart {i}: {partial}" for i, partial in enumerate(partials, start=1))
+            )
+        }
+    ]
+
+    return {
+        "model": model,
+        "input": [
+            {"role": "developer", "content": dev_content},
+            {"role": "user", "content": usr_content}
+        ],
+        "text": build_sentiment_request(transcription="", model=model)["text"]
+    }
+
+
+def sentiment_analysis(
+    client: OpenAI,
+    transcription: str,
+    model: str,
+    max_tokens: int | None=None,
+    max_workers: int=4
+) -> str:
+    """
+    Analyse the overall mode and sentiment of the video using OpenAI.
+    A transcription longer than `max_tokens` is split into chunks that are analysed concurrently,
+    then the partial analyses are merged by a final request.
+    
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        transcription (str): The complete transcription of the video.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        max_tokens (int, optional): Token budget of each chunk. The whole transcription is sent at once if None.
+        max_workers (int): Maximum number of chunks analysed at the same time.
+    
+    Returns:
+        str: A JSON-formatted string containing the mode and sentiment analysis results.
+    
+    Raises:
+        ValueError: If `max_tokens` is less than or equal to 0.
+        RuntimeError: If an unexpected error occurs while analysing mode and sentiment.
+    """
+
+    if max_tokens is not None:
+        chunks = split_transcript(transcription, max_tokens)
+        if len(chunks) > 1:
+            return _analyse_chunks(client, chunks, model, max_workers)
+
+    request = build_sentiment_request(transcription=transcription, model=model)
+
     # Call OpenAI API
     try:
         logger.info("Analysing mode and sentiment...")
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "developer", "content": dev_content},
-                {"role": "user", "content": usr_content}
-            ],
-            text=json_schema
-        )
+        response = submit(client.responses.create, **request)
+    
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while analysing mode and sentiment") from e
+    
+    return response.output_text
+
+
+def _analyse_chunks(client: OpenAI, chunks: list[str], model: str, max_workers: int) -> str:
+    def analyse(chunk: str) -> str:
+        return submit(client.responses.create, **build_sentiment_request(transcription=chunk, model=model)).output_text
+
+    try:
+        logger.info(f"Analysing mode and sentiment in {len(chunks)} chunks...")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sentiment") as executor:
+            partials = list(executor.map(propagate(analyse), chunks))
+
+        logger.info("Merging mode and sentiment of all chunks...")
+        response = submit(client.responses.create, **build_sentiment_reduce_request(partials=partials, model=model))
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while analysing mode and sentiment") from e
+
+    return response.output_text
+
+
+async def sentiment_analysis_async(
+    client: AsyncOpenAI,
+    transcription: str,
+    model: str,
+    semaphore: asyncio.Semaphore | None=None,
+    max_tokens: int | None=None
+) -> str:
+    """
+    Asynchronous version of `sentiment_analysis` built on `AsyncOpenAI`.
+    
+    Args:
+        client (AsyncOpenAI): An initialised asynchronous OpenAI client with a valid API key.
+        transcription (str): The complete transcription of the video.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        semaphore (asyncio.Semaphore, optional): Limits the number of in-flight requests to the endpoint.
+        max_tokens (int, optional): Token budget of each chunk, see `sentiment_analysis`.
+    
+    Returns:
+        str: A JSON-formatted string containing the mode and sentiment analysis results.
+    
+    Raises:
+        ValueError: If `max_tokens` is less than or equal to 0.
+        RuntimeError: If an unexpected error occurs while analysing mode and sentiment.
+    """
+
+    if max_tokens is not None:
+        chunks = split_transcript(transcription, max_tokens)
+        if len(chunks) > 1:
+            return await _analyse_chunks_async(client, chunks, model, semaphore)
+
+    request = build_sentiment_request(transcription=transcription, model=model)
+
+    # Call OpenAI API
+    try:
+        async with semaphore or nullcontext():
+            logger.info("Analysing mode and sentiment...")
+            response = await submit_async(client.responses.create, **request)
     
     except Exception as e:
         raise RuntimeError(f"Unexpected error occurred while analysing mode and sentiment") from e
     
     return response.output_text
+
+
+async def _analyse_chunks_async(client: AsyncOpenAI, chunks: list[str], model: str, semaphore: asyncio.Semaphore | None) -> str:
+    async def analyse(request: dict) -> str:
+        async with semaphore or nullcontext():
+            return (await submit_async(client.responses.create, **request)).output_text
+
+    try:
+        logger.info(f"Analysing mode and sentiment in {len(chunks)} chunks...")
+        partials = await asyncio.gather(
+            *(analyse(build_sentiment_request(transcription=chunk, model=model)) for chunk in chunks)
+        )
+
+        logger.info("Merging mode and sentiment of all chunks...")
+        return await analyse(build_sentiment_reduce_request(partials=partials, model=model))
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while analysing mode and sentiment") from e
@@ -0,0 +1,348 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+import socketserver
+from importlib import import_module
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import OpenAI
+from main import load_api_key, load_cache, load_scheduler, make_client, validate_video_path, _load, _LAZY_IMPORTS
+from request_scheduler import get_scheduler, set_scheduler
+from result_cache import ResultCache
+from batch import process_video
+
+logger = logging.getLogger(__name__)
+
+# Job states, in order
+QUEUED, RUNNING, OK, ERROR = "queued", "running", "ok", "error"
+
+
+class PipelineService:
+    """
+    A resident pipeline: video jobs are queued and run on a bounded thread pool that shares one warm OpenAI client,
+    so each job pays neither the module imports nor a cold connection pool.
+    Finished jobs are kept for their results, up to `max_history`, the oldest finished jobs are forgotten first.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_workers: int=2,
+        cache: ResultCache | None=None,
+        single_pass: bool=False,
+        checkpoint_dir: str | None=None,
+        max_history: int=1000,
+        client: OpenAI | None=None
+    ):
+        """
+        Args:
+            api_key (str): The OpenAI API key for authentication.
+            max_workers (int): Maximum number of videos processed at the same time (must be > 0).
+            cache (ResultCache, optional): Cache of stage outputs shared by every job.
+            single_pass (bool): Read each video once for all stages, see `main.openai_pipeline`.
+            checkpoint_dir (str, optional): Directory of per-video checkpoints, see `batch.process_video`.
+            max_history (int): Maximum number of finished jobs kept with their results.
+            client (OpenAI, optional): The client shared by every job, one is created if omitted.
+
+        Raises:
+            ValueError: If `max_workers` is less than or equal to 0.
+        """
+
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+
+        self.api_key = api_key
+        self.cache = cache
+        self.single_pass = single_pass
+        self.checkpoint_dir = checkpoint_dir
+        self.max_history = max_history
+        self.client = client or make_client(api_key)
+        # main defers the stage modules and moviepy to their first use, which would be the first job
+        _load(*_LAZY_IMPORTS)
+        import_module("moviepy")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    def submit(self, video_path: str, force_stages: list[str] | None=None) -> dict:
+        """
+        Queue a video.
+
+        Args:
+            video_path (str): The path of the video file to be processed, as seen by the service.
+            force_stages (list[str], optional): Stages executed again despite their checkpoint.
+
+        Returns:
+            dict: The status of the new job, see `status`.
+
+        Raises:
+            FileNotFoundError: If the video file does not exist.
+            ValueError: If the file type is unsupported.
+        """
+
+        validate_video_path(video_path)
+        job = {"id": uuid.uuid4().hex, "video_path": video_path, "status": QUEUED, "submitted": time.time()}
+
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._forget_finished()
+
+        self._executor.submit(self._run, job, force_stages)
+        logger.info(f"Queued job {job['id']}: {video_path}")
+        return self.status(job["id"])
+
+    def _run(self, job: dict, force_stages: list[str] | None) -> None:
+        with self._lock:
+            job["status"], job["started"] = RUNNING, time.time()
+
+        record = process_video(
+            self.api_key, job["video_path"], self.client, self.cache, self.single_pass, self.checkpoint_dir, force_stages
+        )
+
+        with self._lock:
+            job.update(record, finished=time.time())
+        logger.info(f"Job {job['id']} {job['status']} in {record['elapsed']}s: {job['video_path']}")
+
+    def _forget_finished(self) -> None:
+        # Drop the oldest finished jobs beyond the history size, queued and running jobs are always kept
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in (OK, ERROR)]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def status(self, job_id: str) -> dict | None:
+        """
+        Look up the status of a job.
+
+        Args:
+            job_id (str): The job id returned by `submit`.
+
+        Returns:
+            dict | None: `id`, `video_path`, `status` ("queued", "running", "ok" or "error"), the `submitted`, `started`
+                and `finished` timestamps, and `elapsed` and `error` once finished; None for an unknown job.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return {key: value for key, value in job.items() if key not in ("output", "metrics")} if job else None
+
+    def result(self, job_id: str) -> dict | None:
+        """
+        Look up the full record of a job.
+
+        Args:
+            job_id (str): The job id returned by `submit`.
+
+        Returns:
+            dict | None: The status of the job, plus `output` and `metrics` once finished,
+                see `batch.process_video`; None for an unknown job.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def jobs(self) -> list[dict]:
+        """
+        The status of every known job, in submission order.
+        """
+
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [status for status in map(self.status, job_ids) if status]
+
+    def close(self, wait: bool=True) -> None:
+        """
+        Stop accepting jobs.
+
+        Args:
+            wait (bool): Wait for the queued and running jobs to finish, otherwise queued jobs are cancelled.
+        """
+
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def make_handler(service: PipelineService) -> type:
+    """
+    Build the HTTP request handler of a service.
+
+    Endpoints:
+        POST /jobs               `{"video_path": "...", "force_stages": [...]}`, answers 202 with the job status.
+        GET  /jobs               The status of every job.
+        GET  /jobs/{id}          The status of a job.
+        GET  /jobs/{id}/result   The full record of a finished job, 409 while it is queued or running.
+        GET  /health             `{"status": "ok"}` and the request scheduler counters.
+
+    Args:
+        service (PipelineService): The service the requests are handled by.
+
+    Returns:
+        type: A `BaseHTTPRequestHandler` subclass.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+
+            if parts == ["health"]:
+                self._reply(200, {"status": "ok", "requests": get_scheduler().stats()})
+            elif parts == ["jobs"]:
+                self._reply(200, {"jobs": service.jobs()})
+            elif len(parts) == 2 and parts[0] == "jobs":
+                status = service.status(parts[1])
+                if status is None:
+                    self._error(404, f"Unknown job: {parts[1]}")
+                else:
+                    self._reply(200, status)
+            elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+                record = service.result(parts[1])
+                if record is None:
+                    self._error(404, f"Unknown job: {parts[1]}")
+                elif record["status"] in (QUEUED, RUNNING):
+                    self._error(409, f"Job is {record['status']}: {parts[1]}")
+                else:
+                    self._reply(200, record)
+            else:
+                self._error(404, f"Unknown path: {self.path}")
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            if self.path.split("?")[0].strip("/") != "jobs":
+                self._error(404, f"Unknown path: {self.path}")
+                return
+
+            try:
+                request = json.loads(body)
+                video_path = request["video_path"]
+                force_stages = request.get("force_stages") or None
+                if not isinstance(video_path, str) or not isinstance(force_stages, (list, type(None))):
+                    raise TypeError("video_path must be a string and force_stages a list")
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+                self._error(400, f"Invalid job request: {e}")
+                return
+
+            try:
+                self._reply(202, service.submit(video_path, force_stages))
+            except (FileNotFoundError, ValueError) as e:
+                self._error(400, str(e))
+            except RuntimeError as e:
+                # The executor refuses jobs once the service is closing
+                self._error(503, str(e))
+
+        def _error(self, status: int, message: str) -> None:
+            self._reply(status, {"error": message})
+
+        def _reply(self, status: int, payload: dict) -> None:
+            data = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def address_string(self) -> str:
+            # Unix socket clients have no address
+            return self.client_address[0] if self.client_address else "unix"
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    """
+    An HTTP server listening on a Unix socket, so only local users with access to the socket file can submit jobs.
+    """
+
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        # Replace the socket file left by a previous run
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+
+def make_server(service: PipelineService, host: str="127.0.0.1", port: int=8080, socket_path: str | None=None):
+    """
+    Create the HTTP server of a service, on a TCP port or a Unix socket.
+
+    Args:
+        service (PipelineService): The service the requests are handled by.
+        host (str): Interface to listen on.
+        port (int): Port to listen on, a free one if 0.
+        socket_path (str, optional): Listen on this Unix socket instead of `host` and `port`.
+
+    Returns:
+        socketserver.BaseServer: The server, call `serve_forever` to start it.
+    """
+
+    if socket_path:
+        return UnixHTTPServer(socket_path, make_handler(service))
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: list[str] | None=None) -> int:
+    """
+    Command line entry point of the service. The cache is configured by the same environment variables
+    as `main.py`, see `main.load_cache`.
+
+    Args:
+        argv (list[str], optional): Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code.
+
+    Example:
+        $ python service.py --port 8080 --workers 2 --checkpoint-dir .checkpoints
+        $ curl -d '{"video_path": "AI_Intern_Project.mp4"}' localhost:8080/jobs
+    """
+
+    parser = argparse.ArgumentParser(description="Serve the video pipeline over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--socket", help="Unix socket to listen on instead of a TCP port")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="Number of videos processed concurrently")
+    parser.add_argument("--single-pass", action="store_true", help="Read each video once for all stages (network storage)")
+    parser.add_argument("--checkpoint-dir", help="Directory of per-video stage checkpoints, to resume interrupted jobs")
+    args = parser.parse_args(argv)
+
+    try:
+        api_key = load_api_key()
+        set_scheduler(load_scheduler())
+        service = PipelineService(
+            api_key, max_workers=args.workers, cache=load_cache(), single_pass=args.single_pass,
+            checkpoint_dir=args.checkpoint_dir
+        )
+        server = make_server(service, args.host, args.port, args.socket)
+
+    except Exception:
+        logger.exception("Fatal Error: Service failed to start.")
+        return 1
+
+    logger.info(f"Serving the pipeline on {args.socket or f'http://{args.host}:{server.server_address[1]}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down, waiting for running jobs...")
+    finally:
+        server.server_close()
+        service.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import time
+import logging
+from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+
+logger = logging.getLogger(__name__)
+
+# A stage is declared as (dependencies, callable). The callable receives the
+# results of its dependencies as keyword arguments named after those stages.
+Stage = tuple[tuple[str, ...], Callable[..., Any]]
+
+
+def run_stages(stages: dict[str, Stage], max_workers: int=4, timings: dict[str, float] | None=None) -> dict[str, Any]:
+    """
+    Execute a set of dependent pipeline stages concurrently on a thread pool.
+    A stage is started as soon as every stage it depends on has completed,
+    so independent stages overlap instead of running one after another.
+
+    Args:
+        stages (dict[str, Stage]): Mapping of stage name to `(dependencies, callable)`.
+            The callable is invoked with the results of its dependencies as keyword arguments.
+        max_workers (int): Maximum number of stages running at the same time (must be > 0).
+        timings (dict[str, float], optional): If given, filled with the wall time in seconds of each stage.
+
+    Returns:
+        dict[str, Any]: A dictionary mapping each stage name to its result.
+
+    Raises:
+        ValueError:
+            - If `max_workers` is less than or equal to 0.
+            - If a stage depends on an unknown stage or the dependencies contain a cycle.
+        Exception: Propagates the first error raised by a stage. Stages that have not started yet are cancelled.
+    """
+
+    if max_workers <= 0:
+        raise ValueError("max_workers must be greater than 0")
+
+    # Validate the dependency graph before starting any work
+    for name, (deps, _) in stages.items():
+        unknown = [dep for dep in deps if dep not in stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {unknown}")
+
+    results: dict[str, Any] = {}
+    pending = dict(stages)
+    running: dict[Future, str] = {}
+
+    def run_stage(name: str, func: Callable[..., Any], kwargs: dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(**kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if timings is not None:
+                timings[name] = elapsed
+            logger.debug(f"Stage '{name}' finished in {elapsed:.2f}s")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as executor:
+        try:
+            while pending or running:
+                # Submit every stage whose dependencies are all satisfied
+                ready = [name for name, (deps, _) in pending.items() if all(dep in results for dep in deps)]
+                for name in ready:
+                    deps, func = pending.pop(name)
+                    kwargs = {dep: results[dep] for dep in deps}
+                    running[executor.submit(run_stage, name, func, kwargs)] = name
+
+                if not running:
+                    raise ValueError(f"Stage dependencies contain a cycle: {sorted(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+
+    return results
@@ -1,5 +1,14 @@
 import pytest
 from types import SimpleNamespace
+import request_scheduler
+
+
+@pytest.fixture(autouse=True)
+def restore_scheduler():
+    # Entry points replace the shared request scheduler; keep tests independent of each other
+    previous = request_scheduler.get_scheduler()
+    yield
+    request_scheduler.set_scheduler(previous)
 
 
 @pytest.fixture
@@ -0,0 +1,113 @@
+import subprocess
+import numpy as np
+import pytest
+from imageio_ffmpeg import get_ffmpeg_exe
+import adaptive_sampling as ad
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    # 5 s of a still grey picture in silence, then 5 s of a moving test pattern with a tone
+    path = tmp_path_factory.mktemp("adaptive") / "v.mp4"
+    subprocess.run([
+        get_ffmpeg_exe(), "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", "color=c=gray:size=64x48:rate=10:d=5",
+        "-f", "lavfi", "-i", "testsrc=size=64x48:rate=10:d=5",
+        "-f", "lavfi", "-i", "aevalsrc=0:d=5",
+        "-f", "lavfi", "-i", "sine=frequency=440:d=5",
+        "-filter_complex", "[0:v][2:a][1:v][3:a]concat=n=2:v=1:a=1[v][a]",
+        "-map", "[v]", "-map", "[a]", "-c:v", "mpeg4", "-c:a", "aac", str(path)
+    ], check=True)
+    return str(path)
+
+
+def test_scan_video_scores_change_and_audio(video):
+    scan = ad.scan_video(video, candidate_rate=2)
+
+    assert list(scan["indices"][:3]) == [0, 5, 10]
+    assert np.allclose(scan["times"], scan["indices"] / 10)
+    still, busy = slice(1, 9), slice(11, 19)
+    assert scan["visual"][busy].mean() > scan["visual"][still].mean()
+    assert scan["audio"][still].max() < 0.01 < scan["audio"][busy].min()
+
+
+def test_adaptive_frame_indices_favours_active_part(video):
+    stats = {}
+    indices = ad.adaptive_frame_indices(video, max_frames=8, candidate_rate=2, stats=stats)
+
+    assert len(indices) == 8 and indices == sorted(indices)
+    assert sum(index >= 50 for index in indices) >= 6
+    assert min(indices) < 50
+    assert stats == {"candidates": 20, "selected": 8}
+
+
+def test_adaptive_frames_decodes_selected_frames(video):
+    frames = ad.adaptive_frames(video, max_frames=4, candidate_rate=2)
+    images = list(frames)
+
+    assert len(images) == 4
+    assert images[0].shape == (48, 64, 3)
+
+
+@pytest.mark.parametrize("seek_threshold", [300, 5])
+def test_read_frames_matches_sequential_decode(video, monkeypatch, seek_threshold):
+    import cv2
+    monkeypatch.setattr(ad, "SEEK_THRESHOLD", seek_threshold)
+    cap = cv2.VideoCapture(video)
+    expected = []
+    for index in range(30):
+        ok, img = cap.read()
+        if index in (0, 7, 29):
+            expected.append(img)
+    cap.release()
+
+    frames = list(ad.read_frames(video, [0, 7, 29, 1000]))
+
+    assert len(frames) == 3
+    assert all(np.array_equal(a, b) for a, b in zip(frames, expected))
+
+
+def test_allocate_frames_follows_activity():
+    scores = np.zeros(100)
+    scores[80:] = 1.0
+
+    selected = ad.allocate_frames(scores, budget=10, floor=0.2)
+
+    # The active fifth gets all of the activity share and a fifth of the even share: 8 frames instead of 2
+    assert len(selected) == 10
+    assert (selected >= 80).sum() == 8
+    assert selected.min() < 80
+
+
+def test_allocate_frames_even_with_full_floor():
+    selected = ad.allocate_frames(np.random.default_rng(0).random(100), budget=5, floor=1)
+    assert list(selected) == [9, 29, 49, 69, 89]
+
+
+def test_allocate_frames_fills_spare_budget():
+    scores = np.array([0, 0, 1, 0, 0.5, 0], dtype=float)
+    selected = ad.allocate_frames(scores, budget=4, floor=0)
+    assert len(selected) == 4 and {2, 4} <= set(selected)
+
+
+def test_allocate_frames_keeps_all_under_budget():
+    assert list(ad.allocate_frames(np.ones(3), budget=5)) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("budget, floor", [(0, 0.2), (3, -0.1), (3, 1.5)])
+def test_allocate_frames_invalid(budget, floor):
+    with pytest.raises(ValueError):
+        ad.allocate_frames(np.ones(10), budget=budget, floor=floor)
+
+
+def test_audio_energy_of_windows():
+    samples = np.concatenate([np.zeros(8000), np.full(8000, 16384)]).astype(np.int16)
+    energy = ad.audio_energy(samples, np.array([0.5, 1.5, 1.0]), window=1.0)
+    assert np.allclose(energy, [0.0, 0.5, np.sqrt(0.125)])
+
+
+def test_invalid_options(video):
+    with pytest.raises(ValueError):
+        ad.scan_video(video, candidate_rate=0)
+    with pytest.raises(ValueError):
+        ad.adaptive_frame_indices(video, max_frames=4, audio_weight=2)
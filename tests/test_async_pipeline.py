@@ -0,0 +1,112 @@
+import json
+import asyncio
+import pytest
+import async_pipeline as ap
+
+
+def patch_stages(monkeypatch, transcript="transcript text", seen=None):
+    seen = {} if seen is None else seen
+
+    async def fake_transcript(client, video_path, model, semaphore=None, chunk_seconds=None):
+        seen["chunk_seconds"] = chunk_seconds
+        return transcript
+
+    async def fake_objects(client, video_path, model, sample_rate=0.5, semaphore=None, **kwargs):
+        return json.dumps({"objects": ["cat", "cup"]})
+
+    async def fake_sentiment(client, transcription, model, semaphore=None, max_tokens=None):
+        seen["sentiment_max_tokens"] = max_tokens
+        return json.dumps({"mode": "info", "sentiment": "neutral", "explanation": transcription})
+
+    async def fake_qa(client, transcription, model, semaphore=None, max_tokens=None):
+        seen["qa_max_tokens"] = max_tokens
+        return json.dumps({"QA_pairs": [{"Q": "What?", "A": "This."}]})
+
+    monkeypatch.setattr(ap, "video_transcript_async", fake_transcript)
+    monkeypatch.setattr(ap, "object_detection_async", fake_objects)
+    monkeypatch.setattr(ap, "sentiment_analysis_async", fake_sentiment)
+    monkeypatch.setattr(ap, "question_answer_async", fake_qa)
+
+
+def test_async_openai_pipeline_merges_outputs(monkeypatch):
+    patch_stages(monkeypatch)
+    timings = {}
+    metrics = ap.RunMetrics()
+
+    merged = asyncio.run(ap.openai_pipeline("sk", "/dev/null", client=object(), timings=timings, metrics=metrics))
+
+    assert merged["Transcription"] == "transcript text"
+    assert merged["Objects"] == ["cat", "cup"]
+    assert merged["Mode and sentiment"]["explanation"] == "transcript text"
+    assert merged["Q&A pairs"][0]["Q"] == "What?"
+    assert set(timings) == {"transcription", "objects", "sentiment", "qa"}
+    assert set(metrics.report()["stages"]) == {"transcription", "objects", "sentiment", "qa"}
+
+
+def test_async_openai_pipeline_chunks_long_inputs(monkeypatch):
+    seen = {}
+    patch_stages(monkeypatch, seen=seen)
+
+    asyncio.run(ap.openai_pipeline("sk", "/dev/null", client=object()))
+
+    assert seen == {
+        "chunk_seconds": ap.TRANSCRIPTION_CHUNK_SECONDS,
+        "sentiment_max_tokens": ap.ANALYSIS_CHUNK_TOKENS,
+        "qa_max_tokens": ap.ANALYSIS_CHUNK_TOKENS
+    }
+
+
+def test_async_openai_pipeline_combined_analysis(monkeypatch):
+    patch_stages(monkeypatch)
+
+    async def fake_analysis(client, transcription, model, semaphore=None, max_tokens=None):
+        return json.dumps({"mode": "m", "sentiment": "s", "explanation": transcription, "QA_pairs": []})
+
+    monkeypatch.setattr(ap, "transcript_analysis_async", fake_analysis)
+    timings = {}
+
+    merged = asyncio.run(ap.openai_pipeline("sk", "/dev/null", client=object(), timings=timings, combined_analysis=True))
+
+    assert merged["Mode and sentiment"] == {"mode": "m", "sentiment": "s", "explanation": "transcript text"}
+    assert merged["Q&A pairs"] == []
+    assert set(timings) == {"transcription", "objects", "analysis"}
+
+
+def test_async_openai_pipeline_raises_during_stage(monkeypatch):
+    patch_stages(monkeypatch)
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("stage failed")
+
+    monkeypatch.setattr(ap, "video_transcript_async", fail)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ap.openai_pipeline("sk", "/dev/null", client=object()))
+
+
+def test_create_limiters_defaults_and_overrides():
+    limiters = ap.create_limiters({"responses": 2})
+    assert set(limiters) == {"transcriptions", "responses"}
+    assert limiters["responses"]._value == 2
+    assert limiters["transcriptions"]._value == ap.DEFAULT_CONCURRENCY["transcriptions"]
+
+
+def test_create_limiters_invalid():
+    with pytest.raises(ValueError):
+        ap.create_limiters({"responses": 0})
+
+
+def test_process_videos_isolates_failures(monkeypatch):
+    patch_stages(monkeypatch)
+
+    async def maybe_fail(client, video_path, model, semaphore=None, **kwargs):
+        if video_path == "bad.mp4":
+            raise RuntimeError("bad video")
+        return "ok"
+
+    monkeypatch.setattr(ap, "video_transcript_async", maybe_fail)
+
+    results = asyncio.run(ap.process_videos("sk", ["good.mp4", "bad.mp4"]))
+
+    assert results[0]["Transcription"] == "ok"
+    assert isinstance(results[1], RuntimeError)
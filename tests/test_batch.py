@@ -0,0 +1,128 @@
+import json
+import pytest
+import batch
+
+
+def test_collect_videos_from_directory(tmp_path):
+    (tmp_path / "b.mp4").write_bytes(b"\x00")
+    (tmp_path / "a.mov").write_bytes(b"\x00")
+    (tmp_path / "notes.txt").write_text("hi")
+
+    videos = batch.collect_videos(str(tmp_path))
+
+    assert videos == [str(tmp_path / "a.mov"), str(tmp_path / "b.mp4")]
+
+
+def test_collect_videos_from_manifest(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('{"video_path": "one.mp4"}\n\n"/abs/two.mp4"\n')
+
+    videos = batch.collect_videos(str(manifest))
+
+    assert videos == [str(tmp_path / "one.mp4"), "/abs/two.mp4"]
+
+
+def test_collect_videos_malformed_manifest(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('{"path": "one.mp4"}\n')
+
+    with pytest.raises(ValueError):
+        batch.collect_videos(str(manifest))
+
+
+def test_collect_videos_from_glob(tmp_path):
+    (tmp_path / "x.mp4").write_bytes(b"\x00")
+    assert batch.collect_videos(str(tmp_path / "*.mp4")) == [str(tmp_path / "x.mp4")]
+
+
+def test_collect_videos_no_match(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        batch.collect_videos(str(tmp_path / "*.mp4"))
+
+
+def test_run_batch_streams_results_and_isolates_errors(monkeypatch, tmp_path):
+    good = tmp_path / "good.mp4"
+    good.write_bytes(b"\x00")
+    clients = []
+
+    def fake_pipeline(api_key, video_path, client=None, cache=None, metrics=None, **kwargs):
+        clients.append(client)
+        with metrics.stage("transcription"):
+            metrics.add("transcription", api_calls=1)
+        return {"Transcription": "ok"}
+
+    monkeypatch.setattr(batch, "make_client", lambda api_key: object())
+    monkeypatch.setattr(batch, "openai_pipeline", fake_pipeline)
+
+    output = tmp_path / "results.jsonl"
+    metrics_path = tmp_path / "metrics.prom"
+    summary = batch.run_batch(
+        "sk", [str(good), str(tmp_path / "missing.mp4")], str(output), max_workers=2, metrics_path=str(metrics_path)
+    )
+
+    records = {r["video_path"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert summary == {"ok": 1, "error": 1}
+    assert records[str(good)]["output"] == {"Transcription": "ok"}
+    assert records[str(tmp_path / "missing.mp4")]["error"].startswith("FileNotFoundError")
+    assert len(clients) == 1
+    assert records[str(good)]["metrics"]["stages"]["transcription"]["api_calls"] == 1
+    assert records[str(tmp_path / "missing.mp4")]["metrics"]["stages"] == {}
+    assert f'pipeline_stage_api_calls{{video="{good}",stage="transcription"}} 1' in metrics_path.read_text()
+
+
+def test_run_batch_forwards_only_stages(monkeypatch, tmp_path):
+    seen = []
+
+    def fake_process_video(api_key, video_path, client, cache=None, single_pass=False, checkpoint_dir=None,
+                           force_stages=None, only_stages=None):
+        seen.append(only_stages)
+        return {"video_path": video_path, "status": "ok", "output": {}, "metrics": {}}
+
+    monkeypatch.setattr(batch, "make_client", lambda api_key: object())
+    monkeypatch.setattr(batch, "process_video", fake_process_video)
+
+    batch.run_batch("sk", ["a.mp4", "b.mp4"], str(tmp_path / "out.jsonl"), only_stages=["objects"])
+    assert seen == [["objects"], ["objects"]]
+
+
+def test_run_batch_invalid_workers(tmp_path):
+    with pytest.raises(ValueError):
+        batch.run_batch("sk", [], str(tmp_path / "out.jsonl"), max_workers=0)
+
+
+def test_main_exit_codes(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "load_api_key", lambda: "sk")
+    monkeypatch.setattr(batch, "collect_videos", lambda source: ["a.mp4"])
+    monkeypatch.setattr(batch, "run_batch", lambda *a, **kw: {"ok": 1, "error": 0})
+    assert batch.main(["videos", "-o", str(tmp_path / "out.jsonl")]) == 0
+
+    monkeypatch.setattr(batch, "run_batch", lambda *a, **kw: {"ok": 0, "error": 1})
+    assert batch.main(["videos"]) == 1
+
+    def fail(source):
+        raise FileNotFoundError(source)
+    monkeypatch.setattr(batch, "collect_videos", fail)
+    assert batch.main(["videos"]) == 1
+
+
+def test_main_passes_cache(monkeypatch, tmp_path):
+    seen = {}
+
+    def fake_run_batch(api_key, video_paths, output_path, max_workers=4, cache=None, metrics_path=None, **kwargs):
+        seen["cache"] = cache
+        seen.update(kwargs)
+        return {"ok": 1, "error": 0}
+
+    monkeypatch.setattr(batch, "load_api_key", lambda: "sk")
+    monkeypatch.setattr(batch, "collect_videos", lambda source: ["a.mp4"])
+    monkeypatch.setattr(batch, "run_batch", fake_run_batch)
+
+    assert batch.main([
+        "videos", "--cache", str(tmp_path / "c.db"), "--refresh-cache", "--single-pass",
+        "--checkpoint-dir", str(tmp_path / "ckpt"), "--force-stages", "qa", "sentiment", "--stages", "transcription"
+    ]) == 0
+    assert seen["cache"].bypass is True
+    assert seen["single_pass"] is True
+    assert seen["checkpoint_dir"] == str(tmp_path / "ckpt")
+    assert seen["force_stages"] == ["qa", "sentiment"]
+    assert seen["only_stages"] == ["transcription"]
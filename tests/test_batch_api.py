@@ -0,0 +1,129 @@
+import json
+import pytest
+from types import SimpleNamespace
+from openai import OpenAI
+import batch_api
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from sentiment_analysis import build_sentiment_request
+from question_answer import build_question_answer_request
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAIServer(batch_delay=0.05, array_items=2) as server:
+        yield server
+
+
+def make_client(server):
+    return OpenAI(api_key="sk-test", base_url=server.url, max_retries=0)
+
+
+def test_build_batch_lines_uses_interactive_requests():
+    lines = batch_api.build_batch_lines({"a.mp4": "one", "b.mp4": "two"}, "gpt-4.1", ["sentiment", "qa"])
+
+    assert [line["custom_id"] for line in lines] == ["sentiment-0", "qa-0", "sentiment-1", "qa-1"]
+    assert lines[0]["body"] == build_sentiment_request(transcription="one", model="gpt-4.1")
+    assert lines[3]["body"] == build_question_answer_request(transcription="two", model="gpt-4.1")
+    assert {line["url"] for line in lines} == {"/v1/responses"}
+
+
+def test_run_text_batch_maps_results_to_videos(server, tmp_path):
+    results = batch_api.run_text_batch(
+        make_client(server), {"a.mp4": "one", "b.mp4": "two"}, poll_interval=0.01, work_dir=str(tmp_path)
+    )
+
+    assert set(results) == {"a.mp4", "b.mp4"}
+    assert set(json.loads(results["a.mp4"]["sentiment"])) == {"mode", "sentiment", "explanation"}
+    assert len(json.loads(results["b.mp4"]["qa"])["QA_pairs"]) == 2
+    # One upload and one batch for all videos, and no interactive request
+    assert server.stats["requests"]["/v1/files"] == 1
+    assert server.stats["requests"]["/v1/batches"] == 1
+    assert server.stats["requests"]["batch:/v1/responses"] == 4
+    assert "/v1/responses" not in server.stats["requests"]
+    assert len(list(tmp_path.glob("batch_input_*.jsonl"))) == 1
+
+
+def test_run_text_batch_analyses_long_transcriptions_interactively(monkeypatch, server):
+    calls = []
+    monkeypatch.setitem(batch_api.TEXT_STAGES, "sentiment", (
+        build_sentiment_request, lambda **kwargs: calls.append(kwargs["max_tokens"]) or "long"
+    ))
+
+    results = batch_api.run_text_batch(
+        make_client(server), {"long.mp4": "word " * 50}, stages=["sentiment"], max_tokens=10, poll_interval=0.01
+    )
+
+    assert results == {"long.mp4": {"sentiment": "long"}}
+    assert calls == [10]
+    assert "/v1/batches" not in server.stats["requests"]
+
+
+def test_run_text_batch_rejects_unknown_stage(server):
+    with pytest.raises(ValueError):
+        batch_api.run_text_batch(make_client(server), {"a.mp4": "one"}, stages=["objects"])
+
+
+def test_wait_for_batch_raises_on_failure_and_timeout():
+    statuses = iter(["in_progress", "failed"])
+    client = SimpleNamespace(batches=SimpleNamespace(
+        retrieve=lambda batch_id: SimpleNamespace(status=next(statuses), errors=None)
+    ))
+
+    with pytest.raises(RuntimeError, match="failed"):
+        batch_api.wait_for_batch(client, "batch_1", poll_interval=0)
+
+    client.batches.retrieve = lambda batch_id: SimpleNamespace(status="in_progress", errors=None)
+    with pytest.raises(RuntimeError, match="still in_progress"):
+        batch_api.wait_for_batch(client, "batch_1", poll_interval=0, timeout=0)
+
+
+def test_read_batch_output_skips_failed_requests():
+    lines = [
+        {"custom_id": "qa-0", "response": {"status_code": 200, "body": {"output": [
+            {"type": "message", "content": [{"type": "output_text", "text": "{\"QA_pairs\": []}"}]}
+        ]}}, "error": None},
+        {"custom_id": "qa-1", "response": {"status_code": 500, "body": {"error": "boom"}}, "error": None},
+        {"custom_id": "qa-2", "response": None, "error": {"message": "expired"}}
+    ]
+    client = SimpleNamespace(files=SimpleNamespace(
+        content=lambda file_id: SimpleNamespace(text="\n".join(map(json.dumps, lines)) + "\n")
+    ))
+
+    outputs = batch_api.read_batch_output(client, SimpleNamespace(output_file_id="file-1", error_file_id=None))
+
+    assert outputs == {"qa-0": "{\"QA_pairs\": []}"}
+
+
+def test_run_bulk_merges_batch_outputs_and_checkpoints(monkeypatch, server, tmp_path):
+    videos = []
+    for name in ("a.mp4", "b.mp4"):
+        (tmp_path / name).write_bytes(name.encode())
+        videos.append(str(tmp_path / name))
+    seen = {}
+
+    def fake_process_video(api_key, video_path, client, only_stages=None, **kwargs):
+        seen[video_path] = only_stages
+        if video_path.endswith("b.mp4"):
+            return {"video_path": video_path, "status": "error", "error": "RuntimeError: boom", "elapsed": 0, "metrics": {}}
+        output = {"Transcription": "hello", "Objects": ["cat"]}
+        return {"video_path": video_path, "status": "ok", "output": output, "elapsed": 0, "metrics": {}}
+
+    monkeypatch.setattr(batch_api, "process_video", fake_process_video)
+    output_path = tmp_path / "results.jsonl"
+    checkpoint_dir = str(tmp_path / "ckpt")
+
+    summary = batch_api.run_bulk(
+        "sk", videos, str(output_path), checkpoint_dir=checkpoint_dir, poll_interval=0.01, client=make_client(server)
+    )
+
+    assert summary == {"ok": 1, "error": 1}
+    assert seen[videos[0]] == ["transcription", "objects"]
+    records = {record["video_path"]: record for record in map(json.loads, output_path.read_text().splitlines())}
+    assert list(records[videos[0]]["output"]) == ["Transcription", "Objects", "Mode and sentiment", "Q&A pairs"]
+    assert records[videos[1]]["status"] == "error"
+
+    # A rerun restores the text stages from the checkpoints instead of batching them again
+    batch_api.run_bulk(
+        "sk", videos, str(output_path), checkpoint_dir=checkpoint_dir, poll_interval=0.01, client=make_client(server)
+    )
+    assert server.stats["requests"]["/v1/batches"] == 1
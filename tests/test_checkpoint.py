@@ -0,0 +1,59 @@
+import json
+import checkpoint as ck
+
+
+def test_checkpoint_saves_each_stage_and_reloads(tmp_path):
+    path = tmp_path / "ckpt" / "v.json"
+    checkpoint = ck.Checkpoint(str(path), video_path="v.mp4")
+
+    checkpoint.set("transcription", "hello")
+    checkpoint.fail("qa", RuntimeError("rate limited"))
+
+    saved = json.loads(path.read_text())
+    assert saved["video_path"] == "v.mp4"
+    assert saved["stages"]["transcription"]["output"] == "hello"
+    assert saved["stages"]["qa"] == {"status": "error", "error": "RuntimeError: rate limited", "updated": saved["stages"]["qa"]["updated"]}
+
+    reloaded = ck.Checkpoint(str(path))
+    assert reloaded.get("transcription") == "hello"
+    assert reloaded.get("qa") is None
+    assert reloaded.completed() == ["transcription"]
+
+
+def test_checkpoint_failure_replaces_output(tmp_path):
+    checkpoint = ck.Checkpoint(str(tmp_path / "v.json"))
+    checkpoint.set("qa", "old")
+    checkpoint.fail("qa", ValueError("bad"))
+    assert checkpoint.get("qa") is None
+
+
+def test_checkpoint_options_mismatch_is_a_miss(tmp_path):
+    checkpoint = ck.Checkpoint(str(tmp_path / "v.json"))
+    checkpoint.set("transcription", "text", {"timestamps": False})
+    checkpoint.set("objects", "[]")
+
+    assert checkpoint.get("transcription", {"timestamps": False}) == "text"
+    assert checkpoint.get("transcription", {"timestamps": True}) is None
+    assert checkpoint.get("transcription") is None
+    assert checkpoint.get("objects", {"detector": None}) is None
+    assert ck.Checkpoint(str(tmp_path / "v.json")).get("objects") == "[]"
+
+
+def test_checkpoint_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "v.json"
+    path.write_text("{not json")
+    checkpoint = ck.Checkpoint(str(path))
+    assert checkpoint.completed() == []
+    checkpoint.set("objects", "[]")
+    assert ck.Checkpoint(str(path)).get("objects") == "[]"
+
+
+def test_open_checkpoint_is_keyed_by_content(tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"video")
+    first = ck.open_checkpoint(str(tmp_path / "ckpt"), str(video))
+    first.set("transcription", "t")
+
+    moved = tmp_path / "b.mp4"
+    video.rename(moved)
+    assert ck.open_checkpoint(str(tmp_path / "ckpt"), str(moved)).get("transcription") == "t"
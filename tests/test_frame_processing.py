@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+import frame_processing as fp
+
+
+def noisy_frame(seed, value=128):
+    rng = np.random.default_rng(seed)
+    return np.clip(value + rng.normal(0, 2, (48, 64, 3)), 0, 255).astype(np.uint8)
+
+
+def pattern_frame():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    frame[:, ::8] = 255
+    return frame
+
+
+def test_frame_signature_shapes():
+    dhash, histogram = fp.frame_signature(pattern_frame())
+    assert dhash.shape == (fp.HASH_SIZE * fp.HASH_SIZE,)
+    assert histogram.shape == (fp.HISTOGRAM_BINS,)
+    assert histogram.sum() == pytest.approx(1.0)
+
+
+def test_frame_difference_identical_is_zero():
+    signature = fp.frame_signature(pattern_frame())
+    assert fp.frame_difference(signature, signature) == (0, 0.0)
+
+
+def test_deduplicate_frames_drops_near_duplicates():
+    frames = [pattern_frame(), pattern_frame(), noisy_frame(1, 30), noisy_frame(2, 30), pattern_frame()]
+    stats = {}
+
+    kept = list(fp.deduplicate_frames(frames, stats=stats))
+
+    assert len(kept) == 3
+    assert stats == {"sampled": 5, "duplicates": 2}
+
+
+def test_deduplicate_frames_zero_threshold_keeps_changes():
+    frames = [noisy_frame(1, 100), noisy_frame(2, 200)]
+    assert len(list(fp.deduplicate_frames(frames, hash_threshold=0, histogram_threshold=0))) == 2
+
+
+def test_deduplicate_frames_with_precomputed_signatures():
+    items = [(fp.frame_signature(noisy_frame(i)), i) for i in range(3)]
+    kept = list(fp.deduplicate_frames(items, signature=lambda item: item[0]))
+    assert [i for _, i in kept] == [0]
+
+
+def test_deduplicate_frames_invalid_threshold():
+    with pytest.raises(ValueError):
+        fp.deduplicate_frames([], hash_threshold=-1)
+
+
+def test_apply_frame_budget_spreads_evenly():
+    stats = {}
+    assert fp.apply_frame_budget(list(range(10)), 4, stats=stats) == [0, 3, 6, 9]
+    assert stats == {"over_budget": 6}
+
+
+def test_apply_frame_budget_no_limit():
+    items = [1, 2, 3]
+    assert fp.apply_frame_budget(items, None) == items
+    assert fp.apply_frame_budget(items, 5) == items
+
+
+def test_apply_frame_budget_invalid():
+    with pytest.raises(ValueError):
+        fp.apply_frame_budget([1], 0)
+
+
+def test_thin_frames_matches_budget_when_short():
+    stats = {}
+    assert fp.thin_frames(iter(range(8)), 4, stats=stats) == fp.apply_frame_budget(list(range(8)), 4)
+    assert stats == {"over_budget": 4}
+
+
+def test_thin_frames_bounds_buffer_and_spreads_evenly():
+    stats = {}
+    selected = fp.thin_frames(iter(range(1000)), 5, stats=stats)
+    assert len(selected) == 5
+    assert selected[0] == 0 and selected[-1] > 800
+    assert stats == {"over_budget": 995}
+
+
+def test_thin_frames_invalid():
+    with pytest.raises(ValueError):
+        fp.thin_frames([1], 0)
+
+
+def test_resize_frame_keeps_aspect_ratio():
+    img = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    assert fp.resize_frame(img, 960).shape == (540, 960, 3)
+
+
+def test_resize_frame_never_upscales():
+    img = np.zeros((100, 200, 3), dtype=np.uint8)
+    assert fp.resize_frame(img, 400) is img
+    assert fp.resize_frame(img, None) is img
+
+
+def test_resize_frame_invalid():
+    with pytest.raises(ValueError):
+        fp.resize_frame(np.zeros((2, 2, 3), dtype=np.uint8), 0)
+
+
+def test_make_contact_sheets_packs_and_crops():
+    frames = [np.full((100, 200, 3), value, dtype=np.uint8) for value in (10, 20, 30, 40, 50)]
+
+    sheets = list(fp.make_contact_sheets(frames, grid=(2, 2), tile_edge=50))
+
+    assert [sheet.shape for sheet in sheets] == [(50, 100, 3), (25, 100, 3)]
+    assert sheets[0][0, 0, 0] == 10 and sheets[0][0, 99, 0] == 20
+    assert sheets[0][49, 0, 0] == 30 and sheets[0][49, 99, 0] == 40
+    assert sheets[1][0, 0, 0] == 50 and sheets[1][0, 99, 0] == 0
+
+
+def test_make_contact_sheets_invalid_grid():
+    with pytest.raises(ValueError):
+        fp.make_contact_sheets([], grid=(0, 2))
+
+
+def blurred_frame():
+    import cv2
+    return cv2.GaussianBlur(pattern_frame(), (0, 0), 6)
+
+
+def test_frame_quality_measures_blur_and_tone():
+    sharpness, brightness, entropy = fp.frame_quality(pattern_frame())
+    assert sharpness > fp.frame_quality(blurred_frame())[0]
+    assert brightness == pytest.approx(255 / 8)
+    assert 0 < entropy < 1
+
+    assert fp.frame_quality(np.zeros((48, 64, 3), dtype=np.uint8)) == (0.0, 0.0, 0.0)
+
+
+def test_filter_low_quality_drops_blurred_and_blank_frames():
+    black = np.zeros((48, 64, 3), dtype=np.uint8)
+    white = np.full((48, 64, 3), 255, dtype=np.uint8)
+    frames = [pattern_frame(), black, blurred_frame(), white, noisy_frame(1)]
+    stats = {}
+
+    kept = list(fp.filter_low_quality(frames, stats=stats))
+
+    assert len(kept) == 2 and kept[0] is frames[0] and kept[1] is frames[4]
+    assert stats == {"low_quality": 3}
+
+
+def test_filter_low_quality_keeps_sharp_dark_frames():
+    # A dark scene with varied content is not a fade to black
+    dark = np.random.default_rng(0).integers(0, 24, (48, 64, 3)).astype(np.uint8)
+    assert fp.frame_quality(dark)[1] < fp.BRIGHTNESS_RANGE[0]
+    assert len(list(fp.filter_low_quality([dark]))) == 1
+
+
+def test_filter_low_quality_keeps_best_frame_when_all_rejected():
+    black = np.zeros((48, 64, 3), dtype=np.uint8)
+    blurred = blurred_frame()
+    stats = {}
+
+    kept = list(fp.filter_low_quality([black, blurred, black], stats=stats))
+
+    assert len(kept) == 1 and kept[0] is blurred
+    assert stats == {"low_quality": 2}
+
+
+def test_filter_low_quality_with_precomputed_quality():
+    items = [("a", (100.0, 128.0, 5.0)), ("b", (1.0, 128.0, 5.0)), ("c", (100.0, 250.0, 0.1))]
+    kept = list(fp.filter_low_quality(items, quality=lambda item: item[1]))
+    assert [name for name, _ in kept] == ["a"]
+
+
+@pytest.mark.parametrize("options", [{"blur_threshold": -1}, {"entropy_threshold": -1}, {"brightness_range": (200, 100)}])
+def test_filter_low_quality_invalid(options):
+    with pytest.raises(ValueError):
+        fp.filter_low_quality([], **options)
+
+
+def test_drop_covered_frames_skips_frames_already_seen():
+    frames = [{"cup"}, {"cup"}, set(), {"cup", "dog"}, {"dog"}, {"cat"}]
+    stats = {}
+
+    kept = list(fp.drop_covered_frames(frames, detect=lambda labels: labels, stats=stats))
+
+    # Frames where nothing is detected are left to the vision model
+    assert kept == [{"cup"}, set(), {"cup", "dog"}, {"cat"}]
+    assert stats == {"covered": 2}
@@ -0,0 +1,112 @@
+import os
+import threading
+import numpy as np
+import pytest
+import local_detector as ld
+
+
+class FakeNet:
+    def __init__(self, detections):
+        self.detections = np.array(detections, dtype=np.float32).reshape(1, 1, -1, 7)
+        self.inputs = []
+
+    def setInput(self, blob):
+        self.inputs.append(blob)
+
+    def forward(self):
+        return self.detections
+
+
+@pytest.fixture
+def fake_net(monkeypatch):
+    net = FakeNet([
+        [0, 1, 0.9, 0.1, 0.1, 0.5, 0.5],
+        [0, 3, 0.7, 0.2, 0.2, 0.4, 0.4],
+        [0, 1, 0.8, 0.6, 0.6, 0.9, 0.9],
+        [0, 2, 0.2, 0.0, 0.0, 1.0, 1.0]
+    ])
+    loaded = []
+    monkeypatch.setattr(ld.cv2.dnn, "readNet", lambda model, config: loaded.append((model, config)) or net)
+    return net, loaded
+
+
+def test_dnn_detector_returns_confident_labels(fake_net):
+    net, loaded = fake_net
+    detector = ld.DnnDetector("ssd.caffemodel", config="ssd.prototxt", labels=["background", "cup", "dog", "cat"])
+
+    labels = detector(np.zeros((90, 160, 3), dtype=np.uint8))
+
+    assert labels == {"cup", "cat"}
+    assert loaded == [("ssd.caffemodel", "ssd.prototxt")]
+    assert net.inputs[0].shape == (1, 3, 300, 300)
+    assert repr(detector) == (
+        f"DnnDetector({os.path.abspath('ssd.caffemodel')!r}, config={os.path.abspath('ssd.prototxt')!r}, labels='"
+        + ld.text_digest("background\ncup\ndog\ncat")[:12]
+        + "', confidence=0.5, input_size=(300, 300), scale=0.00784313725490196, mean=(127.5, 127.5, 127.5), swap_rb=False)"
+    )
+
+
+@pytest.mark.parametrize("options", [
+    {"labels": ["background", "cup", "dog", "bird"]},
+    {"config": "other.prototxt"},
+    {"confidence": 0.6},
+    {"input_size": (512, 512)},
+    {"scale": 1.0},
+    {"mean": (0, 0, 0)},
+    {"swap_rb": True}
+])
+def test_dnn_detector_repr_changes_with_options(fake_net, options):
+    base = {"config": "ssd.prototxt", "labels": ["background", "cup", "dog", "cat"]}
+    assert repr(ld.DnnDetector("ssd.caffemodel", **base)) != repr(ld.DnnDetector("ssd.caffemodel", **{**base, **options}))
+
+
+def test_dnn_detector_repr_tells_same_named_models_apart(fake_net):
+    assert repr(ld.DnnDetector("a/ssd.caffemodel")) != repr(ld.DnnDetector("b/ssd.caffemodel"))
+
+
+def test_dnn_detector_uses_class_ids_without_labels(fake_net):
+    detector = ld.DnnDetector("ssd.onnx", confidence=0.1)
+    assert detector(np.zeros((32, 32, 3), dtype=np.uint8)) == {"1", "2", "3"}
+
+
+def test_dnn_detector_is_thread_safe(fake_net):
+    detector = ld.DnnDetector("ssd.onnx", labels=["background", "cup", "dog", "cat"])
+    img = np.zeros((32, 32, 3), dtype=np.uint8)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(detector(img))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{"cup", "cat"}] * 8
+
+
+def test_dnn_detector_invalid_confidence():
+    with pytest.raises(ValueError):
+        ld.DnnDetector("ssd.onnx", confidence=1.5)
+
+
+def test_dnn_detector_missing_model_raises(tmp_path):
+    with pytest.raises(RuntimeError, match="Cannot load the detector model"):
+        ld.DnnDetector(str(tmp_path / "missing.onnx"))
+
+
+def test_load_detector_finds_config_and_labels(fake_net, tmp_path):
+    _, loaded = fake_net
+    model = tmp_path / "ssd.caffemodel"
+    (tmp_path / "ssd.prototxt").write_text("")
+    labels = tmp_path / "labels.txt"
+    labels.write_text("background\ncup\ndog\ncat\n")
+
+    detector = ld.load_detector(str(model), str(labels), confidence=0.6)
+
+    assert loaded == [(str(model), str(tmp_path / "ssd.prototxt"))]
+    assert detector.labels == ["background", "cup", "dog", "cat"]
+    assert detector.confidence == 0.6
+
+
+def test_load_detector_missing_labels_raises(fake_net, tmp_path):
+    with pytest.raises(RuntimeError, match="Cannot read the detector labels"):
+        ld.load_detector(str(tmp_path / "ssd.onnx"), str(tmp_path / "labels.txt"))
@@ -1,5 +1,7 @@
 import os
 import json
+import time
+import threading
 import pytest
 from unittest import mock
 import main
@@ -61,23 +63,23 @@ def test_openai_pipeline_merges_outputs(monkeypatch):
     fake_client_ctor = mock.Mock(return_value=FakeClient())
     monkeypatch.setattr(main, "OpenAI", fake_client_ctor)
 
-    monkeypatch.setattr(main, "video_transcript", lambda client, video_path, model: "transcript text")
+    monkeypatch.setattr(main, "video_transcript", lambda client, video_path, model, **kwargs: "transcript text")
     monkeypatch.setattr(
         main,
         "object_detection",
-        lambda client, video_path, model, sample_rate=0.5: json.dumps({"objects": ["cat", "cup"]}),
+        lambda client, video_path, model, sample_rate=0.5, **kwargs: json.dumps({"objects": ["cat", "cup"]}),
     )
     monkeypatch.setattr(
         main,
         "sentiment_analysis",
-        lambda client, transcription, model: json.dumps(
+        lambda client, transcription, model, **kwargs: json.dumps(
             {"mode": "info", "sentiment": "neutral", "explanation": "ok"}
         ),
     )
     monkeypatch.setattr(
         main,
         "question_answer",
-        lambda client, transcription, model: json.dumps({"QA_pairs": [{"Q": "What?", "A": "This."}]}),
+        lambda client, transcription, model, **kwargs: json.dumps({"QA_pairs": [{"Q": "What?", "A": "This."}]}),
     )
 
     merged = main.openai_pipeline("sk", "/dev/null")
@@ -88,9 +90,328 @@ def test_openai_pipeline_merges_outputs(monkeypatch):
     assert merged["Q&A pairs"][0]["Q"] == "What?"
 
 
+def test_openai_pipeline_single_pass_shares_ingest(monkeypatch):
+    seen = {}
+
+    class FakeIngest:
+        def __init__(self, video_path, sample_rate):
+            seen["ingest"] = self
+            self.discarded = False
+        def digest(self):
+            return "abc"
+        def frames(self):
+            return iter(())
+        def discard_frames(self):
+            self.discarded = True
+
+    def fake_detection(client, video_path, model, frames=None, **kwargs):
+        seen["frames"] = frames
+        return json.dumps({"objects": []})
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "MediaIngest", FakeIngest)
+    monkeypatch.setattr(main, "video_transcript", lambda client, video_path, model, ingest=None, **kwargs: seen.setdefault("transcript_ingest", ingest) and "text")
+    monkeypatch.setattr(main, "object_detection", fake_detection)
+    monkeypatch.setattr(main, "sentiment_analysis", lambda **kwargs: json.dumps({"mode": "m", "sentiment": "s", "explanation": "e"}))
+    monkeypatch.setattr(main, "question_answer", lambda **kwargs: json.dumps({"QA_pairs": []}))
+
+    merged = main.openai_pipeline("sk", "/dev/null", single_pass=True)
+
+    assert merged["Transcription"] == "text"
+    assert seen["transcript_ingest"] is seen["ingest"]
+    assert seen["frames"] is not None
+    assert seen["ingest"].discarded is True
+
+
+class BlockingIngest:
+    """Like `MediaIngest`, the audio is only complete once the frames are read or discarded."""
+
+    def __init__(self, video_path, sample_rate):
+        self.released = threading.Event()
+        self.events = []
+    def digest(self):
+        return "abc"
+    def frames(self):
+        self.events.append("frames")
+        yield from ()
+        self.released.set()
+    def discard_frames(self):
+        self.events.append("discard")
+        self.released.set()
+    def audio(self):
+        self.waited = not self.released.is_set()
+        if not self.released.wait(timeout=5):
+            raise TimeoutError("the audio waited for frames nobody reads")
+        self.events.append("audio")
+        return "audio"
+
+
+def _patch_single_pass(monkeypatch):
+    seen = {}
+
+    def fake_detection(client, video_path, model, frames=None, **kwargs):
+        seen["frames"] = list(frames or ())
+        return json.dumps({"objects": []})
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "MediaIngest", lambda *args, **kwargs: seen.setdefault("ingest", BlockingIngest(*args, **kwargs)))
+    monkeypatch.setattr(main, "video_transcript", lambda client, video_path, model, ingest=None, **kwargs: ingest.audio() and "text")
+    monkeypatch.setattr(main, "object_detection", fake_detection)
+    monkeypatch.setattr(main, "sentiment_analysis", lambda **kwargs: json.dumps({"mode": "m", "sentiment": "s", "explanation": "e"}))
+    monkeypatch.setattr(main, "question_answer", lambda **kwargs: json.dumps({"QA_pairs": []}))
+    return seen
+
+
+def test_openai_pipeline_single_pass_with_one_worker(monkeypatch):
+    seen = _patch_single_pass(monkeypatch)
+
+    merged = main.openai_pipeline("sk", "/dev/null", single_pass=True, max_workers=1)
+
+    assert merged["Transcription"] == "text"
+    assert seen["ingest"].events[0] == "frames"
+
+
+def test_openai_pipeline_single_pass_adaptive_discards_frames_first(monkeypatch):
+    seen = _patch_single_pass(monkeypatch)
+    monkeypatch.setattr(main, "adaptive_frames", lambda video_path, max_frames: time.sleep(0.2) or iter(()))
+
+    main.openai_pipeline("sk", "/dev/null", single_pass=True, adaptive_sampling=True)
+
+    assert seen["ingest"].events == ["discard", "audio"]
+    assert seen["ingest"].waited is False
+
+
+def test_openai_pipeline_resumes_from_checkpoint(monkeypatch, tmp_path):
+    from checkpoint import Checkpoint
+    calls = []
+
+    def stage(name, output):
+        def run(**kwargs):
+            calls.append(name)
+            if name == "qa" and fail["qa"]:
+                raise RuntimeError("qa failed")
+            return output
+        return run
+
+    fail = {"qa": True}
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", stage("transcription", "text"))
+    monkeypatch.setattr(main, "object_detection", stage("objects", json.dumps({"objects": ["cat"]})))
+    monkeypatch.setattr(main, "sentiment_analysis", stage("sentiment", json.dumps({"mode": "m", "sentiment": "s", "explanation": "e"})))
+    monkeypatch.setattr(main, "question_answer", stage("qa", json.dumps({"QA_pairs": []})))
+    checkpoint = Checkpoint(str(tmp_path / "v.json"))
+
+    with pytest.raises(RuntimeError):
+        main.openai_pipeline("sk", "/dev/null", max_workers=1, checkpoint=checkpoint)
+    assert set(checkpoint.completed()) <= {"transcription", "objects", "sentiment"}
+    assert "transcription" in checkpoint.completed()
+
+    fail["qa"] = False
+    calls.clear()
+    merged = main.openai_pipeline("sk", "/dev/null", checkpoint=Checkpoint(str(tmp_path / "v.json")))
+    assert merged["Objects"] == ["cat"]
+    assert "transcription" not in calls and "qa" in calls
+
+    calls.clear()
+    main.openai_pipeline("sk", "/dev/null", checkpoint=checkpoint, force_stages=["transcription"])
+    assert sorted(calls) == ["qa", "sentiment", "transcription"]
+
+    with pytest.raises(ValueError):
+        main.openai_pipeline("sk", "/dev/null", checkpoint=checkpoint, force_stages=["nope"])
+
+
+def test_openai_pipeline_runs_only_selected_stages(monkeypatch):
+    calls = []
+
+    def stage(name, output):
+        def run(**kwargs):
+            calls.append(name)
+            return output
+        return run
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", stage("transcription", "text"))
+    monkeypatch.setattr(main, "object_detection", stage("objects", json.dumps({"objects": ["cat"]})))
+    monkeypatch.setattr(main, "sentiment_analysis", stage("sentiment", json.dumps({"mode": "m", "sentiment": "s", "explanation": "e"})))
+    monkeypatch.setattr(main, "question_answer", stage("qa", json.dumps({"QA_pairs": []})))
+
+    assert main.openai_pipeline("sk", "/dev/null", only_stages=["transcription", "objects"]) == {
+        "Transcription": "text", "Objects": ["cat"]
+    }
+
+    # Dependencies of the selected stages run too
+    calls.clear()
+    merged = main.openai_pipeline("sk", "/dev/null", only_stages=["qa"])
+    assert sorted(calls) == ["qa", "transcription"]
+    assert list(merged) == ["Transcription", "Q&A pairs"]
+
+    with pytest.raises(ValueError):
+        main.openai_pipeline("sk", "/dev/null", only_stages=["nope"])
+
+
+def test_openai_pipeline_timestamps_adds_segments(monkeypatch):
+    from timed_transcript import TimedTranscript
+    seen = {}
+
+    def fake_transcript(client, video_path, model, timestamps=False, **kwargs):
+        seen["timestamps"] = timestamps
+        return TimedTranscript.from_segments([(0.0, 1.5, "Hello there."), (2.0, 3.0, "Bye.")])
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", fake_transcript)
+    monkeypatch.setattr(main, "object_detection", lambda **kwargs: json.dumps({"objects": []}))
+    monkeypatch.setattr(main, "sentiment_analysis", lambda transcription, **kwargs: seen.setdefault("sentiment", transcription) and json.dumps({"mode": "m", "sentiment": "s", "explanation": "e"}))
+    monkeypatch.setattr(main, "question_answer", lambda transcription, **kwargs: json.dumps({"QA_pairs": []}))
+
+    merged = main.openai_pipeline("sk", "/dev/null", timestamps=True)
+
+    assert seen["timestamps"] is True
+    assert seen["sentiment"] == merged["Transcription"] == "Hello there. Bye."
+    assert merged["Segments"] == {"start": [0.0, 2.0], "end": [1.5, 3.0], "offset": [0, 13]}
+
+
+@pytest.mark.parametrize("first, second", [(False, True), (True, False)])
+def test_openai_pipeline_checkpoint_keeps_transcript_format(monkeypatch, tmp_path, first, second):
+    from checkpoint import Checkpoint
+    from timed_transcript import TimedTranscript
+    calls = []
+
+    def fake_transcript(client, video_path, model, timestamps=False, **kwargs):
+        calls.append(timestamps)
+        return TimedTranscript.from_segments([(0.0, 1.0, "Hello.")]) if timestamps else "Hello."
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", fake_transcript)
+    monkeypatch.setattr(main, "object_detection", lambda **kwargs: json.dumps({"objects": []}))
+    monkeypatch.setattr(main, "sentiment_analysis", lambda transcription, **kwargs: json.dumps({"mode": "m", "sentiment": transcription, "explanation": "e"}))
+    monkeypatch.setattr(main, "question_answer", lambda **kwargs: json.dumps({"QA_pairs": []}))
+    checkpoint = Checkpoint(str(tmp_path / "v.json"))
+
+    main.openai_pipeline("sk", "/dev/null", checkpoint=checkpoint, timestamps=first)
+    merged = main.openai_pipeline("sk", "/dev/null", checkpoint=checkpoint, timestamps=second)
+
+    assert calls == [first, second]
+    assert merged["Transcription"] == merged["Mode and sentiment"]["sentiment"] == "Hello."
+    assert ("Segments" in merged) is second
+
+    # The same options restore the transcription
+    main.openai_pipeline("sk", "/dev/null", checkpoint=checkpoint, timestamps=second)
+    assert calls == [first, second]
+
+
+def test_openai_pipeline_adaptive_sampling_selects_frames(monkeypatch):
+    seen = {}
+
+    def fake_detection(client, video_path, model, frames=None, **kwargs):
+        seen["frames"] = frames
+        return json.dumps({"objects": []})
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "adaptive_frames", lambda video_path, max_frames: ("adaptive", video_path, max_frames))
+    monkeypatch.setattr(main, "video_transcript", lambda **kwargs: "text")
+    monkeypatch.setattr(main, "object_detection", fake_detection)
+    monkeypatch.setattr(main, "sentiment_analysis", lambda **kwargs: json.dumps({"mode": "m", "sentiment": "s", "explanation": "e"}))
+    monkeypatch.setattr(main, "question_answer", lambda **kwargs: json.dumps({"QA_pairs": []}))
+
+    main.openai_pipeline("sk", "/dev/null", adaptive_sampling=True)
+    assert seen["frames"] == ("adaptive", "/dev/null", main.ADAPTIVE_MAX_FRAMES)
+
+    main.openai_pipeline("sk", "/dev/null")
+    assert seen["frames"] is None
+
+
+def test_openai_pipeline_runs_stages_concurrently(monkeypatch):
+    """Transcription and object detection start together; timings are reported per stage."""
+    import threading
+    barrier = threading.Barrier(2, timeout=5)
+
+    def transcript(client, video_path, model, **kwargs):
+        barrier.wait()
+        return "transcript text"
+
+    def objects(client, video_path, model, sample_rate=0.5, **kwargs):
+        barrier.wait()
+        return json.dumps({"objects": ["cat"]})
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", transcript)
+    monkeypatch.setattr(main, "object_detection", objects)
+    monkeypatch.setattr(
+        main, "sentiment_analysis",
+        lambda client, transcription, model, **kwargs: json.dumps({"mode": "m", "sentiment": transcription, "explanation": "e"}),
+    )
+    monkeypatch.setattr(main, "question_answer", lambda client, transcription, model, **kwargs: json.dumps({"QA_pairs": []}))
+
+    timings = {}
+    merged = main.openai_pipeline("sk", "/dev/null", timings=timings)
+
+    assert list(merged) == ["Transcription", "Objects", "Mode and sentiment", "Q&A pairs"]
+    assert merged["Mode and sentiment"]["sentiment"] == "transcript text"
+    assert set(timings) == {"transcription", "objects", "sentiment", "qa"}
+
+
+def test_openai_pipeline_combined_analysis(monkeypatch):
+    """One combined request replaces sentiment analysis and Q&A generation, with the same output keys."""
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", lambda *a, **kw: "transcript text")
+    monkeypatch.setattr(main, "object_detection", lambda *a, **kw: json.dumps({"objects": ["cat"]}))
+
+    def not_called(*args, **kwargs):
+        raise AssertionError("separate analysis stage should not run")
+    monkeypatch.setattr(main, "sentiment_analysis", not_called)
+    monkeypatch.setattr(main, "question_answer", not_called)
+    monkeypatch.setattr(
+        main, "transcript_analysis",
+        lambda client, transcription, model, max_tokens=None: json.dumps({
+            "mode": "m", "sentiment": transcription, "explanation": "e", "QA_pairs": [{"Q": "What?", "A": "This."}]
+        }),
+    )
+
+    timings = {}
+    merged = main.openai_pipeline("sk", "/dev/null", timings=timings, combined_analysis=True)
+
+    assert merged == {
+        "Transcription": "transcript text",
+        "Objects": ["cat"],
+        "Mode and sentiment": {"mode": "m", "sentiment": "transcript text", "explanation": "e"},
+        "Q&A pairs": [{"Q": "What?", "A": "This."}]
+    }
+    assert set(timings) == {"transcription", "objects", "analysis"}
+
+
+def test_openai_pipeline_collects_metrics(monkeypatch):
+    """Requests made inside a stage are attributed to it in the metrics report."""
+    from types import SimpleNamespace
+    from metrics import RunMetrics, record
+    from request_scheduler import submit
+
+    def create(**kwargs):
+        return SimpleNamespace(output_text=json.dumps({"objects": ["cat"]}), usage=SimpleNamespace(input_tokens=50, output_tokens=5))
+
+    def objects(*args, **kwargs):
+        record(images=2, upload_bytes=2048)
+        return submit(create, model="gpt-4.1").output_text
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", lambda *a, **kw: "transcript text")
+    monkeypatch.setattr(main, "object_detection", objects)
+    monkeypatch.setattr(main, "sentiment_analysis", lambda *a, **kw: json.dumps({"mode": "m"}))
+    monkeypatch.setattr(main, "question_answer", lambda *a, **kw: json.dumps({"QA_pairs": []}))
+
+    metrics = RunMetrics(labels={"video": "v.mp4"})
+    main.openai_pipeline("sk", "/dev/null", metrics=metrics)
+    report = metrics.report()
+
+    assert set(report["stages"]) == {"transcription", "objects", "sentiment", "qa"}
+    assert report["stages"]["objects"]["images"] == 2
+    assert report["stages"]["objects"]["upload_bytes"] == 2048
+    assert report["stages"]["objects"]["input_tokens"] == 50
+    assert report["totals"]["api_calls"] == 1
+
+
 def test_openai_pipeline_raises_during_stage(monkeypatch):
     """Covers the first except block in openai_pipeline() when a stage fails."""
-    monkeypatch.setattr(main, "OpenAI", lambda api_key: object())
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
 
     def fail_stage(*args, **kwargs):
         raise RuntimeError("stage failed")
@@ -106,7 +427,7 @@ def test_openai_pipeline_raises_during_stage(monkeypatch):
 
 def test_openai_pipeline_merge_json_error(monkeypatch):
     """Covers the second except block in openai_pipeline() during JSON merge."""
-    monkeypatch.setattr(main, "OpenAI", lambda api_key: object())
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
     monkeypatch.setattr(main, "video_transcript", lambda *a, **kw: "transcript")
     monkeypatch.setattr(main, "object_detection", lambda *a, **kw: "{invalid}")
     monkeypatch.setattr(main, "sentiment_analysis", lambda *a, **kw: "{invalid}")
@@ -116,13 +437,199 @@ def test_openai_pipeline_merge_json_error(monkeypatch):
         main.openai_pipeline("sk", "/video.mp4")
 
 
+def test_openai_pipeline_uses_cache(monkeypatch, tmp_path):
+    """A second run on the same video is served from the cache without calling any stage."""
+    from result_cache import ResultCache
+
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"video-bytes")
+    calls = []
+
+    def stage(name, output):
+        def run(*args, **kwargs):
+            calls.append(name)
+            return output
+        return run
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", stage("transcription", "transcript"))
+    monkeypatch.setattr(main, "object_detection", stage("objects", json.dumps({"objects": ["cat"]})))
+    monkeypatch.setattr(main, "sentiment_analysis", stage("sentiment", json.dumps({"mode": "m"})))
+    monkeypatch.setattr(main, "question_answer", stage("qa", json.dumps({"QA_pairs": []})))
+
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    first = main.openai_pipeline("sk", str(video), cache=cache)
+    second = main.openai_pipeline("sk", str(video), cache=cache)
+
+    assert first == second
+    assert sorted(calls) == ["objects", "qa", "sentiment", "transcription"]
+
+
+def test_openai_pipeline_forwards_detector_and_keys_cache(monkeypatch, tmp_path):
+    from result_cache import ResultCache
+
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"video")
+    detectors = []
+
+    class Detector:
+        def __init__(self, name):
+            self.name = name
+
+        def __repr__(self):
+            return f"Detector({self.name!r})"
+
+    def fake_detection(client, video_path, model, detector=None, **kwargs):
+        detectors.append(detector)
+        return json.dumps({"objects": ["cat"]})
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "video_transcript", lambda **kwargs: "text")
+    monkeypatch.setattr(main, "object_detection", fake_detection)
+    monkeypatch.setattr(main, "sentiment_analysis", lambda **kwargs: json.dumps({"mode": "m"}))
+    monkeypatch.setattr(main, "question_answer", lambda **kwargs: json.dumps({"QA_pairs": []}))
+
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    ssd = Detector("ssd")
+    main.openai_pipeline("sk", str(video), cache=cache, detector=ssd)
+    main.openai_pipeline("sk", str(video), cache=cache, detector=Detector("ssd"))
+    main.openai_pipeline("sk", str(video), cache=cache, detector=Detector("yolo"))
+    main.openai_pipeline("sk", str(video), cache=cache)
+
+    # The same detector is served from the cache; another one, or none, selects other frames
+    assert [repr(detector) for detector in detectors] == ["Detector('ssd')", "Detector('yolo')", "None"]
+    assert detectors[0] is ssd
+
+
+def test_load_cache_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("PIPELINE_CACHE_PATH", raising=False)
+    assert main.load_cache() is None
+
+    monkeypatch.setenv("PIPELINE_CACHE_PATH", str(tmp_path / "cache.db"))
+    monkeypatch.setenv("PIPELINE_CACHE_MAX_MB", "1")
+    monkeypatch.setenv("PIPELINE_CACHE_TTL", "60")
+    monkeypatch.setenv("PIPELINE_CACHE_BYPASS", "true")
+    cache = main.load_cache()
+
+    assert cache.max_bytes == 1024 * 1024
+    assert cache.ttl == 60
+    assert cache.bypass is True
+
+
+def test_load_scheduler_from_env(monkeypatch):
+    monkeypatch.delenv("PIPELINE_RPM", raising=False)
+    monkeypatch.delenv("PIPELINE_TPM", raising=False)
+    monkeypatch.delenv("PIPELINE_MAX_RETRIES", raising=False)
+    scheduler = main.load_scheduler()
+    assert scheduler.max_retries == 5
+    assert scheduler.requests is None and scheduler.tokens is None
+
+    monkeypatch.setenv("PIPELINE_RPM", "500")
+    monkeypatch.setenv("PIPELINE_TPM", "30000")
+    monkeypatch.setenv("PIPELINE_MAX_RETRIES", "2")
+    scheduler = main.load_scheduler()
+    assert scheduler.max_retries == 2
+    assert scheduler.requests.capacity == 500
+    assert scheduler.tokens.capacity == 30000
+
+
 def test_main_success(monkeypatch):
     """Covers the happy path of main()."""
     monkeypatch.setattr(main, "load_env", lambda: ("key", "path"))
-    monkeypatch.setattr(main, "openai_pipeline", lambda api, vp: {"Transcription": "ok"})
+    monkeypatch.setattr(main, "openai_pipeline", lambda api, vp, **kwargs: {"Transcription": "ok"})
+    monkeypatch.setattr(main.logger, "info", lambda msg: None)
+
+    main.main([])
+
+
+def test_main_exports_metrics(monkeypatch, tmp_path):
+    def pipeline(api, vp, metrics=None, **kwargs):
+        metrics.add("transcription", api_calls=1)
+        return {"Transcription": "ok"}
+
+    monkeypatch.setattr(main, "load_env", lambda: ("key", "v.mp4"))
+    monkeypatch.setattr(main, "openai_pipeline", pipeline)
+    monkeypatch.setattr(main.logger, "info", lambda msg: None)
+    monkeypatch.setenv("PIPELINE_METRICS_PATH", str(tmp_path / "metrics.jsonl"))
+
+    main.main([])
+
+    report = json.loads((tmp_path / "metrics.jsonl").read_text())
+    assert report["labels"] == {"video": "v.mp4"}
+    assert report["stages"]["transcription"]["api_calls"] == 1
+
+
+def test_main_stages_flag_selects_stages(monkeypatch):
+    seen = []
+    monkeypatch.setattr(main, "load_env", lambda: ("key", "v.mp4"))
+    monkeypatch.setattr(main, "openai_pipeline", lambda api, vp, only_stages=None, **kwargs: seen.append(only_stages) or {})
     monkeypatch.setattr(main.logger, "info", lambda msg: None)
 
-    main.main()
+    main.main(["--stages", "transcription", "qa"])
+    main.main([])
+
+    assert seen == [["transcription", "qa"], None]
+    with pytest.raises(SystemExit):
+        main.main(["--stages", "unknown"])
+
+
+def test_main_frame_flags_opt_in(monkeypatch):
+    seen = []
+    monkeypatch.setattr(main, "load_env", lambda: ("key", "v.mp4"))
+    monkeypatch.setattr(main, "openai_pipeline", lambda api, vp, frame_options=None, **kwargs: seen.append(frame_options) or {})
+    monkeypatch.setattr(main.logger, "info", lambda msg: None)
+
+    main.main([])
+    main.main(["--deduplicate", "--quality-gate", "--max-frames", "40", "--max-edge", "1024", "--jpeg-quality", "80"])
+
+    assert seen[0] == {"deduplicate": False, "quality_gate": False, "max_frames": None, "max_edge": None, "jpeg_quality": None}
+    assert seen[1] == {"deduplicate": True, "quality_gate": True, "max_frames": 40, "max_edge": 1024, "jpeg_quality": 80}
+
+
+def test_openai_pipeline_frame_options_override_defaults(monkeypatch):
+    seen = []
+
+    def fake_detection(client, video_path, model, **kwargs):
+        seen.append(kwargs)
+        return json.dumps({"objects": []})
+
+    monkeypatch.setattr(main, "OpenAI", lambda api_key, **kwargs: object())
+    monkeypatch.setattr(main, "object_detection", fake_detection)
+
+    main.openai_pipeline("sk", "/dev/null", only_stages=["objects"])
+    main.openai_pipeline("sk", "/dev/null", only_stages=["objects"], frame_options={"deduplicate": True, "max_edge": 512})
+
+    assert not any(seen[0][key] for key in ("deduplicate", "quality_gate", "max_frames", "max_edge", "jpeg_quality"))
+    assert seen[1]["deduplicate"] is True and seen[1]["max_edge"] == 512 and seen[1]["quality_gate"] is False
+
+
+def test_import_main_defers_heavy_modules():
+    import sys
+    import subprocess
+    code = "import sys, main; print(sorted(m for m in ('openai', 'cv2', 'moviepy', 'video_transcript') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_names_load_on_first_access(monkeypatch):
+    from object_detection import object_detection
+    monkeypatch.delitem(vars(main), "object_detection", raising=False)
+
+    assert main.object_detection is object_detection
+    assert "object_detection" in vars(main)
+    with pytest.raises(AttributeError):
+        main.not_a_stage
+
+
+def test_openai_pipeline_loads_only_selected_stage_modules(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(main, "_load", lambda *names: loaded.extend(names))
+    monkeypatch.setattr(main, "object_detection", lambda **kwargs: json.dumps({"objects": []}))
+
+    main.openai_pipeline("sk", "/dev/null", client=object(), only_stages=["objects"])
+
+    assert loaded == ["object_detection", "build_object_detection_request"]
 
 
 def test_main_handles_exception(monkeypatch):
@@ -135,7 +642,7 @@ def test_main_handles_exception(monkeypatch):
     monkeypatch.setattr(main.logger, "exception", lambda msg: None)
 
     # Ensure it catches and logs instead of re-raising
-    main.main()
+    main.main([])
 
 
 def test_if_main_exec(monkeypatch):
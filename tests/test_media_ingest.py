@@ -0,0 +1,93 @@
+import subprocess
+import threading
+import numpy as np
+import pytest
+from imageio_ffmpeg import get_ffmpeg_exe
+import media_ingest as mi
+import object_detection as od
+
+
+def make_video(path, audio=True):
+    command = [get_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=64x48:rate=10"]
+    if audio:
+        command += ["-f", "lavfi", "-i", "sine=frequency=440"]
+    command += ["-t", "3", "-c:v", "mpeg4", "-c:a", "aac", str(path)]
+    subprocess.run(command, check=True)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    return make_video(tmp_path_factory.mktemp("media") / "v.mp4")
+
+
+def test_probe_reads_header(video):
+    metadata = mi.probe(video)
+    assert metadata == {"duration": 3.0, "fps": 10.0, "width": 64, "height": 48, "has_audio": True, "frame_count": 30}
+
+
+def test_probe_invalid_file(tmp_path):
+    path = tmp_path / "broken.mp4"
+    path.write_bytes(b"\x00" * 16)
+    with pytest.raises(RuntimeError):
+        mi.probe(str(path))
+
+
+def test_single_pass_yields_frames_and_audio(monkeypatch, video):
+    ingest = mi.MediaIngest(video, sample_rate=2)
+    ingest.metadata()
+
+    popen = mi.subprocess.Popen
+    calls = []
+    monkeypatch.setattr(mi.subprocess, "Popen", lambda *a, **kw: calls.append(a) or popen(*a, **kw))
+
+    audio = []
+    thread = threading.Thread(target=lambda: audio.append(ingest.audio()))
+    thread.start()
+    frames = list(ingest.frames())
+    thread.join(timeout=10)
+
+    expected = list(od.sample_frames(video, sample_rate=2))
+    assert len(calls) == 1
+    assert len(frames) == len(expected) == 6
+    assert all(np.array_equal(frame, reference) for frame, reference in zip(frames, expected))
+    assert audio[0].name == "audio.ogg" and audio[0].read(4) == b"OggS"
+
+
+def test_discarded_frames_do_not_block_audio(video):
+    ingest = mi.MediaIngest(video)
+    ingest.discard_frames()
+    assert ingest.audio().getvalue().startswith(b"OggS")
+    with pytest.raises(RuntimeError):
+        next(ingest.frames())
+
+
+def test_closing_frames_early_still_completes_audio(video):
+    ingest = mi.MediaIngest(video, sample_rate=5)
+    frames = ingest.frames()
+    next(frames)
+    frames.close()
+    whole = ingest.audio().getvalue()
+    section = ingest.audio(start=1, end=2).getvalue()
+    assert section.startswith(b"OggS") and len(section) < len(whole)
+
+
+def test_video_without_audio(tmp_path):
+    ingest = mi.MediaIngest(make_video(tmp_path / "silent.mp4", audio=False))
+    assert ingest.metadata()["has_audio"] is False
+    with pytest.raises(RuntimeError):
+        ingest.audio()
+    assert len(list(ingest.frames())) == 2
+
+
+def test_digest_is_computed_once(monkeypatch, video):
+    calls = []
+    monkeypatch.setattr(mi, "file_digest", lambda path: calls.append(path) or "abc")
+    ingest = mi.MediaIngest(video)
+    assert ingest.digest() == ingest.digest() == "abc"
+    assert calls == [video]
+
+
+def test_invalid_sample_rate():
+    with pytest.raises(ValueError):
+        mi.MediaIngest("v.mp4", sample_rate=0)
@@ -0,0 +1,107 @@
+import json
+import asyncio
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from request_scheduler import RequestScheduler
+
+
+def test_stage_records_wall_time_and_calls():
+    run = metrics.RunMetrics(labels={"video": "a.mp4"})
+
+    with run.stage("objects"):
+        metrics.record(images=3, upload_bytes=300)
+        metrics.record_call(0.5, SimpleNamespace(usage=SimpleNamespace(input_tokens=100, output_tokens=20)))
+    metrics.record(images=99)
+
+    report = run.report()
+    objects = report["stages"]["objects"]
+    assert report["labels"] == {"video": "a.mp4"}
+    assert objects["images"] == 3 and objects["upload_bytes"] == 300
+    assert objects["api_calls"] == 1 and objects["api_seconds"] == 0.5
+    assert objects["input_tokens"] == 100 and objects["output_tokens"] == 20
+    assert objects["wall_seconds"] >= 0
+    assert report["totals"]["images"] == 3
+
+
+def test_record_call_ignores_missing_usage():
+    run = metrics.RunMetrics()
+    with run.stage("qa"):
+        metrics.record_call(0.1, SimpleNamespace(output_text="{}"))
+        metrics.record_call(0.1)
+
+    assert run.report()["stages"]["qa"]["api_calls"] == 2
+    assert run.report()["stages"]["qa"]["input_tokens"] == 0
+
+
+def test_propagate_attributes_thread_pool_work_to_stage():
+    run = metrics.RunMetrics()
+
+    with run.stage("transcription"):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(metrics.propagate(lambda _: metrics.record(upload_bytes=10)), range(8)))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: metrics.record(upload_bytes=1000), range(8)))
+
+    assert run.report()["stages"]["transcription"]["upload_bytes"] == 80
+
+
+def test_scheduler_records_latency_usage_and_retries(monkeypatch):
+    import httpx
+    import openai
+    monkeypatch.setattr("request_scheduler.time.sleep", lambda delay: None)
+    errors = [openai.APIConnectionError(request=httpx.Request("POST", "http://x"))]
+
+    def create(**kwargs):
+        if errors:
+            raise errors.pop()
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=7, output_tokens=3))
+
+    run = metrics.RunMetrics()
+    with run.stage("sentiment"):
+        RequestScheduler().call(create, model="m")
+
+    sentiment = run.report()["stages"]["sentiment"]
+    assert sentiment["api_calls"] == 2 and sentiment["retries"] == 1
+    assert sentiment["input_tokens"] == 7 and sentiment["output_tokens"] == 3
+
+
+def test_async_stages_are_isolated():
+    run = metrics.RunMetrics()
+
+    async def stage(name, images):
+        with run.stage(name):
+            await asyncio.sleep(0)
+            metrics.record(images=images)
+
+    async def main():
+        await asyncio.gather(stage("a", 1), stage("b", 2))
+
+    asyncio.run(main())
+    assert {name: counters["images"] for name, counters in run.report()["stages"].items()} == {"a": 1, "b": 2}
+
+
+def test_to_prometheus_renders_gauges():
+    run = metrics.RunMetrics(labels={"video": 'say "hi".mp4'})
+    run.add("qa", api_calls=2)
+
+    text = metrics.to_prometheus([run.report()])
+
+    assert "# TYPE pipeline_stage_api_calls gauge" in text
+    assert 'pipeline_stage_api_calls{video="say \\"hi\\".mp4",stage="qa"} 2' in text
+
+
+def test_export_reports_jsonl_and_prometheus(tmp_path):
+    run = metrics.RunMetrics()
+    run.add("qa", api_calls=1)
+    report = run.report()
+
+    jsonl = tmp_path / "metrics.jsonl"
+    metrics.export_reports([report], str(jsonl))
+    metrics.export_reports([report], str(jsonl))
+    assert [json.loads(line)["totals"]["api_calls"] for line in jsonl.read_text().splitlines()] == [1, 1]
+
+    prom = tmp_path / "metrics.prom"
+    metrics.export_reports([report], str(prom))
+    assert 'pipeline_stage_api_calls{stage="qa"} 1' in prom.read_text()
+    assert sorted(tmp_path.iterdir()) == [jsonl, prom]
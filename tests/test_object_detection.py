@@ -25,6 +25,8 @@ def build_cap_mock(is_open=True, fps=10, frame_count=20, read_frames=20):
 
     it = read_gen()
     cap_mock.read.side_effect = lambda: next(it)
+    # grab() advances through the same frames without returning them
+    cap_mock.grab.side_effect = lambda: next(it)[0]
     return cap_mock
 
 
@@ -87,6 +89,12 @@ def test_video_to_base64_warns_sample_too_high(monkeypatch, caplog):
     assert any("all frames will be sampled" in m for m in caplog.messages)
 
 
+def test_sample_times_match_sampled_frames():
+    # fps=10, sample_rate=0.5 => every 20th frame
+    assert od.sample_times(10, 50, 0.5) == [0.0, 2.0, 4.0]
+    assert od.sample_times(29.97, 60, 1) == [0.0, 29 / 29.97, 58 / 29.97]
+
+
 # Exception inside processing
 def test_video_to_base64_imencode_failure_raises(monkeypatch):
     """cv2.imencode returns unusable buffer -> triggers except -> RuntimeError."""
@@ -100,10 +108,256 @@ def test_video_to_base64_imencode_failure_raises(monkeypatch):
         od.video_to_base64("broken.mp4", sample_rate=1.0)
 
 
+def test_sample_frames_grabs_skipped_frames(monkeypatch):
+    """Only sampled frames are retrieved, the others are grabbed."""
+    # fps=10, sample_rate=5 => interval 2 => frames 0, 2, 4 of 5
+    cap_mock = build_cap_mock(is_open=True, fps=10, frame_count=5, read_frames=5)
+    monkeypatch.setattr(od.cv2, "VideoCapture", mock.Mock(return_value=cap_mock))
+
+    frames = list(od.sample_frames("v.mp4", sample_rate=5))
+
+    assert len(frames) == 3
+    assert cap_mock.read.call_count == 3
+    assert cap_mock.grab.call_count == 3
+    cap_mock.release.assert_called_once()
+
+
+def test_sample_frames_seeks_for_large_intervals(monkeypatch):
+    """Intervals at or above seek_threshold jump straight to each sampled frame."""
+    # fps=10, sample_rate=1 => interval 10 => frames 0, 10, 20 of 25
+    cap_mock = build_cap_mock(is_open=True, fps=10, frame_count=25, read_frames=25)
+    monkeypatch.setattr(od.cv2, "VideoCapture", mock.Mock(return_value=cap_mock))
+
+    frames = list(od.sample_frames("v.mp4", sample_rate=1, seek_threshold=10))
+
+    assert len(frames) == 3
+    assert cap_mock.grab.call_count == 0
+    positions = [c.args[1] for c in cap_mock.set.call_args_list]
+    assert positions == [10, 20]
+
+
+def test_iter_base64_frames_is_lazy(monkeypatch):
+    """Frames are encoded one at a time as the generator is consumed."""
+    cap_mock = build_cap_mock(is_open=True, fps=10, frame_count=20, read_frames=20)
+    monkeypatch.setattr(od.cv2, "VideoCapture", mock.Mock(return_value=cap_mock))
+    imencode = mock.Mock(return_value=(True, make_fake_frame()))
+    monkeypatch.setattr(od.cv2, "imencode", imencode)
+
+    frames = od.iter_base64_frames("v.mp4", sample_rate=1)
+    assert imencode.call_count == 0
+    next(frames)
+    assert imencode.call_count == 1
+    frames.close()
+    cap_mock.release.assert_called_once()
+
+
+def test_video_to_base64_deduplicates_and_applies_budget(monkeypatch):
+    """Identical frames are dropped, then the budget keeps frames evenly spread."""
+    import numpy as np
+    black = np.zeros((32, 32, 3), dtype=np.uint8)
+    white = np.full((32, 32, 3), 255, dtype=np.uint8)
+    frames = [black, black, white, white, black, white]
+    monkeypatch.setattr(od, "sample_frames", lambda video_path, sample_rate: (f for f in frames))
+
+    stats = {}
+    out = od.video_to_base64("v.mp4", sample_rate=1, deduplicate=True, max_frames=3, stats=stats)
+
+    assert len(out) == 3
+    assert stats == {"sampled": 6, "duplicates": 2, "over_budget": 1, "kept": 3}
+
+
+def test_video_to_base64_downscales_and_sets_quality(monkeypatch):
+    import numpy as np
+    frames = [np.zeros((1080, 1920, 3), dtype=np.uint8)]
+    monkeypatch.setattr(od, "sample_frames", lambda video_path, sample_rate: (f for f in frames))
+    imencode = mock.Mock(return_value=(True, make_fake_frame()))
+    monkeypatch.setattr(od.cv2, "imencode", imencode)
+
+    od.video_to_base64("v.mp4", sample_rate=1, max_edge=640, jpeg_quality=70)
+
+    _, img, params = imencode.call_args.args
+    assert img.shape == (360, 640, 3)
+    assert params == [od.cv2.IMWRITE_JPEG_QUALITY, 70]
+
+
+def test_video_to_base64_contact_sheet(monkeypatch):
+    import numpy as np
+    frames = [np.zeros((90, 160, 3), dtype=np.uint8) for _ in range(5)]
+    monkeypatch.setattr(od, "sample_frames", lambda video_path, sample_rate: (f for f in frames))
+
+    out = od.video_to_base64("v.mp4", sample_rate=1, contact_sheet=(2, 2), max_edge=320)
+
+    assert len(out) == 2
+    sheet = od.cv2.imdecode(np.frombuffer(base64.b64decode(out[0]), np.uint8), od.cv2.IMREAD_COLOR)
+    assert sheet.shape == (180, 320, 3)
+
+
+@pytest.mark.parametrize("options", [{"max_edge": 0}, {"jpeg_quality": 101}])
+def test_video_to_base64_invalid_encoding_options(options):
+    with pytest.raises(ValueError):
+        od.video_to_base64("x.mp4", sample_rate=1, **options)
+
+
+def test_video_to_base64_invalid_budget():
+    with pytest.raises(ValueError):
+        od.video_to_base64("x.mp4", sample_rate=1, max_frames=0)
+
+
+def test_video_to_base64_workers_match_single_process(tmp_path):
+    import numpy as np
+    path = str(tmp_path / "v.mp4")
+    writer = od.cv2.VideoWriter(path, od.cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(100):
+        writer.write(np.full((48, 64, 3), (i // 10) * 25, dtype=np.uint8))
+    writer.release()
+
+    single_stats, parallel_stats = {}, {}
+    single = od.video_to_base64(path, sample_rate=5, deduplicate=True, stats=single_stats)
+    parallel = od.video_to_base64(path, sample_rate=5, deduplicate=True, stats=parallel_stats, workers=2)
+
+    assert len(single) == 10
+    assert parallel == single
+    assert parallel_stats == single_stats
+
+
+def test_stream_images_workers_apply_quality_gate(tmp_path):
+    import numpy as np
+    path = str(tmp_path / "v.mp4")
+    writer = od.cv2.VideoWriter(path, od.cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(100):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        if (i // 10) % 3:
+            frame[:, (i // 10)::6] = 255
+        writer.write(frame)
+    writer.release()
+
+    single_stats, parallel_stats = {}, {}
+    single = list(od.stream_images(path, sample_rate=5, quality_gate=True, deduplicate=True, stats=single_stats))
+    parallel = list(od.stream_images(
+        path, sample_rate=5, quality_gate=True, deduplicate=True, stats=parallel_stats, workers=2
+    ))
+
+    # Every third second is black: 4 of the 10 seconds, whose frames are duplicates but for the first
+    assert single_stats["low_quality"] == 4
+    assert parallel == single
+    assert parallel_stats == single_stats
+
+
+def test_stream_images_accepts_plain_frame_iterator():
+    import numpy as np
+    frames = [np.full((48, 64, 3), value, dtype=np.uint8) for value in (0, 128, 255)]
+
+    images = list(od.stream_images("x.mp4", frames=iter(frames), max_edge=32))
+
+    assert len(images) == 3
+    assert od.base64.b64decode(images[0])[:2] == b"\xff\xd8"
+
+
+def test_video_to_base64_short_video_skips_workers(tmp_path, monkeypatch):
+    import numpy as np
+    path = str(tmp_path / "v.mp4")
+    writer = od.cv2.VideoWriter(path, od.cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("worker processes started for a single range")
+
+    monkeypatch.setattr(od, "ProcessPoolExecutor", no_pool)
+    assert len(od.video_to_base64(path, sample_rate=5, workers=4)) == 15
+
+
+def test_video_to_base64_invalid_workers():
+    with pytest.raises(ValueError):
+        od.video_to_base64("x.mp4", sample_rate=1, workers=0)
+
+
+def test_encode_frame_data_url():
+    import numpy as np
+    img = np.zeros((8, 8, 3), dtype=np.uint8)
+    url = od.encode_frame(img, data_url=True)
+    assert url == "data:image/jpeg;base64," + od.encode_frame(img)
+
+
+def test_stream_images_encodes_lazily(monkeypatch):
+    import numpy as np
+    frames = [np.zeros((8, 8, 3), dtype=np.uint8)] * 3
+    monkeypatch.setattr(od, "sample_frames", lambda video_path, sample_rate: (f for f in frames))
+    imencode = mock.Mock(return_value=(True, make_fake_frame()))
+    monkeypatch.setattr(od.cv2, "imencode", imencode)
+
+    stats = {}
+    images = od.stream_images("v.mp4", sample_rate=1, data_url=True, stats=stats)
+    assert imencode.call_count == 0
+    assert next(images).startswith("data:image/jpeg;base64,")
+    assert imencode.call_count == 1
+    assert len(list(images)) == 2
+    assert stats == {"kept": 3, "over_budget": 0}
+
+
+def test_stream_images_quality_gate_reports_savings(monkeypatch):
+    import numpy as np
+    from metrics import RunMetrics
+    sharp = np.zeros((32, 32, 3), dtype=np.uint8)
+    sharp[:, ::4] = 255
+    black = np.zeros((32, 32, 3), dtype=np.uint8)
+    frames = [sharp, black, sharp.copy(), black]
+    monkeypatch.setattr(od, "sample_frames", lambda video_path, sample_rate: (f for f in frames))
+
+    run = RunMetrics()
+    stats = {}
+    with run.stage("objects"):
+        images = list(od.stream_images("v.mp4", sample_rate=1, quality_gate=True, stats=stats))
+
+    assert len(images) == 2
+    assert stats["low_quality"] == 2 and stats["kept"] == 2
+    # The two black frames would have cost as much as the two images sent
+    assert stats["saved_bytes"] == sum(map(len, images))
+    objects = run.report()["stages"]["objects"]
+    assert objects["skipped_frames"] == 2 and objects["saved_bytes"] == stats["saved_bytes"]
+
+
+def test_stream_images_savings_are_bounded_by_budget(monkeypatch):
+    import numpy as np
+    sharp = np.zeros((32, 32, 3), dtype=np.uint8)
+    sharp[:, ::4] = 255
+    frames = [sharp] * 3 + [np.zeros((32, 32, 3), dtype=np.uint8)] * 5
+    monkeypatch.setattr(od, "sample_frames", lambda video_path, sample_rate: (f for f in frames))
+
+    stats = {}
+    images = list(od.stream_images("v.mp4", sample_rate=1, quality_gate=True, max_frames=4, stats=stats))
+
+    # Without the gate, the budget would have sent one more image
+    assert len(images) == 3
+    assert stats["saved_bytes"] == len(images[0])
+
+
+def test_stream_images_detector_drops_covered_frames(monkeypatch):
+    import numpy as np
+    frames = [np.full((8, 8, 3), value, dtype=np.uint8) for value in (10, 20, 30)]
+    labels = {10: {"cup"}, 20: {"cup"}, 30: {"dog"}}
+    monkeypatch.setattr(od, "sample_frames", lambda video_path, sample_rate: (f for f in frames))
+
+    stats = {}
+    images = list(od.stream_images(
+        "v.mp4", sample_rate=1, detector=lambda img: labels[int(img[0, 0, 0])], workers=4, stats=stats
+    ))
+
+    assert len(images) == 2
+    assert stats["covered"] == 1
+
+
+def test_build_object_detection_request_keeps_data_urls():
+    request = od.build_object_detection_request(["data:image/jpeg;base64,YQ==", "Yg=="], model="gpt-4.1")
+    urls = [c["image_url"] for c in request["input"][1]["content"] if c["type"] == "input_image"]
+    assert urls == ["data:image/jpeg;base64,YQ==", "data:image/jpeg;base64,Yg=="]
+
+
 # object_detection() branches
 def test_object_detection_calls_openai_and_returns_text(monkeypatch):
     # Avoid real frame extraction
-    monkeypatch.setattr(od, "video_to_base64", lambda video_path, sample_rate: ["ZmFrZQ=="])
+    monkeypatch.setattr(od, "stream_images", lambda video_path, sample_rate, **kwargs: ["ZmFrZQ=="])
 
     class R:
         output_text = '{"objects":["cat","tree"]}'
@@ -118,9 +372,33 @@ def test_object_detection_calls_openai_and_returns_text(monkeypatch):
     assert result == '{"objects":["cat","tree"]}'
 
 
+def test_object_detection_forwards_options_and_detail(monkeypatch, caplog):
+    seen = {}
+
+    def fake_stream_images(video_path, sample_rate, **kwargs):
+        seen.update(kwargs)
+        return ["ZmFrZQ==", "ZmFrZQ=="]
+    monkeypatch.setattr(od, "stream_images", fake_stream_images)
+
+    class R:
+        output_text = '{"objects":[]}'
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                seen["details"] = {c["detail"] for c in kwargs["input"][1]["content"] if c["type"] == "input_image"}
+                return R()
+        responses = Responses()
+
+    with caplog.at_level("INFO"):
+        od.object_detection(Client(), video_path="x.mp4", model="gpt-4.1", detail="low", max_edge=512)
+
+    assert seen == {"max_edge": 512, "data_url": True, "details": {"low"}}
+    assert any("Sent 2 images" in m and "detail=low" in m for m in caplog.messages)
+
+
 def test_object_detection_no_frames_raises(monkeypatch):
     """Covers 'No frames were extracted from the video' branch."""
-    monkeypatch.setattr(od, "video_to_base64", lambda *a, **kw: [])
+    monkeypatch.setattr(od, "stream_images", lambda *a, **kw: [])
     class Client:
         responses = mock.Mock()
     with pytest.raises(RuntimeError):
@@ -129,7 +407,7 @@ def test_object_detection_no_frames_raises(monkeypatch):
 
 def test_object_detection_openai_error_wrapped(monkeypatch):
     """Covers try/except around client.responses.create (wrapped as RuntimeError)."""
-    monkeypatch.setattr(od, "video_to_base64", lambda *a, **kw: ["ZmFrZQ=="])
+    monkeypatch.setattr(od, "stream_images", lambda *a, **kw: ["ZmFrZQ=="])
 
     class Client:
         class Responses:
@@ -139,3 +417,141 @@ def test_object_detection_openai_error_wrapped(monkeypatch):
 
     with pytest.raises(RuntimeError):
         od.object_detection(Client(), video_path="x.mp4", model="gpt-4.1", sample_rate=1.0)
+
+
+def test_object_detection_async_returns_text(monkeypatch):
+    import asyncio
+    monkeypatch.setattr(od, "stream_images", lambda video_path, sample_rate, **kwargs: ["ZmFrZQ=="])
+
+    class R:
+        output_text = '{"objects":["cat"]}'
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                images = [c for c in kwargs["input"][1]["content"] if c["type"] == "input_image"]
+                assert images[0]["image_url"] == "data:image/jpeg;base64,ZmFrZQ=="
+                return R()
+        responses = Responses()
+
+    out = asyncio.run(od.object_detection_async(Client(), video_path="x.mp4", model="gpt-4.1", semaphore=asyncio.Semaphore(1)))
+    assert out == R.output_text
+
+
+def test_object_detection_async_no_frames_raises(monkeypatch):
+    import asyncio
+    monkeypatch.setattr(od, "stream_images", lambda *a, **kw: [])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(od.object_detection_async(object(), video_path="x.mp4", model="gpt-4.1"))
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("1. Frying Pans", "frying pan"),
+    ("2) Knives", "knife"),
+    ("Boxes", "box"),
+    ("Cherries", "cherry"),
+    ("Glass", "glass"),
+    ("Buses", "bus"),
+    ("Glasses", "glass"),
+    ("Lenses", "lens"),
+    ("Houses", "house"),
+    ("Cases", "case"),
+    ("3. Cutting-Board", "cutting board"),
+])
+def test_normalize_object(name, expected):
+    assert od.normalize_object(name) == expected
+
+
+def test_merge_objects_dedupes_and_renumbers():
+    merged = od.merge_objects([["1. Stove", "2. Pans"], ["1. pan", "2. STOVE", "3. Tongs"]])
+    assert merged == ["1. Stove", "2. Pans", "3. Tongs"]
+
+
+def test_object_detection_windows_are_sent_concurrently_and_merged(monkeypatch):
+    import json
+    import threading
+    monkeypatch.setattr(od, "stream_images", lambda *a, **kw: ["YQ==", "Yg==", "Yw==", "ZA==", "ZQ=="])
+    barrier = threading.Barrier(3, timeout=5)
+    sizes = []
+
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                images = [c for c in kwargs["input"][1]["content"] if c["type"] == "input_image"]
+                sizes.append(len(images))
+                barrier.wait()
+                class R:
+                    output_text = json.dumps({"objects": ["1. Cat", "2. Cups"] if len(images) == 2 else ["1. cup"]})
+                return R()
+        responses = Responses()
+
+    out = od.object_detection(Client(), video_path="x.mp4", model="gpt-4.1", window_size=2, max_workers=3)
+
+    assert sorted(sizes) == [1, 2, 2]
+    assert json.loads(out) == {"objects": ["1. Cat", "2. Cups"]}
+
+
+def test_object_detection_window_failure_raises(monkeypatch):
+    monkeypatch.setattr(od, "stream_images", lambda *a, **kw: ["YQ==", "Yg=="])
+
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                raise RuntimeError("too large")
+        responses = Responses()
+
+    with pytest.raises(RuntimeError):
+        od.object_detection(Client(), video_path="x.mp4", model="gpt-4.1", window_size=1)
+
+
+def test_object_detection_invalid_window(monkeypatch):
+    monkeypatch.setattr(od, "stream_images", lambda *a, **kw: ["YQ=="])
+    with pytest.raises(ValueError):
+        od.object_detection(object(), video_path="x.mp4", model="gpt-4.1", window_size=0)
+
+
+def test_object_detection_async_windows(monkeypatch):
+    import json
+    import asyncio
+    monkeypatch.setattr(od, "stream_images", lambda *a, **kw: ["YQ==", "Yg==", "Yw=="])
+
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                class R:
+                    output_text = json.dumps({"objects": ["1. Tree", "2. Trees", "3. Bus"]})
+                return R()
+        responses = Responses()
+
+    out = asyncio.run(od.object_detection_async(Client(), video_path="x.mp4", model="gpt-4.1", window_size=2))
+    assert json.loads(out) == {"objects": ["1. Tree", "2. Bus"]}
+
+
+def test_object_detection_bounds_windows_in_flight(monkeypatch):
+    import time
+    import json
+    progress = {"encoded": 0, "done": 0, "ahead": []}
+
+    def fake_stream_images(*args, **kwargs):
+        for i in range(12):
+            progress["encoded"] += 1
+            progress["ahead"].append(progress["encoded"] - progress["done"])
+            yield "YQ=="
+
+    monkeypatch.setattr(od, "stream_images", fake_stream_images)
+
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                time.sleep(0.01)
+                progress["done"] += 1
+                class R:
+                    output_text = json.dumps({"objects": ["1. Cat"]})
+                return R()
+        responses = Responses()
+
+    out = od.object_detection(Client(), video_path="x.mp4", model="gpt-4.1", window_size=1, max_workers=2)
+
+    assert json.loads(out) == {"objects": ["1. Cat"]}
+    assert progress["encoded"] == 12
+    assert max(progress["ahead"]) <= 3
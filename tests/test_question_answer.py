@@ -26,3 +26,106 @@ def test_question_answer_raises_on_error(monkeypatch):
 
     with pytest.raises(RuntimeError):
         qa.question_answer(Client(), transcription="t", model="gpt-4.1")
+
+
+def test_question_answer_async_returns_output_text():
+    import asyncio
+
+    class R:
+        output_text = '{"QA_pairs":[{"Q":"Q1","A":"A1"}]}'
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                return R()
+        responses = Responses()
+
+    out = asyncio.run(qa.question_answer_async(Client(), transcription="t", model="gpt-4.1", semaphore=asyncio.Semaphore(1)))
+    assert out == R.output_text
+
+
+def test_question_answer_async_raises_on_error():
+    import asyncio
+
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                raise RuntimeError("boom")
+        responses = Responses()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(qa.question_answer_async(Client(), transcription="t", model="gpt-4.1"))
+
+
+def make_chunk_client(pairs_per_chunk, requests):
+    import json
+
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                text = kwargs["input"][1]["content"][0]["text"]
+                requests.append(text)
+                class R:
+                    pass
+                if text.startswith("The following Q&A pairs"):
+                    R.output_text = json.dumps({"QA_pairs": [{"Q": "best", "A": "pair"}]})
+                else:
+                    chunk = text.split("Transcription: ")[1]
+                    R.output_text = json.dumps({"QA_pairs": [{"Q": chunk, "A": str(i)} for i in range(pairs_per_chunk)]})
+                return R()
+        responses = Responses()
+
+    return Client()
+
+
+def test_question_answer_selects_best_pairs_of_long_transcript():
+    import json
+    requests = []
+    transcription = "First part here. Second part here. Third part here."
+
+    out = qa.question_answer(make_chunk_client(5, requests), transcription=transcription, model="gpt-4.1", max_tokens=5)
+
+    assert json.loads(out) == {"QA_pairs": [{"Q": "best", "A": "pair"}]}
+    assert len(requests) == 4
+    assert '"Q": "First part here."' in requests[-1]
+
+
+def test_question_answer_few_candidates_skip_selection():
+    import json
+    requests = []
+    transcription = "First part here. Second part here."
+
+    out = qa.question_answer(make_chunk_client(2, requests), transcription=transcription, model="gpt-4.1", max_tokens=5)
+
+    assert [pair["Q"] for pair in json.loads(out)["QA_pairs"]] == ["First part here."] * 2 + ["Second part here."] * 2
+    assert len(requests) == 2
+
+
+def test_question_answer_async_selects_best_pairs_of_long_transcript():
+    import json
+    import asyncio
+    requests = []
+    sync_client = make_chunk_client(5, requests)
+
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                return sync_client.responses.create(**kwargs)
+        responses = Responses()
+
+    transcription = "First part here. Second part here. Third part here."
+    out = asyncio.run(qa.question_answer_async(Client(), transcription=transcription, model="gpt-4.1", max_tokens=5))
+
+    assert json.loads(out) == {"QA_pairs": [{"Q": "best", "A": "pair"}]}
+    assert len(requests) == 4
+    assert '"Q": "First part here."' in requests[-1]
+
+
+def test_question_answer_chunk_failure_raises():
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                raise RuntimeError("boom")
+        responses = Responses()
+
+    with pytest.raises(RuntimeError):
+        qa.question_answer(Client(), transcription="One. Two. Three.", model="gpt-4.1", max_tokens=1)
@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import httpx
+import pytest
+import openai
+import request_scheduler as rs
+
+
+def status_error(status, headers=None, cls=openai.APIStatusError, code=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    body = {"code": code} if code else None
+    return cls("error", response=response, body=body)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(rs.time, "sleep", calls.append)
+    return calls
+
+
+def flaky(errors, result="ok"):
+    errors = list(errors)
+    calls = []
+
+    def fn(**kwargs):
+        calls.append(kwargs)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_call_retries_transient_errors_with_backoff(sleeps):
+    scheduler = rs.RequestScheduler(max_retries=3, base_delay=1, max_delay=2)
+    fn = flaky([status_error(500, cls=openai.InternalServerError), openai.APIConnectionError(request=httpx.Request("POST", "http://x"))])
+
+    assert scheduler.call(fn, model="m") == "ok"
+
+    stats = scheduler.stats()
+    assert len(fn.calls) == 3
+    assert stats["requests"] == 3 and stats["retries"] == 2 and stats["failures"] == 0
+    backoffs = [delay for delay in sleeps if delay]
+    assert len(backoffs) == 2 and 0 <= backoffs[0] <= 1 and 0 <= backoffs[1] <= 2
+
+
+def test_call_honours_retry_after(sleeps):
+    scheduler = rs.RequestScheduler(max_retries=2)
+    fn = flaky([status_error(429, {"retry-after": "7"}, cls=openai.RateLimitError)])
+
+    assert scheduler.call(fn) == "ok"
+    assert 7.0 in sleeps
+    assert scheduler.stats()["backoff_seconds"] == 7.0
+
+
+def test_retry_after_ms_header():
+    assert rs.retry_after(status_error(429, {"retry-after-ms": "250"})) == 0.25
+    assert rs.retry_after(status_error(429, {"retry-after": "soon"})) is None
+    assert rs.retry_after(RuntimeError("no response")) is None
+
+
+@pytest.mark.parametrize("error", [
+    status_error(400, cls=openai.BadRequestError),
+    status_error(429, cls=openai.RateLimitError, code="insufficient_quota"),
+    ValueError("bug"),
+])
+def test_call_does_not_retry_permanent_errors(sleeps, error):
+    scheduler = rs.RequestScheduler(max_retries=3)
+    fn = flaky([error])
+
+    with pytest.raises(type(error)):
+        scheduler.call(fn)
+    assert len(fn.calls) == 1
+    assert scheduler.stats()["failures"] == 1
+
+
+def test_call_gives_up_after_max_retries(sleeps):
+    scheduler = rs.RequestScheduler(max_retries=2, base_delay=0)
+    fn = flaky([status_error(503, cls=openai.InternalServerError)] * 5)
+
+    with pytest.raises(openai.InternalServerError):
+        scheduler.call(fn)
+    assert len(fn.calls) == 3
+    assert scheduler.stats()["retries"] == 2
+
+
+def test_token_bucket_queues_reservations():
+    bucket = rs.TokenBucket(per_minute=60)
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2, abs=0.05)
+
+
+def test_token_bucket_is_thread_safe():
+    bucket = rs.TokenBucket(per_minute=600)
+    delays = []
+
+    def reserve():
+        for _ in range(100):
+            delays.append(bucket.reserve(1))
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 800 units from a 600 budget refilling 10 per second: the last caller waits about 20 seconds
+    assert max(delays) == pytest.approx(20, abs=0.5)
+
+
+def test_call_throttles_on_request_and_token_budgets(sleeps):
+    scheduler = rs.RequestScheduler(requests_per_minute=60, tokens_per_minute=600)
+    request = {"input": [{"role": "user", "content": [{"type": "input_text", "text": "x" * 2400}]}]}
+
+    scheduler.call(lambda **kwargs: "ok", **request)
+    scheduler.call(lambda **kwargs: "ok", **request)
+
+    # The second call needs 600 more tokens at 10 tokens per second
+    assert sleeps[0] == 0
+    assert sleeps[1] == pytest.approx(60, abs=0.5)
+    assert scheduler.stats()["throttle_seconds"] == pytest.approx(60, abs=0.5)
+
+
+def test_invalid_budgets():
+    with pytest.raises(ValueError):
+        rs.TokenBucket(per_minute=0)
+    with pytest.raises(ValueError):
+        rs.RequestScheduler(max_retries=-1)
+
+
+def test_estimate_tokens_counts_text_and_images():
+    request = {"input": [
+        {"role": "developer", "content": [{"type": "input_text", "text": "abcd" * 10}]},
+        {"role": "user", "content": [
+            {"type": "input_image", "image_url": "data:", "detail": "low"},
+            {"type": "input_image", "image_url": "data:"}
+        ]}
+    ]}
+
+    assert rs.estimate_tokens(request) == 10 + 85 + 765
+    assert rs.estimate_tokens({"model": "whisper-1"}) == 0
+
+
+def test_call_async_retries(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+    monkeypatch.setattr(rs.asyncio, "sleep", fake_sleep)
+
+    errors = [status_error(429, {"retry-after": "3"}, cls=openai.RateLimitError)]
+
+    async def fn(**kwargs):
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    scheduler = rs.RequestScheduler()
+    assert asyncio.run(scheduler.call_async(fn, model="m")) == "ok"
+    assert 3.0 in sleeps
+    assert scheduler.stats()["retries"] == 1
+
+
+def test_call_async_raises_permanent_error(monkeypatch):
+    async def fn():
+        raise ValueError("bug")
+
+    with pytest.raises(ValueError):
+        asyncio.run(rs.RequestScheduler().call_async(fn))
+
+
+def test_shared_scheduler_routes_stage_requests(sleeps):
+    import sentiment_analysis as sa
+    scheduler = rs.RequestScheduler(max_retries=1)
+    rs.set_scheduler(scheduler)
+    fn = flaky([status_error(502, cls=openai.InternalServerError)], result=type("R", (), {"output_text": "{}"})())
+
+    class Client:
+        class Responses:
+            create = staticmethod(fn)
+        responses = Responses()
+
+    assert sa.sentiment_analysis(Client(), transcription="t", model="gpt-4.1") == "{}"
+    assert rs.get_scheduler() is scheduler
+    assert scheduler.stats()["retries"] == 1
@@ -0,0 +1,84 @@
+import time
+import pytest
+import result_cache as rc
+
+
+def test_file_digest_is_content_addressed(tmp_path):
+    a = tmp_path / "a.mp4"
+    b = tmp_path / "b.mp4"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+
+    assert rc.file_digest(str(a)) == rc.file_digest(str(b)) == rc.text_digest("same")
+
+
+def test_make_key_depends_on_every_component():
+    base = rc.make_key("sentiment", "abc", "gpt-4.1", {"prompt": "p"})
+
+    assert base == rc.make_key("sentiment", "abc", "gpt-4.1", {"prompt": "p"})
+    assert base != rc.make_key("qa", "abc", "gpt-4.1", {"prompt": "p"})
+    assert base != rc.make_key("sentiment", "xyz", "gpt-4.1", {"prompt": "p"})
+    assert base != rc.make_key("sentiment", "abc", "gpt-4o", {"prompt": "p"})
+    assert base != rc.make_key("sentiment", "abc", "gpt-4.1", {"prompt": "q"})
+
+
+def test_get_or_compute_hits_after_first_call(tmp_path):
+    cache = rc.ResultCache(str(tmp_path / "sub" / "cache.db"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_compute("k", compute) == "value"
+    assert cache.get_or_compute("k", compute) == "value"
+    assert len(calls) == 1
+    cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    rc.ResultCache(path).set("k", "value")
+    assert rc.ResultCache(path).get("k") == "value"
+
+
+def test_bypass_skips_reads_but_refreshes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    rc.ResultCache(path).set("k", "old")
+
+    bypass = rc.ResultCache(path, bypass=True)
+    assert bypass.get("k") is None
+    assert bypass.get_or_compute("k", lambda: "new") == "new"
+    assert rc.ResultCache(path).get("k") == "new"
+
+
+def test_ttl_expires_entries(tmp_path, monkeypatch):
+    cache = rc.ResultCache(str(tmp_path / "cache.db"), ttl=10)
+    now = time.time()
+    monkeypatch.setattr(rc.time, "time", lambda: now)
+    cache.set("k", "value")
+
+    monkeypatch.setattr(rc.time, "time", lambda: now + 11)
+    assert cache.get("k") is None
+
+
+def test_max_bytes_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache = rc.ResultCache(str(tmp_path / "cache.db"), max_bytes=10)
+    clock = iter(range(100))
+    monkeypatch.setattr(rc.time, "time", lambda: next(clock))
+
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get("a")
+    cache.set("c", "cccc")
+
+    assert cache.get("a") == "aaaa"
+    assert cache.get("b") is None
+    assert cache.get("c") == "cccc"
+
+
+def test_invalid_limits(tmp_path):
+    with pytest.raises(ValueError):
+        rc.ResultCache(str(tmp_path / "c.db"), max_bytes=0)
+    with pytest.raises(ValueError):
+        rc.ResultCache(str(tmp_path / "c.db"), ttl=-1)
@@ -26,3 +26,129 @@ def test_sentiment_analysis_raises_on_error():
 
     with pytest.raises(RuntimeError):
         sa.sentiment_analysis(Client(), transcription="t", model="gpt-4.1")
+
+
+def test_sentiment_analysis_async_respects_semaphore():
+    import asyncio
+
+    class R:
+        output_text = '{"mode":"m","sentiment":"s","explanation":"e"}'
+
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        seen = {}
+
+        class Client:
+            class Responses:
+                async def create(self, **kwargs):
+                    seen["locked"] = semaphore.locked()
+                    return R()
+            responses = Responses()
+
+        out = await sa.sentiment_analysis_async(Client(), transcription="t", model="gpt-4.1", semaphore=semaphore)
+        return out, seen
+
+    out, seen = asyncio.run(run())
+    assert out == R.output_text
+    assert seen == {"locked": True}
+
+
+def test_sentiment_analysis_async_raises_on_error():
+    import asyncio
+
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                raise RuntimeError("nope")
+        responses = Responses()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(sa.sentiment_analysis_async(Client(), transcription="t", model="gpt-4.1"))
+
+
+def test_sentiment_analysis_map_reduces_long_transcript():
+    import threading
+    barrier = threading.Barrier(3, timeout=5)
+    requests = []
+
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                text = kwargs["input"][1]["content"][0]["text"]
+                requests.append(text)
+                class R:
+                    output_text = '{"mode":"m","sentiment":"s","explanation":"e"}'
+                if "Part 1:" not in text:
+                    barrier.wait()
+                return R()
+        responses = Responses()
+
+    transcription = "First part here. Second part here. Third part here."
+    out = sa.sentiment_analysis(Client(), transcription=transcription, model="gpt-4.1", max_tokens=5, max_workers=3)
+
+    assert out == '{"mode":"m","sentiment":"s","explanation":"e"}'
+    assert len(requests) == 4
+    assert "Part 3:" in requests[-1]
+
+
+def test_sentiment_analysis_short_transcript_is_not_chunked():
+    calls = []
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                calls.append(kwargs)
+                class R:
+                    output_text = "{}"
+                return R()
+        responses = Responses()
+
+    sa.sentiment_analysis(Client(), transcription="short", model="gpt-4.1", max_tokens=100)
+    assert len(calls) == 1
+
+
+def test_sentiment_analysis_chunk_failure_raises():
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                raise RuntimeError("nope")
+        responses = Responses()
+
+    with pytest.raises(RuntimeError):
+        sa.sentiment_analysis(Client(), transcription="One. Two. Three.", model="gpt-4.1", max_tokens=1)
+
+
+def test_sentiment_analysis_async_map_reduces_long_transcript():
+    import asyncio
+    requests = []
+
+    async def run():
+        semaphore = asyncio.Semaphore(2)
+        in_flight = []
+
+        class Client:
+            class Responses:
+                async def create(self, **kwargs):
+                    requests.append(kwargs["input"][1]["content"][0]["text"])
+                    in_flight.append(2 - semaphore._value)
+                    await asyncio.sleep(0)
+                    class R:
+                        output_text = '{"mode":"m","sentiment":"s","explanation":"e"}'
+                    return R()
+            responses = Responses()
+
+        transcription = "First part here. Second part here. Third part here."
+        out = await sa.sentiment_analysis_async(
+            Client(), transcription=transcription, model="gpt-4.1", semaphore=semaphore, max_tokens=5
+        )
+        return out, in_flight
+
+    out, in_flight = asyncio.run(run())
+    assert out == '{"mode":"m","sentiment":"s","explanation":"e"}'
+    assert len(requests) == 4
+    assert "Part 3:" in requests[-1]
+    assert max(in_flight) == 2
+
+
+def test_build_sentiment_reduce_request_keeps_schema():
+    request = sa.build_sentiment_reduce_request(partials=["{}", "{}"], model="gpt-4.1")
+    assert request["text"] == sa.build_sentiment_request(transcription="", model="gpt-4.1")["text"]
@@ -0,0 +1,140 @@
+import json
+import socket
+import threading
+import urllib.request
+import urllib.error
+import pytest
+import service
+
+
+@pytest.fixture
+def running(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def fake_process_video(api_key, video_path, client, cache=None, single_pass=False, checkpoint_dir=None, force_stages=None):
+        calls.append({"client": client, "force_stages": force_stages})
+        release.wait(5)
+        if "bad" in video_path:
+            return {"video_path": video_path, "status": "error", "error": "RuntimeError: boom", "elapsed": 0.1, "metrics": {}}
+        return {"video_path": video_path, "status": "ok", "output": {"Transcription": "t"}, "elapsed": 0.1, "metrics": {}}
+
+    monkeypatch.setattr(service, "process_video", fake_process_video)
+    pipeline = service.PipelineService("sk", max_workers=1, client=object())
+    server = service.make_server(pipeline, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}", pipeline, release, calls
+
+    release.set()
+    server.shutdown()
+    server.server_close()
+    pipeline.close()
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def wait_finished(url, job_id):
+    for _ in range(200):
+        status, job = request(f"{url}/jobs/{job_id}")
+        if job["status"] in ("ok", "error"):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_service_queues_jobs_and_serves_results(running, tmp_path):
+    url, pipeline, release, calls = running
+    good, bad = tmp_path / "good.mp4", tmp_path / "bad.mp4"
+    good.write_bytes(b"\x00")
+    bad.write_bytes(b"\x00")
+
+    status, first = request(f"{url}/jobs", {"video_path": str(good), "force_stages": ["qa"]})
+    assert status == 202 and first["status"] in ("queued", "running")
+    _, second = request(f"{url}/jobs", {"video_path": str(bad)})
+
+    # One worker: the second job waits for the first
+    assert request(f"{url}/jobs/{second['id']}")[1]["status"] == "queued"
+    assert request(f"{url}/jobs/{first['id']}/result")[0] == 409
+
+    release.set()
+    assert wait_finished(url, first["id"])["status"] == "ok"
+    assert wait_finished(url, second["id"])["error"] == "RuntimeError: boom"
+
+    status, record = request(f"{url}/jobs/{first['id']}/result")
+    assert status == 200 and record["output"] == {"Transcription": "t"}
+    assert "output" not in request(f"{url}/jobs/{first['id']}")[1]
+    assert [job["id"] for job in request(f"{url}/jobs")[1]["jobs"]] == [first["id"], second["id"]]
+
+    # Every job shares the warm client of the service
+    assert calls[0]["client"] is calls[1]["client"] is pipeline.client
+    assert calls[0]["force_stages"] == ["qa"]
+
+
+def test_service_rejects_invalid_jobs(running, tmp_path):
+    url, *_ = running
+    (tmp_path / "notes.txt").write_text("hi")
+
+    assert request(f"{url}/jobs", {"path": "x.mp4"})[0] == 400
+    assert request(f"{url}/jobs", {"video_path": str(tmp_path / "missing.mp4")})[0] == 400
+    assert request(f"{url}/jobs", {"video_path": str(tmp_path / "notes.txt")})[0] == 400
+    assert request(f"{url}/jobs/unknown")[0] == 404
+    assert request(f"{url}/jobs/unknown/result")[0] == 404
+    assert request(f"{url}/health")[1]["status"] == "ok"
+
+
+def test_service_forgets_oldest_finished_jobs(monkeypatch, tmp_path):
+    monkeypatch.setattr(service, "process_video", lambda api_key, video_path, *args: {"status": "ok", "elapsed": 0})
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"\x00")
+    pipeline = service.PipelineService("sk", max_workers=1, max_history=2, client=object())
+
+    job_ids = []
+    for _ in range(4):
+        job_ids.append(pipeline.submit(str(video))["id"])
+    pipeline.close()
+
+    pipeline._forget_finished()
+    assert [job["id"] for job in pipeline.jobs()] == job_ids[-2:]
+
+
+def test_service_listens_on_unix_socket(tmp_path):
+    pipeline = service.PipelineService("sk", client=object())
+    socket_path = str(tmp_path / "pipeline.sock")
+    server = service.make_server(pipeline, socket_path=socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(socket_path)
+            client.sendall(b"GET /jobs HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+            response = b""
+            while chunk := client.recv(4096):
+                response += chunk
+    finally:
+        server.shutdown()
+        server.server_close()
+        pipeline.close()
+
+    assert response.startswith(b"HTTP/1.1 200")
+    assert json.loads(response.split(b"\r\n\r\n", 1)[1]) == {"jobs": []}
+
+
+def test_service_imports_stage_modules_at_start(monkeypatch):
+    import sys
+    import main
+    monkeypatch.delitem(vars(main), "video_transcript", raising=False)
+    monkeypatch.delitem(sys.modules, "moviepy", raising=False)
+
+    pipeline = service.PipelineService("sk", client=object())
+    pipeline.close()
+
+    assert "video_transcript" in vars(main)
+    assert "moviepy" in sys.modules
@@ -0,0 +1,67 @@
+import time
+import threading
+import pytest
+import stage_scheduler as ss
+
+
+def test_run_stages_passes_dependency_results():
+    stages = {
+        "a": ((), lambda: 1),
+        "b": (("a",), lambda a: a + 1),
+        "c": (("a", "b"), lambda a, b: a + b),
+    }
+    timings = {}
+
+    results = ss.run_stages(stages, timings=timings)
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert set(timings) == {"a", "b", "c"}
+
+
+def test_run_stages_runs_independent_stages_concurrently():
+    """Two independent stages must overlap, otherwise the barrier times out."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def stage():
+        barrier.wait()
+        return True
+
+    results = ss.run_stages({"x": ((), stage), "y": ((), stage)}, max_workers=2)
+    assert results == {"x": True, "y": True}
+
+
+def test_run_stages_propagates_error_and_skips_dependents():
+    called = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    stages = {
+        "a": ((), fail),
+        "b": (("a",), lambda a: called.append(a)),
+    }
+
+    with pytest.raises(RuntimeError):
+        ss.run_stages(stages)
+    assert called == []
+
+
+def test_run_stages_unknown_dependency():
+    with pytest.raises(ValueError):
+        ss.run_stages({"a": (("missing",), lambda missing: None)})
+
+
+def test_run_stages_cycle():
+    with pytest.raises(ValueError):
+        ss.run_stages({"a": (("b",), lambda b: b), "b": (("a",), lambda a: a)})
+
+
+def test_run_stages_invalid_workers():
+    with pytest.raises(ValueError):
+        ss.run_stages({"a": ((), lambda: None)}, max_workers=0)
+
+
+def test_run_stages_records_timing():
+    timings = {}
+    ss.run_stages({"slow": ((), lambda: time.sleep(0.01))}, timings=timings)
+    assert timings["slow"] >= 0.01
@@ -0,0 +1,33 @@
+import pytest
+import text_chunking as tc
+
+
+def test_count_tokens_estimates_from_length():
+    assert tc.count_tokens("") == 0
+    assert tc.count_tokens("abcd") == 1
+    assert tc.count_tokens("abcde") == 2
+
+
+def test_split_transcript_within_budget_is_one_chunk():
+    assert tc.split_transcript("Hello there. General Kenobi.", max_tokens=100) == ["Hello there. General Kenobi."]
+
+
+def test_split_transcript_packs_sentences():
+    transcription = "One two three. Four five six. Seven eight nine. Ten."
+    chunks = tc.split_transcript(transcription, max_tokens=8)
+
+    assert chunks == ["One two three. Four five six.", "Seven eight nine. Ten."]
+    assert all(tc.count_tokens(chunk) <= 8 for chunk in chunks)
+
+
+def test_split_transcript_breaks_long_sentence_between_words():
+    transcription = " ".join(["word"] * 20)
+    chunks = tc.split_transcript(transcription, max_tokens=5)
+
+    assert " ".join(chunks) == transcription
+    assert all(len(chunk) <= 20 for chunk in chunks)
+
+
+def test_split_transcript_invalid_budget():
+    with pytest.raises(ValueError):
+        tc.split_transcript("text", max_tokens=0)
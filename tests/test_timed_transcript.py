@@ -0,0 +1,72 @@
+import pytest
+from types import SimpleNamespace
+from timed_transcript import TimedTranscript
+
+
+@pytest.fixture
+def transcript():
+    return TimedTranscript.from_segments([
+        (0.0, 2.0, " Hello there."),
+        (2.5, 4.0, " How are you?"),
+        (4.0, 4.5, "  "),
+        (6.0, 8.0, "Fine, thanks.")
+    ])
+
+
+def test_from_segments_builds_columns(transcript):
+    assert transcript.text == "Hello there. How are you? Fine, thanks."
+    assert len(transcript) == 3
+    assert list(transcript.starts) == [0.0, 2.5, 6.0]
+    assert list(transcript.offsets) == [0, 13, 26]
+    assert transcript.segment(1) == (2.5, 4.0, "How are you?")
+    assert transcript.segment(2) == (6.0, 8.0, "Fine, thanks.")
+
+
+def test_index_at_finds_spoken_segment(transcript):
+    assert transcript.index_at(0.0) == 0
+    assert transcript.index_at(3.9) == 1
+    assert transcript.index_at(2.2) is None
+    assert transcript.index_at(5.0) is None
+    assert transcript.index_at(-1) is None
+    assert transcript.index_at(9.0) is None
+
+
+def test_span_and_text_between(transcript):
+    assert transcript.span(1.0, 3.0) == range(0, 2)
+    assert transcript.text_between(1.0, 3.0) == "Hello there. How are you?"
+    assert transcript.text_between(4.5, 5.5) == ""
+    assert transcript.text_between(7.0, 100) == "Fine, thanks."
+
+
+def test_align_frames_with_speech(transcript):
+    assert transcript.align([0.5, 2.2, 3.0, 7.0]) == ["Hello there.", "", "How are you?", "Fine, thanks."]
+
+
+def test_dict_and_json_round_trip(transcript):
+    data = transcript.to_dict()
+    assert data == {"text": transcript.text, "start": [0.0, 2.5, 6.0], "end": [2.0, 4.0, 8.0], "offset": [0, 13, 26]}
+
+    restored = TimedTranscript.from_json(transcript.to_json())
+    assert restored.to_dict() == data
+    assert str(restored) == transcript.text
+
+
+def test_columns_must_have_same_length():
+    with pytest.raises(ValueError):
+        TimedTranscript("text", [0.0], [1.0, 2.0], [0])
+
+
+def test_from_response_offsets_times():
+    response = SimpleNamespace(segments=[SimpleNamespace(start=1.0, end=2.0, text=" Hi.")])
+    assert TimedTranscript.from_response(response, time_offset=10).segment(0) == (11.0, 12.0, "Hi.")
+    assert len(TimedTranscript.from_response(SimpleNamespace(segments=None))) == 0
+
+
+def test_merge_keeps_each_overlapping_segment_once():
+    first = TimedTranscript.from_segments([(0.0, 4.0, "one"), (8.5, 9.5, "two")])
+    second = TimedTranscript.from_segments([(8.5, 9.5, "two"), (12.0, 14.0, "three")])
+
+    merged = TimedTranscript.merge([first, second], [(0.0, 10.0), (8.0, 18.0)])
+
+    assert merged.text == "one two three"
+    assert list(merged.starts) == [0.0, 8.5, 12.0]
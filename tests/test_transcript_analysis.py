@@ -0,0 +1,137 @@
+import pytest
+import transcript_analysis as ta
+
+
+def test_build_transcript_analysis_request_combines_schemas():
+    request = ta.build_transcript_analysis_request(transcription="hello", model="gpt-4.1")
+    schema = request["text"]["format"]["schema"]
+
+    assert request["model"] == "gpt-4.1"
+    assert set(schema["properties"]) == {"mode", "sentiment", "explanation", "QA_pairs"}
+    assert schema["required"] == ["mode", "sentiment", "explanation", "QA_pairs"]
+    assert "Transcription: hello" in request["input"][1]["content"][0]["text"]
+
+
+def test_transcript_analysis_returns_output_text():
+    calls = []
+    class R:
+        output_text = '{"mode":"m","sentiment":"s","explanation":"e","QA_pairs":[]}'
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                calls.append(kwargs)
+                return R()
+        responses = Responses()
+
+    out = ta.transcript_analysis(Client(), transcription="hello", model="gpt-4.1")
+    assert out == R.output_text
+    assert len(calls) == 1
+
+
+def test_transcript_analysis_raises_on_error():
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                raise RuntimeError("nope")
+        responses = Responses()
+
+    with pytest.raises(RuntimeError):
+        ta.transcript_analysis(Client(), transcription="t", model="gpt-4.1")
+
+
+def make_text_client(requests):
+    import json
+
+    class Client:
+        class Responses:
+            def create(self, **kwargs):
+                text = kwargs["input"][1]["content"][0]["text"]
+                requests.append(text)
+                class R:
+                    pass
+                if "QA_pairs" in kwargs["text"]["format"]["schema"]["properties"]:
+                    R.output_text = json.dumps({"QA_pairs": [{"Q": text.split("Transcription: ")[1], "A": "a"}]})
+                else:
+                    R.output_text = json.dumps({"mode": "m", "sentiment": "s", "explanation": "e"})
+                return R()
+        responses = Responses()
+
+    return Client()
+
+
+def test_transcript_analysis_long_transcript_falls_back_to_chunks():
+    import json
+    requests = []
+    transcription = "First part here. Second part here. Third part here."
+
+    out = ta.transcript_analysis(make_text_client(requests), transcription=transcription, model="gpt-4.1", max_tokens=5)
+
+    # 3 sentiment chunks and their merge, and 3 Q&A chunks whose 3 candidates need no selection
+    assert len(requests) == 7
+    assert json.loads(out) == {
+        "mode": "m", "sentiment": "s", "explanation": "e",
+        "QA_pairs": [{"Q": "First part here.", "A": "a"}, {"Q": "Second part here.", "A": "a"}, {"Q": "Third part here.", "A": "a"}]
+    }
+
+
+def test_transcript_analysis_short_transcript_is_one_request():
+    requests = []
+    ta.transcript_analysis(make_text_client(requests), transcription="short", model="gpt-4.1", max_tokens=100)
+    assert len(requests) == 1
+
+
+def test_transcript_analysis_async_long_transcript_falls_back_to_chunks():
+    import json
+    import asyncio
+    requests = []
+    sync_client = make_text_client(requests)
+
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                return sync_client.responses.create(**kwargs)
+        responses = Responses()
+
+    transcription = "First part here. Second part here. Third part here."
+    out = asyncio.run(ta.transcript_analysis_async(Client(), transcription=transcription, model="gpt-4.1", max_tokens=5))
+
+    assert len(requests) == 7
+    assert set(json.loads(out)) == {"mode", "sentiment", "explanation", "QA_pairs"}
+
+
+def test_transcript_analysis_async_respects_semaphore():
+    import asyncio
+
+    class R:
+        output_text = '{"mode":"m","sentiment":"s","explanation":"e","QA_pairs":[]}'
+
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        seen = {}
+
+        class Client:
+            class Responses:
+                async def create(self, **kwargs):
+                    seen["locked"] = semaphore.locked()
+                    return R()
+            responses = Responses()
+
+        out = await ta.transcript_analysis_async(Client(), transcription="t", model="gpt-4.1", semaphore=semaphore)
+        return out, seen
+
+    out, seen = asyncio.run(run())
+    assert out == R.output_text
+    assert seen == {"locked": True}
+
+
+def test_transcript_analysis_async_raises_on_error():
+    import asyncio
+
+    class Client:
+        class Responses:
+            async def create(self, **kwargs):
+                raise RuntimeError("nope")
+        responses = Responses()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ta.transcript_analysis_async(Client(), transcription="t", model="gpt-4.1"))
@@ -19,7 +19,7 @@ def test_video_transcript_happy_path(monkeypatch, tmp_path):
         def __enter__(self): return self
         def __exit__(self, exc_type, exc, tb): pass
 
-    monkeypatch.setattr(vt, "VideoFileClip", mock.Mock(return_value=FakeClip()))
+    monkeypatch.setattr("moviepy.VideoFileClip", mock.Mock(return_value=FakeClip()))
 
     # Mock client.audio.transcriptions.create to return object with "text"
     class R:
@@ -41,7 +41,7 @@ def test_video_transcript_happy_path(monkeypatch, tmp_path):
     monkeypatch.setattr(vt.os, "remove", fake_remove)
 
     # Act
-    out = vt.video_transcript(Client(), video_path="video.mp4", model="whisper-1")
+    out = vt.video_transcript(Client(), video_path="video.mp4", model="whisper-1", in_memory=False)
 
     # Assert
     assert out == "hello world"
@@ -53,10 +53,350 @@ def test_video_transcript_raises_on_error(monkeypatch):
     # Make VideoFileClip raise
     def bad_vfc(*args, **kwargs):
         raise RuntimeError("decode error")
-    monkeypatch.setattr(vt, "VideoFileClip", bad_vfc)
+    monkeypatch.setattr("moviepy.VideoFileClip", bad_vfc)
 
     class Client:
         pass
 
     with pytest.raises(RuntimeError):
-        vt.video_transcript(Client(), video_path="x.mp4", model="whisper-1")
+        vt.video_transcript(Client(), video_path="x.mp4", model="whisper-1", in_memory=False)
+
+
+def test_video_transcript_async_happy_path(monkeypatch, tmp_path):
+    import asyncio
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"FAKEAUDIO")
+    monkeypatch.setattr(vt, "extract_audio", lambda video_path, start=None, end=None: str(audio))
+
+    class R:
+        text = "hello async"
+    class Client:
+        class Audio:
+            class Transcriptions:
+                async def create(self, **kwargs):
+                    assert kwargs["prompt"] == vt.TRANSCRIPTION_PROMPT
+                    return R()
+            transcriptions = Transcriptions()
+        audio = Audio()
+
+    out = asyncio.run(vt.video_transcript_async(
+        Client(), video_path="video.mp4", model="whisper-1", semaphore=asyncio.Semaphore(1), in_memory=False
+    ))
+
+    assert out == "hello async"
+    assert not audio.exists()
+
+
+def test_video_transcript_async_raises_on_error(monkeypatch):
+    import asyncio
+
+    def bad_extract(video_path, start=None, end=None):
+        raise RuntimeError("decode error")
+    monkeypatch.setattr(vt, "extract_audio", bad_extract)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(vt.video_transcript_async(object(), video_path="x.mp4", model="whisper-1", in_memory=False))
+
+
+def test_plan_chunks_overlap():
+    assert vt.plan_chunks(25, chunk_seconds=10, overlap_seconds=2) == [(0.0, 10), (8, 18), (16, 25)]
+    assert vt.plan_chunks(5, chunk_seconds=10) == [(0.0, 5)]
+
+
+@pytest.mark.parametrize("chunk, overlap", [(0, 0), (10, 10), (10, -1)])
+def test_plan_chunks_invalid(chunk, overlap):
+    with pytest.raises(ValueError):
+        vt.plan_chunks(30, chunk_seconds=chunk, overlap_seconds=overlap)
+
+
+def test_stitch_transcripts_removes_overlap():
+    texts = [
+        "The quick brown fox jumps over the lazy dog.",
+        "ump over the lazy dog. Then it ran away",
+        "ran away into the forest.",
+    ]
+    assert vt.stitch_transcripts(texts) == (
+        "The quick brown fox jumps over the lazy dog. Then it ran away into the forest."
+    )
+
+
+def test_stitch_transcripts_without_overlap_concatenates():
+    assert vt.stitch_transcripts(["hello there", "general kenobi"]) == "hello there general kenobi"
+    assert vt.stitch_transcripts([]) == ""
+
+
+def test_video_transcript_chunks_long_audio(monkeypatch, tmp_path):
+    import threading
+    monkeypatch.setattr(vt, "audio_duration", lambda video_path: 25.0)
+
+    def fake_extract(video_path, start=None, end=None):
+        path = tmp_path / f"chunk_{start:g}.mp3"
+        path.write_text(f"{start:g}")
+        return str(path)
+    monkeypatch.setattr(vt, "extract_audio", fake_extract)
+
+    texts = {"0": "one two three four", "8": "three four five six", "16": "five six seven"}
+    barrier = threading.Barrier(3, timeout=5)
+
+    class Client:
+        class Audio:
+            class Transcriptions:
+                def create(self, file, **kwargs):
+                    start = file.read().decode()
+                    barrier.wait()
+                    class R:
+                        text = texts[start]
+                    return R()
+            transcriptions = Transcriptions()
+        audio = Audio()
+
+    timings = []
+    out = vt.video_transcript(
+        Client(), video_path="v.mp4", model="whisper-1",
+        chunk_seconds=10, overlap_seconds=2, max_workers=3, chunk_timings=timings, in_memory=False
+    )
+
+    assert out == "one two three four five six seven"
+    assert [(t["index"], t["start"], t["end"]) for t in timings] == [(0, 0.0, 10), (1, 8, 18), (2, 16, 25.0)]
+    assert all("transcribe_seconds" in t for t in timings)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_video_transcript_async_chunks_long_audio(monkeypatch, tmp_path):
+    import asyncio
+    monkeypatch.setattr(vt, "audio_duration", lambda video_path: 25.0)
+
+    def fake_extract(video_path, start=None, end=None):
+        path = tmp_path / f"chunk_{start:g}.mp3"
+        path.write_text(f"{start:g}")
+        return str(path)
+    monkeypatch.setattr(vt, "extract_audio", fake_extract)
+
+    texts = {"0": "one two three four", "8": "three four five six", "16": "five six seven"}
+
+    async def run():
+        semaphore = asyncio.Semaphore(3)
+        barrier = asyncio.Barrier(3)
+
+        class Client:
+            class Audio:
+                class Transcriptions:
+                    async def create(self, file, **kwargs):
+                        start = file.read().decode()
+                        await asyncio.wait_for(barrier.wait(), timeout=5)
+                        class R:
+                            text = texts[start]
+                        return R()
+                transcriptions = Transcriptions()
+            audio = Audio()
+
+        return await vt.video_transcript_async(
+            Client(), video_path="v.mp4", model="whisper-1", semaphore=semaphore,
+            chunk_seconds=10, overlap_seconds=2, in_memory=False
+        )
+
+    assert asyncio.run(run()) == "one two three four five six seven"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_video_transcript_timestamps_merges_chunks_by_time(monkeypatch, tmp_path):
+    from types import SimpleNamespace
+    monkeypatch.setattr(vt, "audio_duration", lambda video_path: 25.0)
+
+    def fake_extract(video_path, start=None, end=None):
+        path = tmp_path / f"chunk_{start:g}.mp3"
+        path.write_text(f"{start:g}")
+        return str(path)
+    monkeypatch.setattr(vt, "extract_audio", fake_extract)
+
+    # Segment times are relative to each chunk; the segment around 8-10s is heard by the first two chunks
+    segments = {
+        "0": [(0.0, 4.0, " one two"), (4.0, 9.5, " three four")],
+        "8": [(0.3, 1.3, " four"), (2.0, 9.0, " five six")],
+        "16": [(1.5, 9.0, " seven")]
+    }
+    requests = []
+
+    class Transcriptions:
+        def create(self, file, **kwargs):
+            requests.append(kwargs)
+            return SimpleNamespace(segments=[
+                SimpleNamespace(start=start, end=end, text=text) for start, end, text in segments[file.read().decode()]
+            ])
+
+    client = SimpleNamespace(audio=SimpleNamespace(transcriptions=Transcriptions()))
+    out = vt.video_transcript(
+        client, video_path="v.mp4", model="whisper-1", chunk_seconds=10, overlap_seconds=2, in_memory=False,
+        timestamps=True
+    )
+
+    assert out.text == "one two three four five six seven"
+    assert list(out.starts) == [0.0, 4.0, 10.0, 17.5]
+    assert out.text_between(12, 14) == "five six"
+    assert {request["response_format"] for request in requests} == {"verbose_json"}
+    assert requests[0]["timestamp_granularities"] == ["segment"]
+
+
+def test_video_transcript_reads_audio_from_ingest(monkeypatch):
+    import io
+    monkeypatch.setattr(vt, "audio_duration", mock.Mock(side_effect=AssertionError("video opened again")))
+    monkeypatch.setattr(vt, "open_audio", mock.Mock(side_effect=AssertionError("video opened again")))
+
+    class Ingest:
+        sections = []
+        def metadata(self):
+            return {"duration": 25.0}
+        def audio(self, start=None, end=None):
+            self.sections.append((start, end))
+            return io.BytesIO(b"ogg")
+
+    class Client:
+        class Audio:
+            class Transcriptions:
+                def create(self, file, **kwargs):
+                    class R:
+                        text = "words"
+                    return R()
+            transcriptions = Transcriptions()
+        audio = Audio()
+
+    out = vt.video_transcript(Client(), video_path="v.mp4", model="whisper-1", chunk_seconds=10, overlap_seconds=2, ingest=Ingest())
+
+    assert out.startswith("words")
+    assert sorted(Ingest.sections) == [(0.0, 10), (8, 18), (16, 25.0)]
+
+
+def test_video_transcript_short_audio_is_not_chunked(monkeypatch, tmp_path):
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"FAKEAUDIO")
+    monkeypatch.setattr(vt, "audio_duration", lambda video_path: 5.0)
+    monkeypatch.setattr(vt, "extract_audio", lambda video_path, start=None, end=None: str(audio))
+
+    class Client:
+        class Audio:
+            class Transcriptions:
+                def create(self, **kwargs):
+                    class R:
+                        text = "short"
+                    return R()
+            transcriptions = Transcriptions()
+        audio = Audio()
+
+    assert vt.video_transcript(Client(), video_path="v.mp4", model="whisper-1", chunk_seconds=10, in_memory=False) == "short"
+
+
+def test_video_transcript_chunk_failure_raises(monkeypatch, tmp_path):
+    monkeypatch.setattr(vt, "audio_duration", lambda video_path: 25.0)
+
+    def bad_extract(video_path, start=None, end=None):
+        raise RuntimeError("decode error")
+    monkeypatch.setattr(vt, "extract_audio", bad_extract)
+
+    with pytest.raises(RuntimeError):
+        vt.video_transcript(object(), video_path="v.mp4", model="whisper-1", chunk_seconds=10, in_memory=False)
+
+
+def test_video_transcript_duration_failure_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        vt.video_transcript(object(), video_path=str(tmp_path / "missing.mp4"), model="whisper-1", chunk_seconds=10)
+
+
+@pytest.fixture
+def video_with_audio(tmp_path):
+    import subprocess
+    path = tmp_path / "tone.mp4"
+    subprocess.run([
+        vt.get_ffmpeg_exe(), "-loglevel", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=3",
+        "-f", "lavfi", "-i", "color=c=black:s=64x64:d=3", "-shortest", "-c:v", "mpeg4", str(path)
+    ], check=True)
+    return str(path)
+
+
+def test_audio_duration_reads_header_without_moviepy(monkeypatch, video_with_audio):
+    monkeypatch.setattr("moviepy.VideoFileClip", mock.Mock(side_effect=AssertionError("clip opened")))
+    assert vt.audio_duration(video_with_audio) == pytest.approx(3.0, abs=0.1)
+
+
+def test_extract_audio_buffer_encodes_opus_in_memory(video_with_audio, tmp_path):
+    buffer = vt.extract_audio_buffer(video_with_audio)
+    section = vt.extract_audio_buffer(video_with_audio, start=1, end=2)
+
+    assert buffer.name == "audio.ogg"
+    assert buffer.read(4) == b"OggS"
+    assert 0 < len(section.getvalue()) < len(buffer.getvalue())
+    assert list(tmp_path.iterdir()) == [tmp_path / "tone.mp4"]
+
+
+def test_extract_audio_buffer_over_limit_returns_none(video_with_audio):
+    assert vt.extract_audio_buffer(video_with_audio, max_bytes=100) is None
+
+
+def test_extract_audio_buffer_ffmpeg_failure(tmp_path):
+    with pytest.raises(RuntimeError, match="ffmpeg"):
+        vt.extract_audio_buffer(str(tmp_path / "missing.mp4"))
+
+
+def test_open_audio_falls_back_to_temp_file(monkeypatch, tmp_path):
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"FAKEAUDIO")
+    monkeypatch.setattr(vt, "extract_audio_buffer", lambda video_path, start=None, end=None: None)
+    monkeypatch.setattr(vt, "extract_audio", lambda video_path, start=None, end=None: str(audio))
+
+    file, audio_file = vt.open_audio("v.mp4")
+    with file:
+        assert file.read() == b"FAKEAUDIO"
+    assert audio_file == str(audio)
+
+
+def test_video_transcript_uploads_in_memory_buffer(monkeypatch):
+    import io
+    buffer = io.BytesIO(b"OggS")
+    buffer.name = "audio.ogg"
+    monkeypatch.setattr(vt, "extract_audio_buffer", lambda video_path, start=None, end=None: buffer)
+
+    def no_temp_file(*args, **kwargs):
+        raise AssertionError("temporary file should not be written")
+    monkeypatch.setattr(vt, "extract_audio", no_temp_file)
+
+    uploads = []
+    class Client:
+        class Audio:
+            class Transcriptions:
+                def create(self, file, **kwargs):
+                    uploads.append((file.name, file.read()))
+                    class R:
+                        text = "in memory"
+                    return R()
+            transcriptions = Transcriptions()
+        audio = Audio()
+
+    assert vt.video_transcript(Client(), video_path="v.mp4", model="whisper-1") == "in memory"
+    assert uploads == [("audio.ogg", b"OggS")]
+    assert buffer.closed
+
+
+def test_video_transcript_retry_uploads_whole_buffer_again(monkeypatch):
+    import io
+    import httpx
+    import openai
+    buffer = io.BytesIO(b"OggS-audio")
+    buffer.name = "audio.ogg"
+    monkeypatch.setattr(vt, "extract_audio_buffer", lambda video_path, start=None, end=None: buffer)
+    monkeypatch.setattr("request_scheduler.time.sleep", lambda delay: None)
+
+    uploads = []
+    class Client:
+        class Audio:
+            class Transcriptions:
+                def create(self, file, **kwargs):
+                    uploads.append(file.read())
+                    if len(uploads) == 1:
+                        raise openai.APIConnectionError(request=httpx.Request("POST", "http://x"))
+                    class R:
+                        text = "retried"
+                    return R()
+            transcriptions = Transcriptions()
+        audio = Audio()
+
+    assert vt.video_transcript(Client(), video_path="v.mp4", model="whisper-1") == "retried"
+    assert uploads == [b"OggS-audio", b"OggS-audio"]
@@ -0,0 +1,73 @@
+import re
+import math
+
+# Rough size of an English token, used to estimate prompt sizes without a tokenizer
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text.
+
+    Args:
+        text (str): The text to be measured.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_transcript(transcription: str, max_tokens: int) -> list[str]:
+    """
+    Split a transcription into consecutive chunks of at most `max_tokens` estimated tokens.
+    Chunks end on sentence boundaries; a single sentence longer than the budget is split between words.
+
+    Args:
+        transcription (str): The complete transcription of the video.
+        max_tokens (int): The token budget of each chunk (must be > 0).
+
+    Returns:
+        list[str]: The chunks, in order. A transcription within the budget is returned as a single chunk.
+
+    Raises:
+        ValueError: If `max_tokens` is less than or equal to 0.
+    """
+
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be greater than 0")
+
+    if count_tokens(transcription) <= max_tokens:
+        return [transcription]
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for sentence in _SENTENCE_END.split(transcription.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        # Break an oversized sentence between words
+        piece = ""
+        for word in sentence.split():
+            if piece and len(piece) + 1 + len(word) > max_chars:
+                pieces.append(piece)
+                piece = ""
+            piece = f"{piece} {word}" if piece else word
+        if piece:
+            pieces.append(piece)
+
+    # Pack consecutive pieces greedily into chunks
+    chunks = []
+    chunk = ""
+    for piece in pieces:
+        if chunk and len(chunk) + 1 + len(piece) > max_chars:
+            chunks.append(chunk)
+            chunk = ""
+        chunk = f"{chunk} {piece}" if chunk else piece
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
@@ -0,0 +1,191 @@
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+
+class TimedTranscript:
+    """
+    A transcript with the time span of each of its segments, stored as columns: the full `text`,
+    and arrays of segment `starts` and `ends` (seconds) and of `offsets` (the index in `text` where each segment starts).
+    Segments are ordered by time, so a time range is found by bisection instead of rescanning the text.
+    """
+
+    def __init__(self, text: str, starts: Iterable[float], ends: Iterable[float], offsets: Iterable[int]):
+        """
+        Args:
+            text (str): The complete transcript.
+            starts (Iterable[float]): Start of each segment, in seconds, in increasing order.
+            ends (Iterable[float]): End of each segment, in seconds.
+            offsets (Iterable[int]): Index in `text` of the first character of each segment.
+
+        Raises:
+            ValueError: If the columns have different lengths.
+        """
+
+        self.text = text
+        self.starts = array("d", starts)
+        self.ends = array("d", ends)
+        self.offsets = array("q", offsets)
+
+        if not len(self.starts) == len(self.ends) == len(self.offsets):
+            raise ValueError("starts, ends and offsets must have the same length")
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[tuple[float, float, str]]) -> "TimedTranscript":
+        """
+        Build a transcript from (start, end, text) segments, joined with spaces. Empty segments are dropped.
+
+        Args:
+            segments (Iterable[tuple[float, float, str]]): The segments, in order.
+
+        Returns:
+            TimedTranscript: The transcript.
+        """
+
+        parts, starts, ends, offsets = [], [], [], []
+        length = 0
+        for start, end, text in segments:
+            text = text.strip()
+            if not text:
+                continue
+            if parts:
+                length += 1
+            starts.append(start)
+            # Keep the ends ordered, so time ranges can be bisected on them
+            ends.append(max(end, ends[-1] if ends else end))
+            offsets.append(length)
+            parts.append(text)
+            length += len(text)
+
+        return cls(" ".join(parts), starts, ends, offsets)
+
+    @classmethod
+    def from_response(cls, response, time_offset: float=0.0) -> "TimedTranscript":
+        """
+        Build a transcript from a `verbose_json` transcription response.
+
+        Args:
+            response (TranscriptionVerbose): The response, with its `segments`.
+            time_offset (float): Added to every timestamp, the start of the audio section in the video.
+
+        Returns:
+            TimedTranscript: The transcript.
+        """
+
+        return cls.from_segments(
+            (segment.start + time_offset, segment.end + time_offset, segment.text) for segment in response.segments or []
+        )
+
+    @classmethod
+    def merge(cls, parts: list["TimedTranscript"], sections: list[tuple[float, float]]) -> "TimedTranscript":
+        """
+        Join the transcripts of overlapping audio sections, keeping each segment transcribed twice only once.
+        Each section owns the time from the middle of its overlap with the previous section
+        to the middle of its overlap with the next one, and keeps the segments whose midpoint falls in it.
+
+        Args:
+            parts (list[TimedTranscript]): The transcript of each section, with timestamps relative to the video.
+            sections (list[tuple[float, float]]): The (start, end) of each section, in order, see `plan_chunks`.
+
+        Returns:
+            TimedTranscript: The joined transcript.
+        """
+
+        bounds = [0.0] + [(sections[i][1] + sections[i + 1][0]) / 2 for i in range(len(sections) - 1)] + [float("inf")]
+
+        return cls.from_segments(
+            segment
+            for i, part in enumerate(parts)
+            for segment in map(part.segment, range(len(part)))
+            if bounds[i] <= (segment[0] + segment[1]) / 2 < bounds[i + 1]
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def segment(self, index: int) -> tuple[float, float, str]:
+        """
+        The (start, end, text) of a segment.
+        """
+
+        stop = self.offsets[index + 1] - 1 if index + 1 < len(self) else len(self.text)
+        return self.starts[index], self.ends[index], self.text[self.offsets[index]:stop]
+
+    def index_at(self, time: float) -> int | None:
+        """
+        The index of the segment spoken at a time, or None if nothing is spoken then.
+        """
+
+        index = bisect_right(self.starts, time) - 1
+        return index if index >= 0 and time < self.ends[index] else None
+
+    def span(self, start: float, end: float) -> range:
+        """
+        The indices of the segments overlapping a time range.
+
+        Args:
+            start (float): Start of the range, in seconds.
+            end (float): End of the range, in seconds.
+
+        Returns:
+            range: The indices of the segments ending after `start` and starting before `end`.
+        """
+
+        first = bisect_right(self.ends, start)
+        return range(first, max(first, bisect_left(self.starts, end)))
+
+    def text_between(self, start: float, end: float) -> str:
+        """
+        The text spoken during a time range, see `span`.
+        """
+
+        indices = self.span(start, end)
+        if not indices:
+            return ""
+
+        last = self.offsets[indices[-1]] + len(self.segment(indices[-1])[2])
+        return self.text[self.offsets[indices[0]]:last]
+
+    def align(self, times: Iterable[float]) -> list[str]:
+        """
+        The text spoken at each of a list of times, like the timestamps of sampled frames.
+
+        Args:
+            times (Iterable[float]): The times, in seconds.
+
+        Returns:
+            list[str]: The text of the segment spoken at each time, or "" when nothing is spoken.
+        """
+
+        return [self.segment(index)[2] if (index := self.index_at(time)) is not None else "" for time in times]
+
+    def to_dict(self) -> dict:
+        """
+        The columns as JSON-serialisable lists, timestamps rounded to the millisecond.
+        """
+
+        return {
+            "text": self.text,
+            "start": [round(start, 3) for start in self.starts],
+            "end": [round(end, 3) for end in self.ends],
+            "offset": list(self.offsets)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TimedTranscript":
+        """
+        The inverse of `to_dict`.
+        """
+
+        return cls(data["text"], data["start"], data["end"], data["offset"])
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, data: str) -> "TimedTranscript":
+        return cls.from_dict(json.loads(data))
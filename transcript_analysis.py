@@ -0,0 +1,182 @@
+import json
+import asyncio
+import logging
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, AsyncOpenAI
+from request_scheduler import submit, submit_async
+from metrics import propagate
+from text_chunking import count_tokens
+from sentiment_analysis import build_sentiment_request, sentiment_analysis, sentiment_analysis_async
+from question_answer import build_question_answer_request, question_answer, question_answer_async
+
+logger = logging.getLogger(__name__)
+
+def build_transcript_analysis_request(transcription: str, model: str) -> dict:
+    """
+    Build the keyword arguments of the `responses.create` call that analyses mode and sentiment
+    and generates Q&A pairs in one request, so the transcription is only sent once.
+    The schema is the union of the sentiment analysis and Q&A schemas, so both stay in sync.
+
+    Args:
+        transcription (str): The complete transcription of the video.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+
+    Returns:
+        dict: The request parameters (model, input and text format).
+    """
+
+    sentiment_schema = build_sentiment_request(transcription="", model=model)["text"]["format"]["schema"]
+    qa_schema = build_question_answer_request(transcription="", model=model)["text"]["format"]["schema"]
+
+    # Build input content
+    dev_content = [
+        {
+            "type": "input_text",
+            "text": (
+                "Each Q&A pair should be relevant to the video transcription content and provide a concise answer."
+                "Return results that strictly match the given JSON format."
+            )
+        }
+    ]
+
+    usr_content = [
+        {
+            "type": "input_text",
+            "text": (
+                "Analyse the given video transcription and return:"
+                "What is the overall mode of the video?"
+                "What is the sentiment of the video?"
+                "Briefly explain the reasons for choosing these labels."
+                "A list of 5 to 10 useful Question-Answer (Q&A) pairs based on the transcription."
+                f"Transcription: {transcription}"
+            )
+        }
+    ]
+
+    # Define JSON schema
+    json_schema = {
+        "format": {
+            "type": "json_schema",
+            "name": "transcript_analysis",
+            "schema": {
+                "type": "object",
+                "properties": {**sentiment_schema["properties"], **qa_schema["properties"]},
+                "required": [*sentiment_schema["required"], *qa_schema["required"]],
+                "additionalProperties": False
+            }
+        }
+    }
+
+    return {
+        "model": model,
+        "input": [
+            {"role": "developer", "content": dev_content},
+            {"role": "user", "content": usr_content}
+        ],
+        "text": json_schema
+    }
+
+
+def transcript_analysis(
+    client: OpenAI,
+    transcription: str,
+    model: str,
+    max_tokens: int | None=None,
+    max_workers: int=4
+) -> str:
+    """
+    Analyse the overall mode and sentiment of the video and generate Q&A pairs in a single OpenAI call.
+    A transcription longer than `max_tokens` does not fit one request, so it is analysed chunk by chunk by
+    `sentiment_analysis` and `question_answer` instead, and their outputs are combined.
+
+    Args:
+        client (OpenAI): An initialised OpenAI client with a valid API key.
+        transcription (str): The complete transcription of the video.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        max_tokens (int, optional): Token budget of each chunk. The whole transcription is sent at once if None.
+        max_workers (int): Maximum number of chunks processed at the same time by each of the two stages.
+
+    Returns:
+        str: A JSON-formatted string containing `mode`, `sentiment`, `explanation` and `QA_pairs`.
+
+    Raises:
+        ValueError: If `max_tokens` is less than or equal to 0.
+        RuntimeError: If an unexpected error occurs while analysing the transcription.
+    """
+
+    if _exceeds(transcription, max_tokens):
+        logger.info("Transcription too long for a combined analysis, analysing it in chunks...")
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="analysis") as executor:
+            sentiment = executor.submit(propagate(sentiment_analysis), client, transcription, model, max_tokens, max_workers)
+            qa_pairs = executor.submit(propagate(question_answer), client, transcription, model, max_tokens, max_workers)
+            return _combine(sentiment.result(), qa_pairs.result())
+
+    request = build_transcript_analysis_request(transcription=transcription, model=model)
+
+    # Call OpenAI API
+    try:
+        logger.info("Analysing mode and sentiment and generating Q&A pairs...")
+        response = submit(client.responses.create, **request)
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while analysing transcription") from e
+
+    return response.output_text
+
+
+async def transcript_analysis_async(
+    client: AsyncOpenAI,
+    transcription: str,
+    model: str,
+    semaphore: asyncio.Semaphore | None=None,
+    max_tokens: int | None=None
+) -> str:
+    """
+    Asynchronous version of `transcript_analysis` built on `AsyncOpenAI`.
+
+    Args:
+        client (AsyncOpenAI): An initialised asynchronous OpenAI client with a valid API key.
+        transcription (str): The complete transcription of the video.
+        model (str): Model ID used to generate the response, like gpt-4o or o3.
+        semaphore (asyncio.Semaphore, optional): Limits the number of in-flight requests to the endpoint.
+        max_tokens (int, optional): Token budget of each chunk, see `transcript_analysis`.
+
+    Returns:
+        str: A JSON-formatted string containing `mode`, `sentiment`, `explanation` and `QA_pairs`.
+
+    Raises:
+        ValueError: If `max_tokens` is less than or equal to 0.
+        RuntimeError: If an unexpected error occurs while analysing the transcription.
+    """
+
+    if _exceeds(transcription, max_tokens):
+        logger.info("Transcription too long for a combined analysis, analysing it in chunks...")
+        return _combine(*await asyncio.gather(
+            sentiment_analysis_async(client, transcription, model, semaphore=semaphore, max_tokens=max_tokens),
+            question_answer_async(client, transcription, model, semaphore=semaphore, max_tokens=max_tokens)
+        ))
+
+    request = build_transcript_analysis_request(transcription=transcription, model=model)
+
+    # Call OpenAI API
+    try:
+        async with semaphore or nullcontext():
+            logger.info("Analysing mode and sentiment and generating Q&A pairs...")
+            response = await submit_async(client.responses.create, **request)
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while analysing transcription") from e
+
+    return response.output_text
+
+
+def _exceeds(transcription: str, max_tokens: int | None) -> bool:
+    if max_tokens is not None and max_tokens <= 0:
+        raise ValueError("max_tokens must be greater than 0")
+    return max_tokens is not None and count_tokens(transcription) > max_tokens
+
+
+def _combine(sentiment: str, qa_pairs: str) -> str:
+    # Same structure as the output of a combined request
+    return json.dumps({**json.loads(sentiment), "QA_pairs": json.loads(qa_pairs).get("QA_pairs", [])}, ensure_ascii=False)
@@ -1,54 +1,547 @@
+import io
 import os
+import time
+import asyncio
 import logging
 import tempfile
-from openai import OpenAI
-from moviepy import VideoFileClip
+import subprocess
+from typing import TYPE_CHECKING, BinaryIO, Callable
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, AsyncOpenAI
+from imageio_ffmpeg import get_ffmpeg_exe
+from request_scheduler import submit, submit_async
+from metrics import record, propagate
+from timed_transcript import TimedTranscript
+
+if TYPE_CHECKING:
+    from media_ingest import MediaIngest
 
 logger = logging.getLogger(__name__)
 
-def video_transcript(client: OpenAI, video_path: str, model: str, language: str="en") -> str:
+TRANSCRIPTION_PROMPT = "Transcribe exactly what is spoken. Ignore any background music or noise that may be present."
+
+# Speech only needs 16 kHz mono; 24 kbit/s Opus keeps an hour of audio around 11 MB
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_ENCODER_ARGS = ["-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg"]
+AUDIO_BUFFER_NAME = "audio.ogg"
+# Larger encoded tracks are not kept in memory and go through a temporary file instead
+MAX_BUFFER_BYTES = 24 * 1024 * 1024
+
+
+def extract_audio(video_path: str, start: float | None=None, end: float | None=None) -> str:
+    """
+    Extract the audio track of a video, or a section of it, into a temporary `.mp3` file.
+    The caller is responsible for removing the file once it is no longer needed.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+        start (float, optional): Start of the section to extract, in seconds.
+        end (float, optional): End of the section to extract, in seconds.
+
+    Returns:
+        str: The path of the temporary audio file.
+
+    Raises:
+        Exception: Propagates any error raised while decoding the video. The temporary file is removed.
+    """
+
+    # moviepy pulls in IPython and takes about half a second to import, so it is only imported when a clip is opened
+    from moviepy import VideoFileClip
+
+    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio:
+        try:
+            with VideoFileClip(video_path) as clip:
+                audio = clip.audio if start is None and end is None else clip.audio.subclipped(start or 0, end)
+                audio.write_audiofile(temp_audio.name, logger=None)
+        except Exception:
+            temp_audio.close()
+            os.remove(temp_audio.name)
+            raise
+
+    return temp_audio.name
+
+
+def extract_audio_buffer(
+    video_path: str,
+    start: float | None=None,
+    end: float | None=None,
+    max_bytes: int | None=MAX_BUFFER_BYTES
+) -> io.BytesIO | None:
+    """
+    Extract the audio track of a video, or a section of it, straight into memory as 16 kHz mono Opus.
+    ffmpeg streams the encoded audio through a pipe, so nothing is written to disk.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+        start (float, optional): Start of the section to extract, in seconds.
+        end (float, optional): End of the section to extract, in seconds.
+        max_bytes (int, optional): Give up once the encoded audio exceeds this size. No limit if None.
+
+    Returns:
+        io.BytesIO | None: The encoded audio, named `audio.ogg` so the API can infer its format,
+            or None if it exceeds `max_bytes`.
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the video.
+    """
+
+    command = [get_ffmpeg_exe(), "-nostdin", "-loglevel", "error"]
+    if start:
+        command += ["-ss", f"{start:.3f}"]
+    command += ["-i", video_path]
+    if end is not None:
+        command += ["-t", f"{end - (start or 0):.3f}"]
+    command += ["-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), *AUDIO_ENCODER_ARGS, "pipe:1"]
+
+    buffer = io.BytesIO()
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+        while chunk := process.stdout.read(1 << 16):
+            buffer.write(chunk)
+            if max_bytes is not None and buffer.tell() > max_bytes:
+                process.kill()
+                logger.info(f"Audio exceeds {max_bytes} bytes, falling back to a temporary file")
+                return None
+        error = process.stderr.read().decode(errors="replace").strip()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to extract audio: {error}")
+
+    buffer.name = AUDIO_BUFFER_NAME
+    buffer.seek(0)
+    return buffer
+
+
+def open_audio(
+    video_path: str,
+    start: float | None=None,
+    end: float | None=None,
+    in_memory: bool=True
+) -> tuple[BinaryIO, str | None]:
+    """
+    Extract the audio track of a video, or a section of it, and open it for upload.
+    The in-memory buffer of `extract_audio_buffer` is used first; tracks too large for it,
+    or every track when `in_memory` is False, go through the temporary `.mp3` file of `extract_audio`.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+        start (float, optional): Start of the section to extract, in seconds.
+        end (float, optional): End of the section to extract, in seconds.
+        in_memory (bool): Whether to try the in-memory buffer first.
+
+    Returns:
+        tuple[BinaryIO, str | None]: A tuple containing:
+            - file (BinaryIO): The opened audio, to be closed by the caller.
+            - audio_file (str | None): The temporary file to remove once the upload is done, if one was written.
+    """
+
+    if in_memory:
+        buffer = extract_audio_buffer(video_path, start=start, end=end)
+        if buffer is not None:
+            return buffer, None
+
+    audio_file = extract_audio(video_path, start=start, end=end)
+    try:
+        return open(audio_file, "rb"), audio_file
+    except Exception:
+        os.remove(audio_file)
+        raise
+
+
+def audio_duration(video_path: str) -> float:
+    """
+    Read the duration of a video from its container header, without decoding it, see `media_ingest.probe`.
+
+    Args:
+        video_path (str): The path of the video file to be processed.
+
+    Returns:
+        float: The duration in seconds.
+
+    Raises:
+        RuntimeError: If the file cannot be opened or has no audio track.
+    """
+
+    # media_ingest imports the audio settings of this module
+    from media_ingest import probe
+
+    metadata = probe(video_path)
+    if not metadata["has_audio"]:
+        raise RuntimeError(f"The video has no audio track: {video_path}")
+    return metadata["duration"]
+
+
+def plan_chunks(duration: float, chunk_seconds: float, overlap_seconds: float=5.0) -> list[tuple[float, float]]:
+    """
+    Split an audio track into fixed windows that overlap, so no word is lost at a boundary.
+
+    Args:
+        duration (float): The duration of the audio track in seconds.
+        chunk_seconds (float): Length of each window in seconds (must be > 0).
+        overlap_seconds (float): Length shared by two consecutive windows (must be >= 0 and < `chunk_seconds`).
+
+    Returns:
+        list[tuple[float, float]]: The (start, end) of each window, in order.
+
+    Raises:
+        ValueError: If `chunk_seconds` or `overlap_seconds` is out of range.
+    """
+
+    if chunk_seconds <= 0:
+        raise ValueError("chunk_seconds must be greater than 0")
+    if not 0 <= overlap_seconds < chunk_seconds:
+        raise ValueError("overlap_seconds must be between 0 and chunk_seconds")
+
+    chunks = []
+    start = 0.0
+    while True:
+        end = min(start + chunk_seconds, duration)
+        chunks.append((start, end))
+        if end >= duration:
+            return chunks
+        start = end - overlap_seconds
+
+
+def _normalise_word(word: str) -> str:
+    return word.strip(".,;:!?\"'()-").lower()
+
+
+def stitch_transcripts(texts: list[str], max_overlap_words: int=30, max_skip_words: int=3) -> str:
+    """
+    Join the transcripts of overlapping chunks, removing the words transcribed twice.
+    The longest run of words that ends the previous transcript and appears near the start of the next one
+    (after at most `max_skip_words` words cut at the boundary) is kept only once.
+
+    Args:
+        texts (list[str]): The transcript of each chunk, in order.
+        max_overlap_words (int): Longest overlap searched, in words.
+        max_skip_words (int): Number of leading words of a chunk that may be skipped before the overlap.
+
+    Returns:
+        str: The stitched transcript.
+    """
+
+    words = texts[0].split() if texts else []
+
+    for text in texts[1:]:
+        next_words = text.split()
+        previous = [_normalise_word(word) for word in words[-max_overlap_words:]]
+        following = [_normalise_word(word) for word in next_words[:max_overlap_words + max_skip_words]]
+
+        # Single-word matches are too often coincidental ("the", "and"), so require two words
+        cut = 0
+        for size in range(min(len(previous), len(following)), 1, -1):
+            offsets = [skip for skip in range(max_skip_words + 1) if following[skip:skip + size] == previous[-size:]]
+            if offsets:
+                cut = offsets[0] + size
+                break
+
+        words.extend(next_words[cut:])
+
+    return " ".join(words)
+
+
+def build_transcription_request(model: str, language: str="en", timestamps: bool=False) -> dict:
+    """
+    Build the keyword arguments of the `audio.transcriptions.create` call, excluding the audio file.
+
+    Args:
+        model (str): ID of the model to use. The options are gpt-4o-transcribe, gpt-4o-mini-transcribe, and whisper-1.
+        language (str, optional): Supplying the input language in ISO-639-1 format will improve accuracy and latency.
+        timestamps (bool): Request the `verbose_json` format with segment timestamps, only supported by whisper-1.
+
+    Returns:
+        dict: The request parameters (model, language, response format and prompt).
+    """
+
+    request = {
+        "model": model,
+        "language": language,
+        "response_format": "json",
+        "prompt": TRANSCRIPTION_PROMPT
+    }
+
+    if timestamps:
+        request.update(response_format="verbose_json", timestamp_granularities=["segment"])
+
+    return request
+
+
+def _rewind(file: BinaryIO) -> None:
+    # Rewind first, so a retried upload sends the whole file again, and count the uploaded bytes
+    record(upload_bytes=file.seek(0, os.SEEK_END))
+    file.seek(0)
+
+
+def _create_transcription(client: OpenAI, file: BinaryIO, request: dict):
+    _rewind(file)
+    return client.audio.transcriptions.create(file=file, **request)
+
+
+async def _create_transcription_async(client: AsyncOpenAI, file: BinaryIO, request: dict):
+    _rewind(file)
+    return await client.audio.transcriptions.create(file=file, **request)
+
+
+def video_transcript(
+    client: OpenAI,
+    video_path: str,
+    model: str,
+    language: str="en",
+    chunk_seconds: float | None=None,
+    overlap_seconds: float=5.0,
+    max_workers: int=4,
+    chunk_timings: list[dict] | None=None,
+    in_memory: bool=True,
+    ingest: "MediaIngest | None"=None,
+    timestamps: bool=False
+) -> str | TimedTranscript:
     """
     Transcribe a video file using the OpenAI API.
-    The function extracts the audio track before sending it to OpenAI.
-    
+    The function extracts the audio track, in memory unless it is too large, before sending it to OpenAI.
+    Audio longer than `chunk_seconds` is split into overlapping chunks that are transcribed concurrently
+    and stitched back together in order, which keeps each upload under the API's file size limit.
+
     Args:
         client (OpenAI): An initialised OpenAI client with a valid API key.
         video_path (str): The path of the video file to be processed.
         model (str): ID of the model to use. The options are gpt-4o-transcribe, gpt-4o-mini-transcribe, and whisper-1.
         language (str, optional): Supplying the input language in ISO-639-1 format will improve accuracy and latency.
-    
+        chunk_seconds (float, optional): Maximum length of an uploaded chunk. The whole track is uploaded at once if None.
+        overlap_seconds (float): Length shared by two consecutive chunks.
+        max_workers (int): Maximum number of chunks extracted and transcribed at the same time.
+        chunk_timings (list[dict], optional): If given, filled with one record per chunk:
+            `index`, `start`, `end`, `extract_seconds` and `transcribe_seconds`.
+        in_memory (bool): Whether to extract the audio into an in-memory buffer, see `open_audio`.
+        ingest (MediaIngest, optional): A shared reader of the video. Its metadata and the audio of its single
+            demux pass are used instead of opening `video_path` again, and `in_memory` is ignored.
+        timestamps (bool): Return the start and end of each segment with the text, see `TimedTranscript`.
+            Requires whisper-1.
+
     Returns:
-        str: The complete transcription of the video.
-    
+        str | TimedTranscript: The complete transcription of the video, with its segment timestamps if `timestamps`.
+
     Raises:
+        ValueError: If `chunk_seconds` or `overlap_seconds` is out of range.
         RuntimeError: If an unexpected error occurs while transcribing.
     """
-    
+
+    open_section = _audio_opener(video_path, in_memory, ingest)
+
+    if chunk_seconds is not None:
+        chunks = plan_chunks(_safe_duration(video_path, ingest), chunk_seconds, overlap_seconds)
+        if len(chunks) > 1:
+            return _transcribe_chunks(
+                client, open_section, model, language, chunks, max_workers, chunk_timings, timestamps
+            )
+
+    audio_file = None
+
     try:
         # Extract audio track
         logger.info("Extracting audio track...")
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio:
-            with VideoFileClip(video_path) as clip:
-                clip.audio.write_audiofile(temp_audio.name, logger=None)
-            audio_file = temp_audio.name
+        file, audio_file = open_section()
 
         # Call OpenAI API
         logger.info("Transcribing video...")
-        with open(audio_file, "rb") as file:
-            transcription = client.audio.transcriptions.create(
-                file=file,
-                model=model,
-                language=language,
-                response_format="json",
-                prompt="Transcribe exactly what is spoken. Ignore any background music or noise that may be present."
+        with file:
+            transcription = submit(
+                _create_transcription, client, file,
+                build_transcription_request(model=model, language=language, timestamps=timestamps)
             )
-    
+
     except Exception as e:
         raise RuntimeError(f"Unexpected error occurred while transcribing") from e
-    
+
     finally:
-        if os.path.exists(temp_audio.name):
-            os.remove(temp_audio.name)
-    
-    return transcription.text
-    
\ No newline at end of file
+        if audio_file and os.path.exists(audio_file):
+            os.remove(audio_file)
+
+    return TimedTranscript.from_response(transcription) if timestamps else transcription.text
+
+
+def _audio_opener(
+    video_path: str,
+    in_memory: bool,
+    ingest: "MediaIngest | None"
+) -> Callable[..., tuple[BinaryIO, str | None]]:
+    # Open the audio, or a section of it, like `open_audio`, from the shared demux pass if there is one
+    def open_section(start: float | None=None, end: float | None=None) -> tuple[BinaryIO, str | None]:
+        if ingest is not None:
+            return ingest.audio(start=start, end=end), None
+        return open_audio(video_path, start=start, end=end, in_memory=in_memory)
+
+    return open_section
+
+
+def _safe_duration(video_path: str, ingest: "MediaIngest | None"=None) -> float:
+    try:
+        return ingest.metadata()["duration"] if ingest is not None else audio_duration(video_path)
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while transcribing") from e
+
+
+def _transcribe_chunks(
+    client: OpenAI,
+    open_section: Callable[..., tuple[BinaryIO, str | None]],
+    model: str,
+    language: str,
+    chunks: list[tuple[float, float]],
+    max_workers: int,
+    chunk_timings: list[dict] | None,
+    timestamps: bool=False
+) -> str | TimedTranscript:
+    # Each worker extracts and uploads its own section, so decoding overlaps with the API calls
+    def transcribe(index: int, start: float, end: float) -> tuple[str | TimedTranscript, dict]:
+        audio_file = None
+        try:
+            extract_start = time.perf_counter()
+            file, audio_file = open_section(start=start, end=end)
+            transcribe_start = time.perf_counter()
+            with file:
+                transcription = submit(
+                    _create_transcription, client, file,
+                    build_transcription_request(model=model, language=language, timestamps=timestamps)
+                )
+            timing = {
+                "index": index,
+                "start": start,
+                "end": end,
+                "extract_seconds": round(transcribe_start - extract_start, 3),
+                "transcribe_seconds": round(time.perf_counter() - transcribe_start, 3)
+            }
+            logger.debug(f"Chunk {index} ({start:.0f}s-{end:.0f}s) transcribed in {timing['transcribe_seconds']:.2f}s")
+            if timestamps:
+                return TimedTranscript.from_response(transcription, time_offset=start), timing
+            return transcription.text, timing
+
+        finally:
+            if audio_file and os.path.exists(audio_file):
+                os.remove(audio_file)
+
+    try:
+        logger.info(f"Transcribing video in {len(chunks)} chunks...")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcribe") as executor:
+            results = list(executor.map(propagate(lambda args: transcribe(*args)), [(i, *chunk) for i, chunk in enumerate(chunks)]))
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while transcribing") from e
+
+    if chunk_timings is not None:
+        chunk_timings.extend(timing for _, timing in results)
+
+    # Timestamps tell which copy of the overlap to keep, plain texts are stitched by their words
+    if timestamps:
+        return TimedTranscript.merge([transcript for transcript, _ in results], chunks)
+    return stitch_transcripts([text for text, _ in results])
+
+
+async def video_transcript_async(
+    client: AsyncOpenAI,
+    video_path: str,
+    model: str,
+    language: str="en",
+    semaphore: asyncio.Semaphore | None=None,
+    in_memory: bool=True,
+    ingest: "MediaIngest | None"=None,
+    timestamps: bool=False,
+    chunk_seconds: float | None=None,
+    overlap_seconds: float=5.0
+) -> str | TimedTranscript:
+    """
+    Asynchronous version of `video_transcript` built on `AsyncOpenAI`.
+    Audio extraction runs in a worker thread so the event loop is not blocked.
+    Chunks are transcribed concurrently, as many at a time as `semaphore` allows.
+
+    Args:
+        client (AsyncOpenAI): An initialised asynchronous OpenAI client with a valid API key.
+        video_path (str): The path of the video file to be processed.
+        model (str): ID of the model to use. The options are gpt-4o-transcribe, gpt-4o-mini-transcribe, and whisper-1.
+        language (str, optional): Supplying the input language in ISO-639-1 format will improve accuracy and latency.
+        semaphore (asyncio.Semaphore, optional): Limits the number of in-flight requests to the endpoint.
+        in_memory (bool): Whether to extract the audio into an in-memory buffer, see `open_audio`.
+        ingest (MediaIngest, optional): A shared reader of the video, see `video_transcript`.
+        timestamps (bool): Return the segment timestamps with the text, see `video_transcript`.
+        chunk_seconds (float, optional): Maximum length of an uploaded chunk, see `video_transcript`.
+        overlap_seconds (float): Length shared by two consecutive chunks.
+
+    Returns:
+        str | TimedTranscript: The complete transcription of the video, with its segment timestamps if `timestamps`.
+
+    Raises:
+        ValueError: If `chunk_seconds` or `overlap_seconds` is out of range.
+        RuntimeError: If an unexpected error occurs while transcribing.
+    """
+
+    open_section = _audio_opener(video_path, in_memory, ingest)
+
+    if chunk_seconds is not None:
+        duration = await asyncio.to_thread(_safe_duration, video_path, ingest)
+        chunks = plan_chunks(duration, chunk_seconds, overlap_seconds)
+        if len(chunks) > 1:
+            return await _transcribe_chunks_async(client, open_section, model, language, chunks, semaphore, timestamps)
+
+    audio_file = None
+
+    try:
+        # Extract audio track
+        logger.info("Extracting audio track...")
+        file, audio_file = await asyncio.to_thread(open_section)
+
+        # Call OpenAI API
+        async with semaphore or nullcontext():
+            logger.info("Transcribing video...")
+            with file:
+                transcription = await submit_async(
+                    _create_transcription_async, client, file,
+                    build_transcription_request(model=model, language=language, timestamps=timestamps)
+                )
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while transcribing") from e
+
+    finally:
+        if audio_file and os.path.exists(audio_file):
+            os.remove(audio_file)
+
+    return TimedTranscript.from_response(transcription) if timestamps else transcription.text
+
+
+async def _transcribe_chunks_async(
+    client: AsyncOpenAI,
+    open_section: Callable[..., tuple[BinaryIO, str | None]],
+    model: str,
+    language: str,
+    chunks: list[tuple[float, float]],
+    semaphore: asyncio.Semaphore | None,
+    timestamps: bool=False
+) -> str | TimedTranscript:
+    # Each chunk extracts its own section in a worker thread, so decoding overlaps with the API calls
+    async def transcribe(start: float, end: float) -> str | TimedTranscript:
+        audio_file = None
+        try:
+            file, audio_file = await asyncio.to_thread(open_section, start=start, end=end)
+            async with semaphore or nullcontext():
+                with file:
+                    transcription = await submit_async(
+                        _create_transcription_async, client, file,
+                        build_transcription_request(model=model, language=language, timestamps=timestamps)
+                    )
+            if timestamps:
+                return TimedTranscript.from_response(transcription, time_offset=start)
+            return transcription.text
+
+        finally:
+            if audio_file and os.path.exists(audio_file):
+                os.remove(audio_file)
+
+    try:
+        logger.info(f"Transcribing video in {len(chunks)} chunks...")
+        results = await asyncio.gather(*(transcribe(start, end) for start, end in chunks))
+
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error occurred while transcribing") from e
+
+    if timestamps:
+        return TimedTranscript.merge(list(results), chunks)
+    return stitch_transcripts(list(results))